@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+AIRTABLE_ENDPOINT_URL = "https://api.airtable.com"
+BATCH_SIZE = 10  # Airtable accepts at most 10 records per create request
+REQUESTS_PER_SECOND = 5  # Airtable's per-base rate limit
+
+# CSV column -> Airtable field
+FIELD_MAP = {
+    "Asset": "Asset",
+    "Date": "Date",
+    "Entry_Price": "Entry Price",
+    "Exit_Price": "Exit Price",
+    "Quantity": "Quantity",
+    "Type": "Type",
+}
+NUMERIC_COLUMNS = ["Entry_Price", "Exit_Price", "Quantity"]
+
+
+def trades_to_records(df: pd.DataFrame) -> List[Dict]:
+    """Convert a trades DataFrame to Airtable field dicts in one vectorized pass"""
+    columns = [col for col in FIELD_MAP if col in df.columns]
+    trades = df[columns].copy()
+    trades[NUMERIC_COLUMNS] = trades[NUMERIC_COLUMNS].astype(float)
+    trades["Date"] = trades["Date"].astype(str)
+    trades = trades.rename(columns=FIELD_MAP)
+    # JSON has no NaN: drop empty optional cells instead of sending them
+    trades = trades.astype(object).where(trades.notna(), None)
+    return [{k: v for k, v in row.items() if v is not None} for row in trades.to_dict("records")]
+
+
+def chunked(records: List[Dict], size: int = BATCH_SIZE) -> List[List[Dict]]:
+    return [records[i:i + size] for i in range(0, len(records), size)]
+
+
+class RateLimiter:
+    """Spaces requests evenly so the sender never exceeds the API rate limit"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class AirtableUploader:
+    """Creates records in batches of 10 over a pooled session with bounded concurrency"""
+
+    def __init__(self, api_key: str, base_id: str, table_id: str, endpoint_url: str = AIRTABLE_ENDPOINT_URL,
+                 max_workers: int = 4, requests_per_second: float = REQUESTS_PER_SECOND,
+                 max_retries: int = 5, retry_delay: float = 30.0):
+        self.url = f"{endpoint_url.rstrip('/')}/v0/{base_id}/{table_id}"
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def create_batch(self, records: List[Dict]) -> List[Dict]:
+        """POST up to 10 records, waiting out 429 responses; returns the created records"""
+        payload = {"records": [{"fields": fields} for fields in records]}
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            response = self.session.post(self.url, json=payload, timeout=30)
+            if response.status_code == 429 and attempt < self.max_retries:
+                # Airtable asks clients to back off for 30 seconds after a 429
+                time.sleep(float(response.headers.get("Retry-After", self.retry_delay)))
+                continue
+            response.raise_for_status()
+            return response.json()["records"]
+        return []
+
+    def upload_batches(self, batches: Iterable[List[Dict]],
+                       progress_callback: Optional[Callable[[int], None]] = None,
+                       on_created: Optional[Callable[[List[Dict]], None]] = None) -> int:
+        """Send batches concurrently, keeping at most 2 * max_workers in flight
+
+        Up to `max_workers` requests are open at once, all spaced by the one
+        shared rate limiter. The workers only hide each request's latency.
+        Throughput is capped at requests_per_second * BATCH_SIZE records per
+        second, e.g. 50 at Airtable's 5 requests per second.
+        `batches` may be a generator, so a large import is never fully
+        materialized. `on_created` receives each batch of created records and
+        `progress_callback` the running total; both run on the calling thread.
+        Returns the number of records created.
+        """
+        created_count = 0
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def drain(limit: int):
+                nonlocal created_count
+                while len(in_flight) > limit:
+                    done = next(as_completed(in_flight))
+                    in_flight.discard(done)
+                    created = done.result()
+                    created_count += len(created)
+                    if on_created:
+                        on_created(created)
+                    if progress_callback:
+                        progress_callback(created_count)
+
+            for batch in batches:
+                if not batch:
+                    continue
+                in_flight.add(executor.submit(self.create_batch, batch))
+                drain(2 * self.max_workers)
+            drain(0)
+        return created_count
+
+    def upload(self, records: List[Dict],
+               progress_callback: Optional[Callable[[int], None]] = None) -> List[Dict]:
+        """Create all records, BATCH_SIZE per request; returns the created records"""
+        created = []
+        self.upload_batches(chunked(records), progress_callback, created.extend)
+        return created
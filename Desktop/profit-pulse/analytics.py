@@ -0,0 +1,106 @@
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RollingAnalytics:
+    """Equity curve, drawdown and rolling win rate / PnL over the trade sequence
+
+    Everything is derived from running sums, so each window costs O(n) and
+    new trades appended after the last analysed one only extend the arrays.
+    Results are keyed by the trade cache's data_version; when the new data is
+    not a pure append (edited or back-dated trades) it is rebuilt instead.
+    """
+
+    def __init__(self):
+        self.data_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._ids = np.array([], dtype=object)
+        self._dates = np.array([], dtype="datetime64[ns]")
+        self._pnl = np.array([], dtype=float)
+        # Running sums with a leading zero: sum of the first k trades is at index k
+        self._cum_pnl = np.zeros(1)
+        self._cum_wins = np.zeros(1)
+        self._cum_valid = np.zeros(1)
+        self._peak = np.array([], dtype=float)
+        self._windows: Dict[int, Dict[str, np.ndarray]] = {}
+
+    @property
+    def size(self) -> int:
+        return self._pnl.size
+
+    def update(self, trades: pd.DataFrame, data_version: int) -> "RollingAnalytics":
+        """Bring the analytics up to date with a frame from TradeCache.frame()"""
+        with self._lock:
+            if data_version == self.data_version:
+                return self
+            ids = trades["id"].to_numpy(dtype=object)
+            pnl = trades["pnl"].to_numpy(dtype=float)
+            n = self.size
+            is_append = (
+                len(trades) >= n
+                and np.array_equal(ids[:n], self._ids)
+                and np.array_equal(pnl[:n], self._pnl, equal_nan=True)
+            )
+            if not is_append:
+                self._reset()
+                n = 0
+            self._extend(ids[n:], trades["Date"].to_numpy(dtype="datetime64[ns]")[n:], pnl[n:])
+            self.data_version = data_version
+            return self
+
+    def _extend(self, ids: np.ndarray, dates: np.ndarray, pnl: np.ndarray):
+        if pnl.size == 0:
+            return
+        start = self.size
+        valid = ~np.isnan(pnl)
+        clean = np.where(valid, pnl, 0.0)
+
+        self._cum_pnl = np.concatenate([self._cum_pnl, self._cum_pnl[-1] + np.cumsum(clean)])
+        self._cum_wins = np.concatenate([self._cum_wins, self._cum_wins[-1] + np.cumsum(clean > 0)])
+        self._cum_valid = np.concatenate([self._cum_valid, self._cum_valid[-1] + np.cumsum(valid)])
+        # Peaks start from the flat line at zero, matching metrics._max_drawdown
+        previous_peak = self._peak[-1] if self._peak.size else 0.0
+        new_peak = np.maximum.accumulate(np.maximum(self._cum_pnl[start + 1:], previous_peak))
+        self._peak = np.concatenate([self._peak, new_peak])
+
+        self._ids = np.concatenate([self._ids, ids])
+        self._dates = np.concatenate([self._dates, dates])
+        self._pnl = np.concatenate([self._pnl, pnl])
+
+        for window, series in self._windows.items():
+            for name, values in self._rolling(window, start).items():
+                series[name] = np.concatenate([series[name], values])
+
+    def _rolling(self, window: int, start: int = 0) -> Dict[str, np.ndarray]:
+        """Rolling sums for trades start..end from running-sum differences"""
+        end = np.arange(start, self.size) + 1
+        begin = np.maximum(end - window, 0)
+        pnl = self._cum_pnl[end] - self._cum_pnl[begin]
+        wins = self._cum_wins[end] - self._cum_wins[begin]
+        valid = self._cum_valid[end] - self._cum_valid[begin]
+        full = end >= window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = np.where(full & (valid > 0), wins / valid * 100, np.nan)
+        return {"rolling_pnl": np.where(full, pnl, np.nan), "rolling_win_rate": win_rate}
+
+    def frame(self, window: int) -> pd.DataFrame:
+        """Per-trade equity, drawdown and rolling stats for a window of `window` trades"""
+        with self._lock:
+            if window not in self._windows:
+                self._windows[window] = self._rolling(window)
+            series = self._windows[window]
+            equity = self._cum_pnl[1:]
+            return pd.DataFrame({
+                "Date": self._dates,
+                "pnl": self._pnl,
+                "equity": equity,
+                "drawdown": equity - self._peak,
+                "rolling_pnl": series["rolling_pnl"],
+                "rolling_win_rate": series["rolling_win_rate"],
+            })
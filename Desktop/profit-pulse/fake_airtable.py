@@ -0,0 +1,219 @@
+"""In-memory stand-in for the Airtable REST API, for testing imports offline.
+
+Run it with ``python fake_airtable.py --port 8765`` and point the app at it by
+setting ``AIRTABLE_ENDPOINT_URL = "http://localhost:8765"`` in
+``.streamlit/secrets.toml``. Only the endpoints the app uses are implemented:
+create, update, delete and paginated list, including the
+``IS_AFTER(LAST_MODIFIED_TIME(), '...')`` filter used for delta syncs.
+"""
+import argparse
+import json
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MAX_BATCH = 10
+PAGE_SIZE = 100
+MODIFIED_AFTER = re.compile(r"IS_AFTER\(LAST_MODIFIED_TIME\(\),\s*'([^']+)'\)")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class FakeAirtable:
+    """Record storage shared by all request handler threads"""
+
+    def __init__(self, requests_per_second: float = None, latency: float = 0):
+        self.tables = {}
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.requests_per_second = requests_per_second
+        # Seconds each write takes, so concurrent clients overlap as they would against the real API
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self.request_count += 1
+            if not self.requests_per_second:
+                return True
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            allowed = self._window_count <= self.requests_per_second
+            self.rate_limited_count += not allowed
+            return allowed
+
+    def begin_write(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        time.sleep(self.latency)
+
+    def end_write(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def create(self, table: str, records: list) -> list:
+        created = []
+        with self._lock:
+            rows = self.tables.setdefault(table, {})
+            for record in records:
+                record_id = "rec" + secrets.token_hex(7)
+                stamp = _now_iso()
+                rows[record_id] = {"id": record_id, "createdTime": stamp,
+                                   "fields": dict(record["fields"]), "_modified": stamp}
+                created.append(self._public(rows[record_id]))
+        return created
+
+    def update(self, table: str, records: list) -> list:
+        updated = []
+        with self._lock:
+            rows = self.tables.setdefault(table, {})
+            for record in records:
+                row = rows[record["id"]]
+                row["fields"].update(record["fields"])
+                row["_modified"] = _now_iso()
+                updated.append(self._public(row))
+        return updated
+
+    def delete(self, table: str, record_ids: list) -> list:
+        with self._lock:
+            rows = self.tables.setdefault(table, {})
+            return [{"id": record_id, "deleted": rows.pop(record_id, None) is not None}
+                    for record_id in record_ids]
+
+    def list(self, table: str, offset: int, page_size: int, modified_after: str = None):
+        with self._lock:
+            rows = list(self.tables.get(table, {}).values())
+        if modified_after:
+            # ISO-8601 UTC strings with the same precision compare chronologically
+            rows = [row for row in rows if row["_modified"] > modified_after]
+        page = [self._public(row) for row in rows[offset:offset + page_size]]
+        next_offset = offset + page_size if offset + page_size < len(rows) else None
+        return page, next_offset
+
+    @staticmethod
+    def _public(row: dict) -> dict:
+        return {key: value for key, value in row.items() if not key.startswith("_")}
+
+
+def make_handler(store: FakeAirtable):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _table(self):
+            parts = urlparse(self.path).path.strip("/").split("/")
+            return "/".join(parts[1:3]) if len(parts) >= 3 and parts[0] == "v0" else None
+
+        def _record_id(self):
+            parts = urlparse(self.path).path.strip("/").split("/")
+            return parts[3] if len(parts) >= 4 else None
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _guard(self) -> bool:
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                self._send(401, {"error": "AUTHENTICATION_REQUIRED"})
+                return False
+            if not store.allow_request():
+                self._send(429, {"error": {"type": "RATE_LIMIT_REACHED"}})
+                return False
+            if self._table() is None:
+                self._send(404, {"error": "NOT_FOUND"})
+                return False
+            return True
+
+        def _write(self, apply):
+            body = self._read_json()
+            if not self._guard():
+                return
+            records = body.get("records")
+            single = records is None and "fields" in body
+            if single:
+                records = [dict(body, id=self._record_id())] if self._record_id() else [body]
+            if not records or len(records) > MAX_BATCH:
+                self._send(422, {"error": {"type": "INVALID_RECORDS",
+                                           "message": f"Send between 1 and {MAX_BATCH} records"}})
+                return
+            store.begin_write()
+            try:
+                result = apply(self._table(), records)
+            finally:
+                store.end_write()
+            self._send(200, result[0] if single else {"records": result})
+
+        def do_POST(self):
+            self._write(store.create)
+
+        def do_PATCH(self):
+            self._write(store.update)
+
+        def do_DELETE(self):
+            if not self._guard():
+                return
+            record_id = self._record_id()
+            record_ids = [record_id] if record_id else parse_qs(urlparse(self.path).query).get("records[]", [])
+            result = store.delete(self._table(), record_ids)
+            self._send(200, result[0] if record_id else {"records": result})
+
+        def do_GET(self):
+            if not self._guard():
+                return
+            query = parse_qs(urlparse(self.path).query)
+            offset = int(query.get("offset", ["0"])[0])
+            page_size = min(int(query.get("pageSize", [PAGE_SIZE])[0]), PAGE_SIZE)
+            match = MODIFIED_AFTER.search(query.get("filterByFormula", [""])[0])
+            records, next_offset = store.list(self._table(), offset, page_size,
+                                              match.group(1) if match else None)
+            body = {"records": records}
+            if next_offset is not None:
+                body["offset"] = str(next_offset)
+            self._send(200, body)
+
+    return Handler
+
+
+def start_fake_airtable(port: int = 0, requests_per_second: float = None, latency: float = 0):
+    """Start the fake API on a background thread; returns (server, store, endpoint_url)"""
+    store = FakeAirtable(requests_per_second, latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(store))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, store, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Airtable API for local testing")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit", type=float, default=5,
+                        help="requests per second before answering 429 (0 disables)")
+    args = parser.parse_args()
+    server, _, url = start_fake_airtable(args.port, args.rate_limit or None)
+    print(f"Fake Airtable listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
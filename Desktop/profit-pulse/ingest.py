@@ -0,0 +1,72 @@
+from typing import Iterator, List, Dict
+
+import pandas as pd
+
+from airtable_uploader import BATCH_SIZE, chunked, trades_to_records
+
+REQUIRED_COLUMNS = ["Asset", "Date", "Entry_Price", "Exit_Price", "Quantity"]
+CSV_DTYPES = {
+    "Asset": "string",
+    "Date": "string",
+    "Entry_Price": "float64",
+    "Exit_Price": "float64",
+    "Quantity": "float64",
+    "Type": "string",
+}
+CHUNK_ROWS = 50_000
+
+
+class CSVValidationError(ValueError):
+    """Raised when an uploaded trades CSV is missing columns or has bad values"""
+
+
+def validate_columns(columns) -> None:
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise CSVValidationError(f"CSV file must contain: {', '.join(REQUIRED_COLUMNS)} "
+                                 f"(missing {', '.join(missing)})")
+
+
+def iter_trade_chunks(source, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Read a trades CSV in typed chunks, validating each one before it is yielded
+
+    Only the known trade columns are parsed, so extra broker columns cost
+    nothing, and memory stays bounded by `chunk_rows` whatever the file size.
+    """
+    reader = pd.read_csv(source, chunksize=chunk_rows, dtype=CSV_DTYPES,
+                         usecols=lambda col: col in CSV_DTYPES)
+    first_row = 0
+    try:
+        for chunk in reader:
+            validate_columns(chunk.columns)
+            incomplete = chunk[REQUIRED_COLUMNS].isna().any(axis=1)
+            if incomplete.any():
+                # +2: one for the header line, one for 1-based line numbers
+                lines = (incomplete[incomplete].index[:5] + 2).tolist()
+                raise CSVValidationError(f"Missing required values on CSV line(s) {lines}")
+            first_row += len(chunk)
+            yield chunk
+    except ValueError as e:
+        if isinstance(e, CSVValidationError):
+            raise
+        raise CSVValidationError(f"Invalid value after row {first_row}: {e}") from e
+    finally:
+        reader.close()
+
+
+def validate_trades_csv(source, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Validate a whole trades CSV chunk by chunk and rewind it; returns the number of trades
+
+    Run before uploading, so a bad row late in the file is reported before
+    any batch has been sent rather than after part of the file is in Airtable.
+    """
+    trades = sum(len(chunk) for chunk in iter_trade_chunks(source, chunk_rows))
+    source.seek(0)
+    return trades
+
+
+def iter_record_batches(source, chunk_rows: int = CHUNK_ROWS,
+                        batch_size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Stream a trades CSV as Airtable-ready record batches"""
+    for chunk in iter_trade_chunks(source, chunk_rows):
+        yield from chunked(trades_to_records(chunk), batch_size)
@@ -0,0 +1,120 @@
+from datetime import datetime
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+PNL_FIELD = "Pnl 2"
+
+
+def trades_frame(records: List[Dict]) -> pd.DataFrame:
+    """Flatten Airtable records into a DataFrame with a typed `pnl` column"""
+    return normalize_trades(pd.DataFrame([record.get("fields", {}) for record in records]))
+
+
+def normalize_trades(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the typed `pnl` column and order trades by date
+
+    Formula errors such as '#ERROR!' become NaN, so they drop out of every
+    aggregate without a per-record check.
+    """
+    df["pnl"] = pd.to_numeric(df[PNL_FIELD], errors="coerce") if PNL_FIELD in df else np.nan
+    if "Date" in df:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+        # Stable sort keeps upload order for trades on the same day
+        df = df.sort_values("Date", kind="stable", ignore_index=True)
+    return df
+
+
+def _profit_factor(total_win: float, total_loss: float) -> Union[float, str]:
+    return round(total_win / total_loss, 2) if total_loss > 0 else "N/A (No losses)"
+
+
+def _longest_streaks(pnl: np.ndarray) -> Dict[str, int]:
+    """Longest runs of consecutive wins and losses, via run-length encoding"""
+    signs = np.sign(pnl)
+    if signs.size == 0:
+        return {"longest_win_streak": 0, "longest_loss_streak": 0}
+    run_starts = np.flatnonzero(np.r_[True, signs[1:] != signs[:-1]])
+    run_lengths = np.diff(np.r_[run_starts, signs.size])
+    run_signs = signs[run_starts]
+    wins, losses = run_lengths[run_signs > 0], run_lengths[run_signs < 0]
+    return {
+        "longest_win_streak": int(wins.max()) if wins.size else 0,
+        "longest_loss_streak": int(losses.max()) if losses.size else 0,
+    }
+
+
+def _max_drawdown(pnl: np.ndarray) -> float:
+    """Largest peak-to-trough fall of the cumulative PnL curve, starting from zero"""
+    if pnl.size == 0:
+        return 0.0
+    equity = np.cumsum(pnl)
+    peaks = np.maximum.accumulate(np.maximum(equity, 0))
+    return float((peaks - equity).max())
+
+
+def asset_breakdown(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-asset trade count, win rate, PnL totals and profit factor"""
+    if "Asset" not in df or df.empty:
+        return pd.DataFrame()
+    valid = df[df["pnl"].notna()]
+    grouped = valid.assign(
+        win=valid["pnl"] > 0,
+        gain=valid["pnl"].clip(lower=0),
+        loss=(-valid["pnl"]).clip(lower=0),
+    ).groupby("Asset")
+    breakdown = pd.DataFrame({
+        "trades": grouped.size(),
+        "win_rate": grouped["win"].mean() * 100,
+        "total_profit": grouped["pnl"].sum(),
+        "average_profit": grouped["pnl"].mean(),
+        "profit_factor": grouped["gain"].sum() / grouped["loss"].sum().replace(0, np.nan),
+    })
+    return breakdown.sort_values("total_profit", ascending=False).round(2)
+
+
+def calculate_metrics(records: Union[List[Dict], pd.DataFrame]):
+    """Performance metrics from Airtable records or a frame built by trades_frame
+
+    Rows whose PnL is a formula error still count towards total_trades (and
+    therefore the win rate and average profit), as they always have; every
+    other statistic uses valid PnL values only.
+    """
+    if records is None or len(records) == 0:
+        return None
+    df = records if isinstance(records, pd.DataFrame) else trades_frame(records)
+
+    total_trades = len(df)
+    pnl = df["pnl"].to_numpy(dtype=float)
+    pnl = pnl[~np.isnan(pnl)]
+
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    total_profit = float(pnl.sum())
+    total_win = float(wins.sum())
+    total_loss = float(-losses.sum())
+
+    std = float(pnl.std(ddof=1)) if pnl.size > 1 else 0.0
+    downside = float(np.sqrt(np.mean(np.minimum(pnl, 0) ** 2))) if pnl.size else 0.0
+    mean = float(pnl.mean()) if pnl.size else 0.0
+
+    metrics = {
+        "total_trades": total_trades,
+        "winning_trades": int(wins.size),
+        "losing_trades": int(losses.size),
+        "win_rate": round(wins.size / total_trades * 100, 2),
+        "total_profit": round(total_profit, 2),
+        "average_profit": round(total_profit / total_trades, 2),
+        "profit_factor": _profit_factor(total_win, total_loss),
+        "total_win": round(total_win, 2),
+        "total_loss": round(total_loss, 2),
+        "expectancy": round(mean, 2),
+        "max_drawdown": round(_max_drawdown(pnl), 2),
+        # Per-trade ratios: no annualisation, since trade spacing is irregular
+        "sharpe_ratio": round(mean / std, 2) if std > 0 else 0.0,
+        "sortino_ratio": round(mean / downside, 2) if downside > 0 else 0.0,
+        "asset_breakdown": asset_breakdown(df),
+        "analysis_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    metrics.update(_longest_streaks(pnl))
+    return metrics
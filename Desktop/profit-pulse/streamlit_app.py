@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
 from pyairtable import Api
-from datetime import datetime
+
+from airtable_uploader import AIRTABLE_ENDPOINT_URL, AirtableUploader
+from analytics import RollingAnalytics
+from ingest import CSVValidationError, iter_record_batches, validate_columns, validate_trades_csv
+from metrics import calculate_metrics
+from trade_cache import TradeCache
 
 # Set page config
 st.set_page_config(
@@ -13,55 +18,32 @@ st.set_page_config(
 # Initialize Airtable API
 def init_airtable():
     try:
-        api = Api(st.secrets["AIRTABLE_API_KEY"])
+        endpoint_url = st.secrets.get("AIRTABLE_ENDPOINT_URL", AIRTABLE_ENDPOINT_URL)
+        api = Api(st.secrets["AIRTABLE_API_KEY"], endpoint_url=endpoint_url)
         return api.table(st.secrets["AIRTABLE_BASE_ID"], st.secrets["TABLE_ID"])
     except Exception as e:
         st.error(f"Failed to connect to Airtable: {e}")
         return None
 
-# Calculate metrics function
-def calculate_metrics(records):
-    if not records:
-        return None
-    
-    total_trades = len(records)
-    total_profit = 0
-    winning_trades = 0
-    losing_trades = 0
-    total_win = 0
-    total_loss = 0
-    
-    for record in records:
-        pnl = record['fields'].get('Pnl 2', 0)
-        if isinstance(pnl, str) and pnl.startswith('#ERROR!'):
-            continue
-            
-        total_profit += pnl
-        
-        if pnl > 0:
-            winning_trades += 1
-            total_win += pnl
-        elif pnl < 0:
-            losing_trades += 1
-            total_loss += abs(pnl)
-    
-    # Calculate metrics
-    win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-    average_profit = total_profit / total_trades if total_trades > 0 else 0
-    profit_factor = total_win / total_loss if total_loss > 0 else "N/A (No losses)"
-    
-    return {
-        "total_trades": total_trades,
-        "winning_trades": winning_trades,
-        "losing_trades": losing_trades,
-        "win_rate": round(win_rate, 2),
-        "total_profit": round(total_profit, 2),
-        "average_profit": round(average_profit, 2),
-        "profit_factor": profit_factor,
-        "total_win": round(total_win, 2),
-        "total_loss": round(total_loss, 2),
-        "analysis_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
+# Batched, rate-limited sender; cached so its connection pool is reused across reruns
+@st.cache_resource
+def init_uploader():
+    return AirtableUploader(
+        st.secrets["AIRTABLE_API_KEY"],
+        st.secrets["AIRTABLE_BASE_ID"],
+        st.secrets["TABLE_ID"],
+        endpoint_url=st.secrets.get("AIRTABLE_ENDPOINT_URL", AIRTABLE_ENDPOINT_URL),
+    )
+
+# Local trade cache shared by all sessions; analyses read from it instead of Airtable
+@st.cache_resource
+def init_trade_cache():
+    return TradeCache()
+
+# Rolling series keyed by the cache's data version; uploads only extend them
+@st.cache_resource
+def init_rolling_analytics():
+    return RollingAnalytics()
 
 # Main app
 def main():
@@ -79,54 +61,64 @@ def main():
     
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            
-            # Check required columns
-            required_columns = ['Asset', 'Date', 'Entry_Price', 'Exit_Price', 'Quantity']
-            if not all(col in df.columns for col in required_columns):
-                st.error("CSV file must contain: Asset, Date, Entry_Price, Exit_Price, Quantity")
-                return
+            # Only the first rows are parsed for the preview and header check
+            preview = pd.read_csv(uploaded_file, nrows=5)
+            uploaded_file.seek(0)
+            validate_columns(preview.columns)
             
             # Show preview
             st.subheader("Data Preview")
-            st.dataframe(df.head())
+            st.dataframe(preview)
             
             if st.button("Upload to Airtable"):
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                trades_imported = 0
-                total_rows = len(df)
-                
-                for i, row in df.iterrows():
-                    trade_data = {
-                        "Asset": row["Asset"],
-                        "Date": row["Date"],
-                        "Entry Price": float(row["Entry_Price"]),
-                        "Exit Price": float(row["Exit_Price"]),
-                        "Quantity": float(row["Quantity"]),
-                    }
-                    
-                    if "Type" in df.columns:
-                        trade_data["Type"] = row["Type"]
-                    
-                    table.create(trade_data)
-                    trades_imported += 1
-                    progress_bar.progress((i + 1) / total_rows)
-                    status_text.text(f"Imported {trades_imported} of {total_rows} trades...")
+                # Check every row before the first batch goes out, so a bad file uploads nothing
+                status_text.text("Validating trades...")
+                total_trades = validate_trades_csv(uploaded_file)
+                
+                def show_progress(trades_imported):
+                    progress_bar.progress(min(trades_imported / max(total_trades, 1), 1.0))
+                    status_text.text(f"Imported {trades_imported} of {total_trades} trades...")
                 
+                # Created records come back from Airtable, so the cache stays current offline
+                trades_imported = init_uploader().upload_batches(
+                    iter_record_batches(uploaded_file), show_progress, init_trade_cache().upsert
+                )
+                progress_bar.progress(1.0)
                 st.success(f"Successfully imported {trades_imported} trades!")
                 
+        except CSVValidationError as e:
+            st.error(str(e))
         except Exception as e:
             st.error(f"Error processing file: {e}")
     
     # Analysis section
     st.header("📈 Performance Analysis")
     
-    if st.button("Analyze Trades"):
+    trade_cache = init_trade_cache()
+    window = st.number_input("Rolling window (trades)", min_value=2, max_value=1000, value=20)
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        analyze = st.button("Analyze Trades")
+    with col2:
+        full_resync = st.button("🔄 Full Resync from Airtable")
+    
+    if analyze or full_resync:
         try:
-            records = table.all()
-            metrics = calculate_metrics(records)
+            # Only changes since the last sync are fetched, at most once per sync interval
+            sync_interval = float(st.secrets.get("CACHE_SYNC_SECONDS", 300))
+            if full_resync:
+                trade_cache.sync(table, full=True)
+            elif trade_cache.needs_sync(sync_interval):
+                trade_cache.sync(table)
+            
+            trades = trade_cache.frame()
+            metrics = calculate_metrics(trades)
+            last_synced = trade_cache.last_synced
+            st.caption(f"Analyzing {trade_cache.count()} cached trades • "
+                       f"last synced {last_synced:%Y-%m-%d %H:%M} UTC")
             
             if metrics:
                 st.subheader("Performance Report")
@@ -150,6 +142,38 @@ def main():
                     st.metric("Total Wins", f"${metrics['total_win']}")
                     st.metric("Total Losses", f"${metrics['total_loss']}")
                 
+                st.subheader("Risk & Consistency")
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    st.metric("Expectancy", f"${metrics['expectancy']}")
+                    st.metric("Max Drawdown", f"${metrics['max_drawdown']}")
+                
+                with col2:
+                    st.metric("Sharpe (per trade)", metrics['sharpe_ratio'])
+                    st.metric("Sortino (per trade)", metrics['sortino_ratio'])
+                
+                with col3:
+                    st.metric("Longest Win Streak", metrics['longest_win_streak'])
+                    st.metric("Longest Loss Streak", metrics['longest_loss_streak'])
+                
+                if not metrics['asset_breakdown'].empty:
+                    st.subheader("Performance by Asset")
+                    st.dataframe(metrics['asset_breakdown'])
+                
+                st.subheader("📉 Rolling Performance")
+                rolling = init_rolling_analytics().update(trades, trade_cache.data_version)
+                series = rolling.frame(int(window)).set_index("Date")
+                st.caption("Equity curve and drawdown")
+                st.line_chart(series[["equity", "drawdown"]])
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.caption(f"Win rate over the last {int(window)} trades (%)")
+                    st.line_chart(series["rolling_win_rate"])
+                with col2:
+                    st.caption(f"PnL over the last {int(window)} trades")
+                    st.line_chart(series["rolling_pnl"])
+                
                 st.success("Analysis completed successfully!")
             else:
                 st.warning("No trades found in the database")
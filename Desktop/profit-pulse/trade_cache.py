@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from metrics import PNL_FIELD, normalize_trades
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "trade_cache.sqlite3")
+# Look back this far past the last sync watermark to absorb clock skew with Airtable
+SYNC_OVERLAP = timedelta(minutes=2)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id TEXT PRIMARY KEY,
+    created_time TEXT,
+    asset TEXT,
+    trade_date TEXT,
+    pnl REAL,
+    fields TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT = """
+INSERT INTO trades (id, created_time, asset, trade_date, pnl, fields)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    asset = excluded.asset, trade_date = excluded.trade_date,
+    pnl = excluded.pnl, fields = excluded.fields
+WHERE trades.fields != excluded.fields
+"""
+
+
+def _row(record: Dict) -> tuple:
+    fields = record.get("fields", {})
+    pnl = fields.get(PNL_FIELD)
+    # Formula errors arrive as strings like '#ERROR!'; store them as NULL
+    pnl = float(pnl) if isinstance(pnl, (int, float)) else None
+    return (record["id"], record.get("createdTime"), fields.get("Asset"), fields.get("Date"),
+            pnl, json.dumps(fields, sort_keys=True))
+
+
+class TradeCache:
+    """Local SQLite copy of the Airtable trades table, kept current with delta syncs
+
+    Analyses read from here. Only records modified since the last sync are
+    fetched from Airtable, and uploads are written straight into the cache,
+    so repeat analyses need no network round trips.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection per operation, safe across Streamlit threads"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get_meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value) -> None:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @property
+    def data_version(self) -> int:
+        """Counter bumped whenever the cached trades change"""
+        with self._connect() as conn:
+            return int(self._get_meta(conn, "data_version") or 0)
+
+    @property
+    def last_synced(self) -> Optional[datetime]:
+        with self._connect() as conn:
+            value = self._get_meta(conn, "last_synced")
+        return datetime.fromisoformat(value) if value else None
+
+    def upsert(self, records: List[Dict], replace: bool = False) -> int:
+        """Store records; returns how many rows were added, changed or removed
+
+        With replace=True, cached trades missing from `records` are deleted.
+        Identical records are left alone, so re-fetching the same data does
+        not bump data_version.
+        """
+        rows = [_row(record) for record in records]
+        with self._lock, self._connect() as conn:
+            changes = conn.total_changes
+            conn.executemany(UPSERT, rows)
+            if replace:
+                kept = {row[0] for row in rows}
+                stale = [(trade_id,) for (trade_id,) in conn.execute("SELECT id FROM trades")
+                         if trade_id not in kept]
+                conn.executemany("DELETE FROM trades WHERE id = ?", stale)
+            changed = conn.total_changes - changes
+            if changed:
+                version = int(self._get_meta(conn, "data_version") or 0)
+                self._set_meta(conn, "data_version", version + 1)
+            return changed
+
+    def sync(self, table, full: bool = False) -> int:
+        """Pull changes from an Airtable table; a full sync also drops deleted records"""
+        started = datetime.now(timezone.utc)
+        since = self.last_synced
+        if full or since is None:
+            changed = self.upsert(table.all(), replace=True)
+        else:
+            watermark = (since - SYNC_OVERLAP).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            changed = self.upsert(table.all(formula=f"IS_AFTER(LAST_MODIFIED_TIME(), '{watermark}')"))
+        with self._lock, self._connect() as conn:
+            self._set_meta(conn, "last_synced", started.isoformat())
+        return changed
+
+    def needs_sync(self, max_age_seconds: float) -> bool:
+        last = self.last_synced
+        return last is None or (datetime.now(timezone.utc) - last).total_seconds() > max_age_seconds
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def frame(self) -> pd.DataFrame:
+        """Cached trades as a metrics-ready DataFrame, in upload order before date sorting"""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f'SELECT id, asset AS "Asset", trade_date AS "Date", pnl AS "{PNL_FIELD}" '
+                "FROM trades ORDER BY created_time, rowid",
+                conn,
+            )
+        return normalize_trades(df)
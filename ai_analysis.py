@@ -3,6 +3,12 @@ import random
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from config import config
+from instrumentation import timed
+
+# Artificial "thinking" pause in simulate_ai_analysis; benchmarks set this to 0
+SIMULATED_DELAY = config.SIMULATED_ANALYSIS_DELAY
+
 # Import legal database
 try:
     from legal_database import LEGAL_DATABASE, CONSTITUTIONAL_ARTICLES
@@ -11,6 +17,7 @@ except ImportError:
     LEGAL_DATABASE = {}
     CONSTITUTIONAL_ARTICLES = {}
 
+@timed("analysis.constitutional_analysis")
 def constitutional_analysis(client_data: Dict) -> str:
     """Enhanced constitutional analysis with professional formatting"""
     jurisdiction = client_data.get('jurisdiction', 'USA')
@@ -118,6 +125,7 @@ def get_recommended_action(article: Dict, practice_area: str) -> str:
     }
     return actions.get(practice_area, 'Consult with constitutional law specialist for detailed analysis')
 
+@timed("analysis.legal_precedent_analysis")
 def legal_precedent_analysis(client_data: Dict) -> str:
     """Analysis of relevant legal precedents"""
     jurisdiction = client_data.get('jurisdiction', 'USA')
@@ -213,6 +221,7 @@ def generate_relevant_precedents(jurisdiction: str, practice_area: str, case_typ
     
     return base_precedents
 
+@timed("analysis.risk_assessment_analysis")
 def risk_assessment_analysis(client_data: Dict) -> str:
     """Comprehensive risk assessment with detailed analysis"""
     complexity = client_data.get('complexity', 5) * 10
@@ -375,6 +384,7 @@ def generate_critical_considerations(risk_factors: Dict) -> str:
     
     return "\n".join(considerations)
 
+@timed("analysis.generate_legal_strategy")
 def generate_legal_strategy(client_data: Dict) -> str:
     """Generate comprehensive legal strategy"""
     practice_area = client_data.get('practice_area', '')
@@ -524,9 +534,11 @@ def generate_budget_considerations(complexity: int, practice_area: str) -> str:
     
     return "\n".join(considerations)
 
+@timed("analysis.simulate_ai_analysis")
 def simulate_ai_analysis(client_data: Dict) -> str:
     """Enhanced AI analysis for enterprise"""
-    time.sleep(2)  # Simulate processing time
+    if SIMULATED_DELAY > 0:
+        time.sleep(SIMULATED_DELAY)  # Simulate processing time
     
     practice_area = client_data.get('practice_area', 'Legal Matter')
     case_type = client_data.get('case_type', 'Case')
@@ -575,6 +587,7 @@ def simulate_ai_analysis(client_data: Dict) -> str:
 """
     return analysis
 
+@timed("analysis.analyze_case_complexity")
 def analyze_case_complexity(client_data: Dict) -> int:
     """Enhanced complexity analysis with multiple factors"""
     base_score = 50
@@ -3,6 +3,8 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from instrumentation import timed
+
 class LegalAIAnalyzer:
     def __init__(self):
         self.practice_keywords = {
@@ -25,6 +27,7 @@ class LegalAIAnalyzer:
             'compliance': 'Attorney Martinez (Regulatory Law)'
         }
 
+    @timed("analyzer.analyze_matter")
     def analyze_matter(self, description: str, matter_type: str, urgency: str) -> Dict:
         """Comprehensive AI analysis of legal matter"""
         
@@ -11,22 +11,40 @@ import plotly.graph_objects as go
 
 # Import from our modules
 from database import (
-    load_cases, save_cases, update_case_status, get_case_by_id,
+    add_case, update_case_status, get_case_by_id,
     add_time_entry, get_time_entries, add_case_note, get_case_notes,
-    delete_case, export_cases_to_csv, get_case_statistics
+    delete_case, export_cases_to_csv, get_case_statistics, get_case_index,
+    get_billing_rollups, reconcile_case_rollups, start_rollup_reconciler,
+    get_reconciler_status, get_case_description, get_case_snippet,
+    ensure_descriptions_migrated
 )
+from billing import ensure_invoices_recovered, generate_invoices, load_invoices, rollup_table
 from ai_analysis import (
     simulate_ai_analysis, analyze_case_complexity, 
     constitutional_analysis, legal_precedent_analysis,
     risk_assessment_analysis, generate_legal_strategy
 )
+from case_ids import generate_case_id
 from utils import (
-    generate_case_id, validate_email, format_phone_number, 
-    get_status_color, rerun, format_currency, calculate_days_since
+    validate_email, format_phone_number, 
+    get_status_color, rerun, format_currency, format_bytes, ages_in_days, fragment
 )
 from legal_database import LEGAL_DATABASE, COUNTRIES, LEGAL_SYSTEMS
+from dashboard_context import DashboardContext, build_dashboard_context
 from auth import require_auth, login_form
-from config import ENTERPRISE_CONFIG, UI_CONFIG
+from instrumentation import (
+    timed, track, is_enabled as metrics_enabled, enable as enable_metrics,
+    export_prometheus, export_json
+)
+from tracing import (
+    set_span_attributes, recent_traces, format_timeline,
+    enable as enable_tracing, is_enabled as tracing_enabled
+)
+from diagnostics import (
+    record_rerun, slowest_reruns, rerun_summary, storage_summary, storage_usage, cache_stats,
+    data_version, operation_stats, active_sessions, state_size
+)
+from config import ENTERPRISE_CONFIG, UI_CONFIG, config
 
 # Page configuration with professional settings
 st.set_page_config(
@@ -207,7 +225,7 @@ st.markdown(f"""
 def initialize_session_state():
     """Initialize professional session state"""
     defaults = {
-        'cases': load_cases(),
+        'cases': (),
         'current_case_id': None,
         'user_role': 'Partner',
         'user_name': 'Legal Professional',
@@ -228,12 +246,13 @@ def initialize_session_state():
         if key not in st.session_state:
             st.session_state[key] = value
     
-    # Force refresh cases from database if needed
+    # Force refresh cases from the shared index if needed
     if st.session_state.get('force_refresh', False):
-        st.session_state.cases = load_cases()
+        st.session_state.cases = get_case_index().cases
         st.session_state.force_refresh = False
 
-def show_professional_dashboard():
+@timed("panel.professional_dashboard")
+def show_professional_dashboard(context: DashboardContext):
     """Professional dashboard with advanced analytics"""
     st.markdown("<div class='main-header'>🌍 LegalAI Enterprise Dashboard</div>", unsafe_allow_html=True)
     
@@ -251,14 +270,14 @@ def show_professional_dashboard():
     
     # 🎯 Professional Metrics Grid
     st.markdown("### 📊 Key Performance Indicators")
-    show_metrics_grid(cases)
+    show_metrics_grid(context)
     
     # 📈 Advanced Analytics
     st.markdown("### 📈 Portfolio Analytics")
     tab1, tab2, tab3, tab4 = st.tabs(["📋 Case Overview", "🌐 Jurisdictional Mix", "⚖️ Practice Areas", "📅 Timeline"])
     
     with tab1:
-        show_case_overview_analytics(cases)
+        show_case_overview_analytics(cases, context)
     
     with tab2:
         show_jurisdictional_analytics(cases)
@@ -270,67 +289,55 @@ def show_professional_dashboard():
         show_timeline_analytics(cases)
     
     # 🚨 Urgent Actions
-    show_urgent_actions(cases)
+    show_urgent_actions(context)
     
     # 📱 Recent Activity
-    show_recent_activity(cases)
+    show_recent_activity(context)
 
-def show_metrics_grid(cases):
+@timed("panel.metrics_grid")
+def show_metrics_grid(context: DashboardContext):
     """Professional metrics grid with animations"""
-    stats = get_case_statistics()
-    
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         with st.container():
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Total Cases", stats['total_cases'], 
-                     delta=f"+{len([c for c in cases if calculate_days_since(c['intake_date']) < 7])} this week")
+            st.metric("Total Cases", context.total_cases, 
+                     delta=f"+{context.new_this_week} this week")
             st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         with st.container():
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            active_cases = len([c for c in cases if c['status'] in ['Active', 'Accepted']])
-            st.metric("Active Cases", active_cases, "In Progress")
+            st.metric("Active Cases", context.active_cases, "In Progress")
             st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
         with st.container():
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            total_value = stats['total_value']
-            st.metric("Portfolio Value", f"${total_value/1000000:.1f}M", "Managed")
+            st.metric("Portfolio Value", f"${context.total_value/1000000:.1f}M", "Managed")
             st.markdown('</div>', unsafe_allow_html=True)
     
     with col4:
         with st.container():
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            high_risk = len([c for c in cases if c.get('complexity_score', 0) > 75])
-            st.metric("High Risk", high_risk, delta_color="inverse")
+            st.metric("High Risk", context.high_risk_cases, delta_color="inverse")
             st.markdown('</div>', unsafe_allow_html=True)
     
     with col5:
         with st.container():
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            closed_cases = [c for c in cases if c['status'] == 'Closed']
-            if closed_cases:
-                favorable = len([c for c in closed_cases if c.get('outcome') == 'Favorable'])
-                success_rate = (favorable / len(closed_cases)) * 100
-            else:
-                success_rate = 0
-            st.metric("Success Rate", f"{success_rate:.1f}%", "Tracked")
+            st.metric("Success Rate", f"{context.success_rate:.1f}%", "Tracked")
             st.markdown('</div>', unsafe_allow_html=True)
 
-def show_case_overview_analytics(cases):
+@timed("panel.case_overview_analytics")
+def show_case_overview_analytics(cases, context: DashboardContext):
     """Interactive case overview analytics"""
     col1, col2 = st.columns(2)
     
     with col1:
         # Status distribution with Plotly
-        status_counts = {}
-        for case in cases:
-            status = case['status']
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = context.status_counts
         
         if status_counts:
             fig = px.pie(
@@ -347,7 +354,7 @@ def show_case_overview_analytics(cases):
     
     with col2:
         # Complexity distribution
-        complexity_scores = [c.get('complexity_score', 50) for c in cases]
+        complexity_scores = [c.complexity_score for c in cases]
         if complexity_scores:
             fig = px.histogram(
                 x=complexity_scores,
@@ -362,9 +369,10 @@ def show_case_overview_analytics(cases):
         else:
             st.info("No complexity data available")
 
+@timed("panel.jurisdictional_analytics")
 def show_jurisdictional_analytics(cases):
     """Jurisdictional analytics with maps"""
-    jurisdictions = [case.get('jurisdiction', 'USA') for case in cases]
+    jurisdictions = [case.jurisdiction or 'USA' for case in cases]
     jurisdiction_counts = pd.Series(jurisdictions).value_counts()
     
     col1, col2 = st.columns(2)
@@ -389,23 +397,24 @@ def show_jurisdictional_analytics(cases):
         jurisdictions_to_show = jurisdiction_counts.index[:5] if not jurisdiction_counts.empty else []
         
         for jurisdiction in jurisdictions_to_show:
-            j_cases = [c for c in cases if c.get('jurisdiction') == jurisdiction and c['status'] == 'Closed']
+            j_cases = [c for c in cases if c.jurisdiction == jurisdiction and c.status == 'Closed']
             if j_cases:
-                favorable = len([c for c in j_cases if c.get('outcome') == 'Favorable'])
+                favorable = len([c for c in j_cases if c.outcome == 'Favorable'])
                 success_rate = (favorable / len(j_cases)) * 100
                 
                 st.progress(success_rate/100, text=f"📍 {jurisdiction}: {success_rate:.1f}%")
             else:
                 st.write(f"📍 {jurisdiction}: No closed cases")
 
+@timed("panel.practice_area_analytics")
 def show_practice_area_analytics(cases):
     """Practice area performance analytics"""
     practice_data = []
     for case in cases:
         practice_data.append({
-            'Practice Area': case.get('practice_area', 'Other'),
-            'Value': case.get('matter_value', 0),
-            'Complexity': case.get('complexity_score', 50)
+            'Practice Area': case.practice_area or 'Other',
+            'Value': case.matter_value,
+            'Complexity': case.complexity_score
         })
     
     if practice_data:
@@ -439,13 +448,14 @@ def show_practice_area_analytics(cases):
     else:
         st.info("No practice area data available")
 
+@timed("panel.timeline_analytics")
 def show_timeline_analytics(cases):
     """Timeline and trend analytics"""
     # Convert intake dates to datetime
     intake_dates = []
     for case in cases:
         try:
-            date_obj = datetime.fromisoformat(case['intake_date']).date()
+            date_obj = datetime.fromisoformat(case.intake_date).date()
             intake_dates.append(date_obj)
         except:
             continue
@@ -465,63 +475,54 @@ def show_timeline_analytics(cases):
     else:
         st.info("No timeline data available")
 
-def show_urgent_actions(cases):
+@timed("panel.urgent_actions")
+def show_urgent_actions(context: DashboardContext):
     """Show urgent actions needed"""
-    urgent_cases = [c for c in cases if c.get('urgency') in ['High', 'Critical'] and c['status'] != 'Closed']
-    
-    if urgent_cases:
+    if context.urgent_cases:
         st.markdown("### 🚨 Urgent Attention Required")
         
-        for case in urgent_cases[:3]:
+        for case in context.urgent_cases:
             with st.container():
                 st.markdown('<div class="urgent-case">', unsafe_allow_html=True)
                 
                 col1, col2, col3 = st.columns([3, 2, 1])
                 
                 with col1:
-                    st.write(f"**{case['case_id']}** - {case['client_name']}")
-                    st.write(f"*{case['case_type']}* • {case.get('description', '')[:100]}...")
+                    st.write(f"**{case.case_id}** - {case.client_name}")
+                    st.write(f"*{case.case_type}* • {get_case_snippet(case)}...")
                 
                 with col2:
-                    st.write(f"**Status:** {case['status']}")
-                    st.write(f"**Urgency:** 🔥 {case.get('urgency', 'Medium')}")
-                    st.write(f"**Complexity:** {case.get('complexity_score', 0)}/100")
+                    st.write(f"**Status:** {case.status}")
+                    st.write(f"**Urgency:** 🔥 {case.urgency or 'Medium'}")
+                    st.write(f"**Complexity:** {case.complexity_score}/100")
                 
                 with col3:
-                    if st.button("Review", key=f"review_{case['case_id']}", type="primary"):
-                        st.session_state.current_case_id = case['case_id']
+                    if st.button("Review", key=f"review_{case.case_id}", type="primary"):
+                        st.session_state.current_case_id = case.case_id
                         st.session_state.show_case_detail = True
                         st.session_state.active_tab = "Case Management"
                         rerun()
                 
                 st.markdown('</div>', unsafe_allow_html=True)
 
-def show_recent_activity(cases):
+@timed("panel.recent_activity")
+def show_recent_activity(context: DashboardContext):
     """Show recent activity feed with robust error handling"""
     st.markdown("### 📋 Recent Activity")
     
-    if not cases:
+    if not context.recent_cases:
         st.info("No recent activity to display")
         return
     
-    # Sort cases by last_updated, handle missing dates
-    recent_cases = sorted(
-        cases, 
-        key=lambda x: x.get('last_updated', x.get('intake_date', datetime.now().isoformat())), 
-        reverse=True
-    )[:5]
-    
-    for case in recent_cases:
-        # Safe date calculation with fallbacks
-        last_updated = case.get('last_updated') or case.get('intake_date', datetime.now().isoformat())
-        days_ago = calculate_days_since(last_updated)
-        
-        # Safe field access with fallbacks
-        case_id = case.get('case_id', 'Unknown Case')
-        client_name = case.get('client_name', 'Unknown Client')
-        practice_area = case.get('practice_area', 'General Practice')
-        status = case.get('status', 'Unknown')
-        complexity_score = case.get('complexity_score', 50)
+    recent_ages = ages_in_days(context.recent_cases, now=context.generated_at,
+                               field='last_updated', fallback_field='intake_date')
+    
+    for case, days_ago in zip(context.recent_cases, recent_ages):
+        case_id = case.case_id
+        client_name = case.client_name
+        practice_area = case.practice_area or 'General Practice'
+        status = case.status
+        complexity_score = case.complexity_score
         
         with st.container():
             col1, col2 = st.columns([3, 1])
@@ -540,6 +541,7 @@ def show_recent_activity(cases):
             st.progress(progress_value)
             st.markdown("---")
 
+@timed("panel.professional_client_intake")
 def show_professional_client_intake():
     """Professional client intake with enhanced UX"""
     st.markdown("<div class='main-header'>👥 Professional Client Intake</div>", unsafe_allow_html=True)
@@ -559,7 +561,8 @@ def show_professional_client_intake():
     progress = current_step / (len(progress_steps) - 1) if len(progress_steps) > 1 else 0
     st.progress(progress, text=f"Step {current_step + 1} of {len(progress_steps)}: {progress_steps[current_step]}")
     
-    # Tab-based interface
+    # Tab-based interface - each step is a fragment, so typing into one step
+    # only reruns that step; saving a step reruns the app to advance the tracker
     tab1, tab2, tab3, tab4 = st.tabs(["🏢 Client Profile", "⚖️ Case Details", "🌐 Jurisdiction", "🤖 AI Analysis"])
     
     with tab1:
@@ -574,6 +577,8 @@ def show_professional_client_intake():
     with tab4:
         show_ai_analysis_step()
 
+@fragment
+@timed("panel.enhanced_client_profile")
 def show_enhanced_client_profile():
     """Enhanced client profile with better validation"""
     st.subheader("🏢 Client Information")
@@ -684,6 +689,8 @@ def validate_and_save_client_profile(first_name, last_name, email, company_name,
         time.sleep(1.5)
         rerun()
 
+@fragment
+@timed("panel.enhanced_case_details")
 def show_enhanced_case_details():
     """Enhanced case details for enterprise"""
     st.subheader("⚖️ Case Details")
@@ -733,6 +740,8 @@ def show_enhanced_case_details():
         else:
             st.error("Please complete all required fields")
 
+@fragment
+@timed("panel.jurisdictional_intake")
 def show_jurisdictional_intake():
     """Jurisdictional analysis intake"""
     st.subheader("🌐 Jurisdictional Analysis")
@@ -771,6 +780,8 @@ def show_jurisdictional_intake():
         time.sleep(1.5)
         rerun()
 
+@fragment
+@timed("panel.ai_analysis_step")
 def show_ai_analysis_step():
     """AI analysis step"""
     st.subheader("🤖 AI Legal Analysis")
@@ -794,13 +805,14 @@ def show_ai_analysis_step():
             st.session_state.complexity_score = complexity_score
             
             st.success("✅ AI Analysis Complete!")
-            
-            # Display results
-            st.subheader("AI Analysis Results")
-            st.write(ai_analysis)
-            
-            if st.button("✅ Create Case", type="primary", key="create_case_final"):
-                create_new_case()
+    
+    # Results persist across fragment reruns so the Create button stays reachable
+    if 'ai_analysis' in st.session_state:
+        st.subheader("AI Analysis Results")
+        st.write(st.session_state.ai_analysis)
+        
+        if st.button("✅ Create Case", type="primary", key="create_case_final"):
+            create_new_case()
 
 def create_new_case():
     """Create a new case from the intake data"""
@@ -836,12 +848,11 @@ def create_new_case():
         }
         
         # Save case
-        cases = load_cases()
-        cases.append(new_case)
-        save_cases(cases)
+        if not add_case(new_case):
+            st.error("Could not save the new case. Please try again.")
+            return
         
         # Update session state
-        st.session_state.cases = cases
         st.session_state.force_refresh = True
         
         st.balloons()
@@ -858,6 +869,7 @@ def create_new_case():
     except Exception as e:
         st.error(f"Error creating case: {str(e)}")
 
+@timed("panel.enhanced_case_management")
 def show_enhanced_case_management():
     """Enhanced case management with professional features"""
     st.markdown("<div class='main-header'>📋 Professional Case Management</div>", unsafe_allow_html=True)
@@ -887,7 +899,6 @@ def show_enhanced_case_management():
                 )
     with col2:
         if st.button("🔄 Refresh Data", use_container_width=True):
-            st.session_state.cases = load_cases()
             st.session_state.force_refresh = True
             st.success("Data refreshed!")
             time.sleep(1)
@@ -903,47 +914,48 @@ def show_enhanced_case_management():
     st.markdown("---")
     
     # Display cases
-    for case in cases:
+    case_ages = ages_in_days(cases)
+    for case, days_since in zip(cases, case_ages):
         with st.container():
             st.markdown('<div class="enterprise-card">', unsafe_allow_html=True)
             
             col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
             
             with col1:
-                st.write(f"**{case.get('case_id', 'Unknown')}** - {case.get('client_name', 'Unknown Client')}")
-                st.write(f"*{case.get('practice_area', 'General Practice')}* • {case.get('case_type', '')}")
-                st.write(f"{case.get('description', '')[:100]}...")
+                st.write(f"**{case.case_id}** - {case.client_name}")
+                st.write(f"*{case.practice_area or 'General Practice'}* • {case.case_type or ''}")
+                st.write(f"{get_case_snippet(case)}...")
             
             with col2:
-                status_color = get_status_color(case.get('status', 'Unknown'))
-                st.markdown(f"**Status:** <span style='color:{status_color}'>{case.get('status', 'Unknown')}</span>", unsafe_allow_html=True)
-                st.write(f"**Urgency:** {case.get('urgency', 'Medium')}")
-                st.write(f"**Value:** {format_currency(case.get('matter_value', 0))}")
+                status_color = get_status_color(case.status)
+                st.markdown(f"**Status:** <span style='color:{status_color}'>{case.status}</span>", unsafe_allow_html=True)
+                st.write(f"**Urgency:** {case.urgency or 'Medium'}")
+                st.write(f"**Value:** {format_currency(case.matter_value)}")
             
             with col3:
-                days_since = calculate_days_since(case.get('intake_date', datetime.now().isoformat()))
                 st.write(f"**Age:** {days_since}d")
             
             with col4:
                 col4a, col4b = st.columns(2)
                 with col4a:
-                    if st.button("👁️", key=f"view_{case.get('case_id', '')}", help="View Details"):
-                        st.session_state.current_case_id = case.get('case_id', '')
+                    if st.button("👁️", key=f"view_{case.case_id}", help="View Details"):
+                        st.session_state.current_case_id = case.case_id
                         st.session_state.show_case_detail = True
                         rerun()
                 with col4b:
-                    if st.button("⚙️", key=f"manage_{case.get('case_id', '')}", help="Manage Case"):
-                        st.session_state.current_case_id = case.get('case_id', '')
+                    if st.button("⚙️", key=f"manage_{case.case_id}", help="Manage Case"):
+                        st.session_state.current_case_id = case.case_id
                         st.session_state.show_case_detail = True
                         rerun()
             
             st.markdown('</div>', unsafe_allow_html=True)
 
+@timed("panel.case_detail_view")
 def show_case_detail_view():
     """Show detailed view of a specific case"""
     case_id = st.session_state.current_case_id
     cases = st.session_state.cases
-    case = next((c for c in cases if c.get('case_id') == case_id), None)
+    case = next((c for c in cases if c.case_id == case_id), None)
     
     if not case:
         st.error("Case not found")
@@ -964,73 +976,196 @@ def show_case_detail_view():
     
     with col1:
         st.subheader("👤 Client Information")
-        st.write(f"**Client:** {case.get('client_name', 'N/A')}")
-        st.write(f"**Company:** {case.get('company_name', 'N/A')}")
-        st.write(f"**Email:** {case.get('email', 'N/A')}")
-        st.write(f"**Phone:** {case.get('phone', 'N/A')}")
+        st.write(f"**Client:** {case.client_name}")
+        st.write(f"**Company:** {case.company_name or 'N/A'}")
+        st.write(f"**Email:** {case.email or 'N/A'}")
+        st.write(f"**Phone:** {case.phone or 'N/A'}")
         
         st.subheader("⚖️ Case Information")
-        st.write(f"**Practice Area:** {case.get('practice_area', 'N/A')}")
-        st.write(f"**Case Type:** {case.get('case_type', 'N/A')}")
-        st.write(f"**Description:** {case.get('description', 'N/A')}")
+        st.write(f"**Practice Area:** {case.practice_area or 'N/A'}")
+        st.write(f"**Case Type:** {case.case_type or 'N/A'}")
+        st.write(f"**Description:** {get_case_description(case) or 'N/A'}")
     
     with col2:
-        st.subheader("📊 Case Status")
-        status = case.get('status', 'Unknown')
-        status_color = get_status_color(status)
-        st.markdown(f"**Status:** <span style='color:{status_color}; font-size: 1.2em;'>{status}</span>", unsafe_allow_html=True)
-        
-        st.write(f"**Urgency:** {case.get('urgency', 'Medium')}")
-        st.write(f"**Complexity Score:** {case.get('complexity_score', 0)}/100")
-        st.write(f"**Matter Value:** {format_currency(case.get('matter_value', 0))}")
-        st.write(f"**Jurisdiction:** {case.get('jurisdiction', 'N/A')}")
-        st.write(f"**Legal System:** {case.get('legal_system', 'N/A')}")
-        st.write(f"**Intake Date:** {case.get('intake_date', 'N/A')}")
-    
-    # Case management actions
+        st.subheader("📊 Case Profile")
+        st.write(f"**Urgency:** {case.urgency or 'Medium'}")
+        st.write(f"**Complexity Score:** {case.complexity_score}/100")
+        st.write(f"**Matter Value:** {format_currency(case.matter_value)}")
+        st.write(f"**Jurisdiction:** {case.jurisdiction or 'N/A'}")
+        st.write(f"**Legal System:** {case.legal_system or 'N/A'}")
+        st.write(f"**Intake Date:** {case.intake_date or 'N/A'}")
+    
+    # Case management actions - each panel is a fragment with its own reruns
     st.markdown("---")
     st.subheader("🛠️ Case Management")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        new_status = st.selectbox("Update Status", 
-                                 ["Intake", "Review", "Accepted", "Active", "Closed", "Declined"],
-                                 index=["Intake", "Review", "Accepted", "Active", "Closed", "Declined"].index(status) if status in ["Intake", "Review", "Accepted", "Active", "Closed", "Declined"] else 0)
-        
-        if st.button("Update Status", use_container_width=True) and new_status != status:
-            if update_case_status(case_id, new_status):
-                st.success(f"Status updated to {new_status}")
-                st.session_state.cases = load_cases()
-                st.session_state.force_refresh = True
-                time.sleep(1)
-                rerun()
-            else:
-                st.error("Failed to update status")
+        show_case_status_panel(case_id)
     
     with col2:
-        st.text_area("Add Note", key=f"note_{case_id}", placeholder="Add case notes...")
-        if st.button("Save Note", use_container_width=True):
-            note = st.session_state.get(f"note_{case_id}", "")
-            if note and add_case_note(case_id, note):
-                st.success("Note added successfully")
-                st.session_state[f"note_{case_id}"] = ""
-                time.sleep(1)
-                rerun()
+        show_case_notes_panel(case_id)
     
     with col3:
-        if st.button("🗑️ Delete Case", type="secondary", use_container_width=True):
-            if delete_case(case_id):
-                st.success("Case deleted successfully")
-                st.session_state.show_case_detail = False
-                st.session_state.current_case_id = None
-                st.session_state.cases = load_cases()
-                st.session_state.force_refresh = True
-                time.sleep(1)
+        show_case_delete_panel(case_id)
+
+@fragment
+@timed("panel.case_status_panel")
+def show_case_status_panel(case_id: str):
+    """Status display and update, rerun independently of the detail view"""
+    # Fragment reruns skip render_app, so read the shared index rather than the session snapshot
+    case = next((c for c in get_case_index().cases if c.case_id == case_id), None)
+    status = case.status if case else 'Unknown'
+    status_color = get_status_color(status)
+    st.markdown(f"**Status:** <span style='color:{status_color}; font-size: 1.2em;'>{status}</span>", unsafe_allow_html=True)
+    
+    status_options = ["Intake", "Review", "Accepted", "Active", "Closed", "Declined"]
+    new_status = st.selectbox("Update Status", status_options,
+                              index=status_options.index(status) if status in status_options else 0,
+                              key=f"status_select_{case_id}")
+    
+    if st.button("Update Status", use_container_width=True, key=f"update_status_{case_id}") and new_status != status:
+        if update_case_status(case_id, new_status):
+            st.success(f"Status updated to {new_status}")
+            st.session_state.force_refresh = True
+            time.sleep(1)
+            rerun(scope="fragment")
+        else:
+            st.error("Failed to update status")
+
+@fragment
+@timed("panel.case_notes_panel")
+def show_case_notes_panel(case_id: str):
+    """Case notes list and entry form, rerun independently of the detail view"""
+    with st.form(f"note_form_{case_id}", clear_on_submit=True):
+        note = st.text_area("Add Note", placeholder="Add case notes...")
+        submitted = st.form_submit_button("Save Note", use_container_width=True)
+    
+    if submitted and note:
+        if add_case_note(case_id, note):
+            st.success("Note added successfully")
+        else:
+            st.error("Failed to save note")
+    
+    for case_note in get_case_notes(case_id)[:5]:
+        st.caption(f"{case_note.timestamp[:16]} • {case_note.author}")
+        st.write(case_note.content)
+
+@fragment
+@timed("panel.case_delete_panel")
+def show_case_delete_panel(case_id: str):
+    """Case deletion; leaves the detail view, so it reruns the whole app"""
+    if st.button("🗑️ Delete Case", type="secondary", use_container_width=True, key=f"delete_case_{case_id}"):
+        if delete_case(case_id):
+            st.success("Case deleted successfully")
+            st.session_state.show_case_detail = False
+            st.session_state.current_case_id = None
+            st.session_state.force_refresh = True
+            time.sleep(1)
+            rerun()
+        else:
+            st.error("Failed to delete case")
+
+@timed("panel.time_tracking")
+def show_time_tracking():
+    """Time entry, billing rollups and bulk invoicing"""
+    st.markdown("<div class='main-header'>⏱️ Time Tracking & Billing</div>", unsafe_allow_html=True)
+    
+    rollups = get_billing_rollups().snapshot()
+    totals = rollups['totals']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hours Logged", f"{totals['hours']:,.1f}")
+    with col2:
+        st.metric("Total Billable", format_currency(totals['amount']))
+    with col3:
+        st.metric("Unbilled Hours", f"{totals['unbilled_hours']:,.1f}")
+    with col4:
+        st.metric("Unbilled Amount", format_currency(totals['unbilled_amount']))
+    
+    show_time_entry_form()
+    
+    st.subheader("📊 Billing Rollups")
+    by_case, by_user, by_period = st.tabs(["By Case", "By Timekeeper", "By Month"])
+    with by_case:
+        show_rollup_table(rollup_table(rollups['by_case'], 'case_id'))
+    with by_user:
+        show_rollup_table(rollup_table(rollups['by_user'], 'user'))
+    with by_period:
+        show_rollup_table(sorted(rollup_table(rollups['by_period'], 'month'), key=lambda row: row['month'], reverse=True))
+    
+    show_invoicing_panel()
+
+def show_rollup_table(rows: List[Dict]):
+    if rows:
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No time logged yet")
+
+@fragment
+@timed("panel.time_entry_form")
+def show_time_entry_form():
+    """Log time against a case at the timekeeper's standard rate"""
+    st.subheader("📝 Log Time")
+    cases = st.session_state.cases
+    if not cases:
+        st.info("Create a case before logging time.")
+        return
+    
+    rates = ENTERPRISE_CONFIG['hourly_rates']
+    case_labels = {case.case_id: f"{case.client_name} • {case.case_id}" for case in cases}
+    with st.form("time_entry_form", clear_on_submit=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            case_id = st.selectbox("Case", list(case_labels), format_func=case_labels.get)
+            task = st.text_input("Task Description")
+        with col2:
+            role = st.selectbox("Timekeeper Role", list(rates), format_func=lambda r: f"{r} (${rates[r]}/hr)")
+            hours = st.number_input("Hours", min_value=0.1, max_value=24.0, value=1.0, step=0.1)
+            work_date = st.date_input("Date", value=datetime.now().date())
+        
+        if st.form_submit_button("Log Time", type="primary"):
+            if not task.strip():
+                st.error("Please describe the work performed")
+            elif add_time_entry(case_id, task.strip(), round(hours, 2), work_date.isoformat(),
+                                rate=rates[role], user=st.session_state.user_name):
+                st.success(f"Logged {hours:.1f}h ({format_currency(hours * rates[role])})")
                 rerun()
             else:
-                st.error("Failed to delete case")
+                st.error("Failed to log time")
 
+@fragment
+@timed("panel.invoicing")
+def show_invoicing_panel():
+    """Bulk invoice generation from unbilled time"""
+    st.subheader("🧾 Invoicing")
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        through = st.date_input("Invoice work up to", value=datetime.now().date(), key="invoice_through")
+    with col2:
+        st.write("")
+        generate = st.button("Generate Invoices", type="primary", use_container_width=True)
+    
+    if generate:
+        invoices = generate_invoices(through_date=through.isoformat(), issued_by=st.session_state.user_name)
+        if invoices:
+            st.success(f"Issued {len(invoices)} invoice(s) totalling "
+                       f"{format_currency(sum(invoice['amount'] for invoice in invoices))}")
+            rerun()
+        else:
+            st.info("No unbilled time to invoice")
+    
+    invoices = load_invoices()
+    if invoices:
+        recent = pd.DataFrame(invoices[-20:][::-1])
+        st.dataframe(recent[['invoice_id', 'client_name', 'case_id', 'hours', 'amount',
+                             'period_start', 'period_end', 'status']],
+                     hide_index=True, use_container_width=True)
+    else:
+        st.caption("No invoices issued yet")
+
+@timed("panel.case_statistics")
 def show_case_statistics():
     """Display case statistics"""
     stats = get_case_statistics()
@@ -1062,14 +1197,152 @@ def show_empty_state():
             st.session_state.active_tab = "Client Intake"
             rerun()
 
+def can_view_diagnostics() -> bool:
+    return st.session_state.get('user_role') in config.DIAGNOSTICS_ROLES
+
+@timed("panel.settings")
+def show_settings():
+    """Settings module; performance diagnostics are limited to config.DIAGNOSTICS_ROLES"""
+    st.markdown("<div class='main-header'>⚙️ Settings</div>", unsafe_allow_html=True)
+    if not can_view_diagnostics():
+        st.info("🚧 Firm settings are under development. Performance diagnostics are not available to your role.")
+        return
+    show_diagnostics()
+
+@timed("panel.analytics")
+def show_analytics():
+    """Analytics module; until portfolio analytics land it shows the app's own performance"""
+    st.markdown("<div class='main-header'>📊 Analytics</div>", unsafe_allow_html=True)
+    if not can_view_diagnostics():
+        st.info("🚧 Portfolio analytics are under development. Performance diagnostics are not available to your role.")
+        return
+    show_diagnostics()
+
+def show_diagnostics():
+    """Live performance diagnostics for this server process"""
+    st.subheader("🩺 Performance Diagnostics")
+    
+    summary = rerun_summary()
+    version = data_version()
+    storage = storage_usage()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Reruns Recorded", summary['count'])
+    with col2:
+        st.metric("Mean Rerun", f"{summary['mean_ms']} ms")
+    with col3:
+        st.metric("Data Version", version['version'] or "n/a", help=f"cases.json modified {version['modified']}")
+    with col4:
+        st.metric("Cases Indexed", version['cases'])
+    
+    st.markdown("#### 🐢 Slowest Reruns")
+    reruns = slowest_reruns()
+    if reruns:
+        st.dataframe(pd.DataFrame(reruns), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No reruns recorded yet")
+    
+    st.markdown("#### 🗃️ Cache Hit Rates")
+    st.dataframe(pd.DataFrame(cache_stats()), hide_index=True, use_container_width=True)
+    
+    st.markdown("#### 💾 Storage")
+    files = [{'file': name, 'size': format_bytes(size), 'format': storage['formats'][name] or '—'}
+             for name, size in storage['files'].items()]
+    files.append({'file': f"blobs/ ({storage['blobs']})", 'size': format_bytes(storage['blobs_bytes']), 'format': '—'})
+    files.append({'file': 'backups/', 'size': format_bytes(storage['backups_bytes']), 'format': '—'})
+    st.dataframe(pd.DataFrame(files), hide_index=True, use_container_width=True)
+    st.caption(f"Disk: {format_bytes(storage['disk_used'])} used of {format_bytes(storage['disk_total'])} • "
+               f"writing {config.DATA_FORMAT}"
+               + (f" + {config.DATA_COMPRESSION}" if config.DATA_COMPRESSION != 'none' else ""))
+    
+    st.markdown("#### 🔁 Billing Rollup Reconciler")
+    reconciler = get_reconciler_status()
+    last = reconciler['last_result']
+    st.caption(f"{'Running' if reconciler['running'] else 'Stopped'} • every {config.ROLLUP_RECONCILE_INTERVAL}s"
+               + (f" • last pass {last['at'][:19]}: {last['checked']} cases, {len(last['drifted'])} drifted"
+                  if last and last['at'] else ""))
+    if st.button("Reconcile now", key="diagnostics_reconcile"):
+        result = reconcile_case_rollups()
+        if result['drifted']:
+            st.warning(f"Repaired time and billing counters on {len(result['drifted'])} case(s)")
+        else:
+            st.success(f"All {result['checked']} cases match the billing rollups")
+    
+    st.markdown("#### ⏱️ Parse & Operation Times")
+    recording = st.toggle("Record operation metrics", value=metrics_enabled(), key="diagnostics_metrics")
+    if recording != metrics_enabled():
+        enable_metrics(recording)
+    operations = operation_stats()
+    if operations:
+        parse_ops = [row for row in operations if row['operation'].startswith('database.load_')]
+        if parse_ops:
+            st.dataframe(pd.DataFrame(parse_ops), hide_index=True, use_container_width=True)
+        with st.expander("All operations"):
+            st.dataframe(pd.DataFrame(operations), hide_index=True, use_container_width=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📥 Prometheus metrics", export_prometheus(), "legalai_metrics.prom", "text/plain")
+        with col2:
+            st.download_button("📥 JSON metrics", export_json(), "legalai_metrics.json", "application/json")
+    else:
+        st.caption("No operations recorded yet. Enable recording (or set LEGALAI_METRICS=true) and use the app.")
+    
+    st.markdown("#### 🧵 Recent Traces")
+    tracing_on = st.toggle("Trace reruns", value=tracing_enabled(), key="diagnostics_tracing")
+    if tracing_on != tracing_enabled():
+        enable_tracing(tracing_on)
+    traces = recent_traces()
+    if traces:
+        labels = [f"{spans[0]['name']} • {spans[0]['attributes'].get('page', '')} • "
+                  f"{(spans[0]['end_time_unix_nano'] - spans[0]['start_time_unix_nano']) / 1e6:.1f} ms"
+                  for spans in traces]
+        selected = st.selectbox("Trace", range(len(traces)), format_func=lambda i: labels[i],
+                                key="diagnostics_trace")
+        st.code(format_timeline(traces[selected]), language=None)
+    else:
+        st.caption("No traces recorded yet. Enable tracing (or set LEGALAI_TRACING=true) and use the app.")
+    
+    st.markdown("#### 👥 Active Sessions")
+    sessions = active_sessions()
+    if sessions:
+        for session in sessions:
+            state_bytes = session.pop('state_bytes', None)
+            session['memory'] = format_bytes(state_bytes) if state_bytes is not None else '—'
+        st.dataframe(pd.DataFrame(sessions), hide_index=True, use_container_width=True)
+    else:
+        st.caption("Session details are only available when running under `streamlit run`")
+
 def main():
-    """Main application entry point"""
+    """Main application entry point; with tracing on, each rerun is one trace"""
+    rerun_started = time.perf_counter()
+    start_rollup_reconciler(config.ROLLUP_RECONCILE_INTERVAL)
+    ensure_descriptions_migrated()
+    ensure_invoices_recovered()
+    app_mode = None
+    try:
+        with track("app.rerun"):
+            app_mode = render_app()
+    finally:
+        # Runs ended by st.rerun()/st.stop() count too; they unwind before render_app returns
+        app_mode = app_mode or st.session_state.get('professional_navigation')
+        if app_mode and st.session_state.get('authenticated', False):
+            elapsed = time.perf_counter() - rerun_started
+            record_rerun(app_mode, elapsed, st.session_state.get('user_name'), state_size(st.session_state))
+
+def render_app() -> Optional[str]:
+    """Render the sidebar and the selected module; returns the module shown"""
     initialize_session_state()
     
     # Authentication check
     if not st.session_state.get('authenticated', False):
         login_form()
-        return
+        return None
+    
+    # One pass over the cases feeds the sidebar and every dashboard widget. The KPIs,
+    # the urgent/recent lists and the pages all read the snapshot the index was built from.
+    index = get_case_index()
+    st.session_state.cases = index.cases
+    context = build_dashboard_context(index.cases, index=index)
     
     # Professional Sidebar
     with st.sidebar:
@@ -1099,20 +1372,17 @@ def main():
             key="professional_navigation",
             label_visibility="collapsed"
         )
+        set_span_attributes(page=app_mode, user=st.session_state.user_name)
         
         # Quick Stats
         st.markdown("---")
         st.subheader("📈 Quick Stats")
-        cases = st.session_state.cases
-        if cases:
-            active_cases = len([c for c in cases if c['status'] in ['Active', 'Accepted']])
-            total_value = sum([c.get('matter_value', 0) for c in cases])
-            
+        if context.total_cases:
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Active", active_cases)
+                st.metric("Active", context.active_cases)
             with col2:
-                st.metric("Value", f"${total_value/1000000:.1f}M")
+                st.metric("Value", f"${context.total_value/1000000:.1f}M")
         else:
             st.write("No cases yet")
         
@@ -1120,17 +1390,26 @@ def main():
         st.markdown("---")
         st.subheader("🟢 System Status")
         st.caption("All systems operational")
-        st.progress(0.95, text="Storage: 95%")
+        storage = storage_summary()
+        st.progress(min(storage['disk_fraction'], 1.0),
+                    text=f"Disk: {storage['disk_fraction']:.0%} used • Data files {format_bytes(storage['data_bytes'])}")
     
     # Main Content Router
     if "Dashboard" in app_mode:
-        show_professional_dashboard()
+        show_professional_dashboard(context)
     elif "Client Intake" in app_mode:
         show_professional_client_intake()
     elif "Case Management" in app_mode:
         show_enhanced_case_management()
+    elif "Time Tracking" in app_mode:
+        show_time_tracking()
+    elif "Analytics" in app_mode:
+        show_analytics()
+    elif "Settings" in app_mode:
+        show_settings()
     else:
         st.info("🚧 Module under development - Check back soon!")
+    return app_mode
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
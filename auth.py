@@ -1,6 +1,18 @@
 import streamlit as st
+import base64
 import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
+from typing import Dict, Hashable, NamedTuple, Optional
+
+from config import config
+
+PASSWORD_SCHEME = 'pbkdf2_sha256'
 
 def init_authentication():
     """Initialize authentication system"""
@@ -11,42 +23,209 @@ def init_authentication():
     if 'user_name' not in st.session_state:
         st.session_state.user_name = 'Guest User'
 
-def hash_password(password):
-    """Hash password for security"""
-    return hashlib.sha256(password.encode()).hexdigest()
+def hash_password(password: str, salt: bytes = None, iterations: int = None) -> str:
+    """Hash password with salted PBKDF2-SHA256, encoded as scheme$iterations$salt$hash"""
+    salt = salt or secrets.token_bytes(16)
+    iterations = iterations or config.PASSWORD_HASH_ITERATIONS
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return '$'.join([
+        PASSWORD_SCHEME, str(iterations),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode()
+    ])
+
+def verify_password(password: str, encoded: str) -> bool:
+    """Check a password against an encoded hash in constant time"""
+    try:
+        scheme, iterations, salt, expected = encoded.split('$')
+        if scheme != PASSWORD_SCHEME:
+            return False
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations))
+        return hmac.compare_digest(digest, base64.b64decode(expected))
+    except (ValueError, TypeError):
+        return False
+
+class CredentialStore:
+    """User records with precomputed password hashes, loaded once per process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.users = self._load()
+        # Unknown users are checked against this so they cost the same KDF work
+        self._dummy_hash = hash_password(secrets.token_urlsafe(16))
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error loading credentials from {self.path}: {e}")
+            return {}
+
+    def verify(self, username: str, password: str) -> Optional[Dict]:
+        """Return the user's profile if the password matches, running the KDF for this user only"""
+        user = self.users.get(username)
+        encoded = user['password_hash'] if user else self._dummy_hash
+        if verify_password(password, encoded) and user:
+            return {key: value for key, value in user.items() if key != 'password_hash'}
+        return None
+
+_credential_store = None
+_credential_store_lock = threading.Lock()
+
+def get_credential_store() -> CredentialStore:
+    """Load the credential store on first use and reuse it afterwards"""
+    global _credential_store
+    if _credential_store is None:
+        with _credential_store_lock:
+            if _credential_store is None:
+                _credential_store = CredentialStore(config.CREDENTIALS_PATH)
+    return _credential_store
 
 def check_credentials(username, password):
     """Check user credentials with professional roles"""
-    users = {
-        'admin': {
-            'password_hash': hash_password('admin123'),
-            'role': 'Administrator',
-            'name': 'System Admin',
-            'permissions': ['all']
-        },
-        'partner': {
-            'password_hash': hash_password('partner123'),
-            'role': 'Senior Partner', 
-            'name': 'Legal Partner',
-            'permissions': ['cases', 'clients', 'billing', 'reports']
-        },
-        'associate': {
-            'password_hash': hash_password('associate123'),
-            'role': 'Legal Associate',
-            'name': 'Junior Associate',
-            'permissions': ['cases', 'clients']
-        },
-        'demo': {
-            'password_hash': hash_password('demo123'),
-            'role': 'Demo User',
-            'name': 'Demo Account',
-            'permissions': ['cases', 'clients', 'reports']
-        }
-    }
-    
-    if username in users and users[username]['password_hash'] == hash_password(password):
-        return users[username]
-    return None
+    return get_credential_store().verify(username, password)
+
+# Verified sessions: token -> (user profile, expiry), shared by all sessions in the process
+_session_tokens: Dict[str, tuple] = {}
+_session_tokens_lock = threading.Lock()
+
+def issue_session_token(user_data: Dict, ttl: int = None) -> str:
+    """Remember a verified login so reruns can skip password verification
+
+    Tokens of sessions that never come back are only seen here, so each
+    login also sweeps out the tokens that have expired.
+    """
+    token = secrets.token_urlsafe(32)
+    now = time.monotonic()
+    expires_at = now + (ttl or config.SESSION_TOKEN_TTL)
+    with _session_tokens_lock:
+        for stale in [key for key, (_, expiry) in _session_tokens.items() if expiry <= now]:
+            del _session_tokens[stale]
+        _session_tokens[token] = (user_data, expires_at)
+    return token
+
+def validate_session_token(token: str) -> Optional[Dict]:
+    """Return the user for a live session token, or None if unknown or expired"""
+    if not token:
+        return None
+    with _session_tokens_lock:
+        entry = _session_tokens.get(token)
+        if entry and entry[1] <= time.monotonic():
+            del _session_tokens[token]
+            entry = None
+    return entry[0] if entry else None
+
+def revoke_session_token(token: str):
+    """Forget a session token, e.g. on logout"""
+    with _session_tokens_lock:
+        _session_tokens.pop(token, None)
+
+class TokenBucket:
+    """Allowance of attempts that refills continuously up to its capacity"""
+
+    def __init__(self, capacity: int, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def consume(self, tokens: int = 1) -> bool:
+        """Take tokens if available; callers hold the throttle lock"""
+        self._refill(time.monotonic())
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+class LoginThrottle:
+    """Token buckets keyed by username or by client IP"""
+
+    def __init__(self, attempts: int, per_seconds: float, max_keys: int = 10000):
+        self.attempts = attempts
+        self.refill_per_second = attempts / per_seconds
+        self.max_keys = max_keys
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: Hashable) -> bool:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    # Full buckets carry no state worth keeping
+                    self._buckets = {k: b for k, b in self._buckets.items() if not b.is_full()}
+                bucket = self._buckets[key] = TokenBucket(self.attempts, self.refill_per_second)
+            return bucket.consume()
+
+class LoginResult(NamedTuple):
+    status: str  # 'ok', 'invalid', 'throttled' or 'busy'
+    user: Optional[Dict] = None
+
+class LoginVerifier:
+    """Runs password verification on a small worker pool, off the Streamlit script threads
+
+    Attempts are throttled per username, and per client IP, before any KDF
+    work is queued. The user buckets are keyed on the username alone, so an
+    attack spread over many addresses still drains one allowance; their
+    burst is larger than a person retrying a typo needs. At most
+    `queue_size` verifications may be waiting or running; anything beyond
+    that is rejected immediately so a credential-stuffing burst cannot
+    starve legitimate logins.
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = None, timeout: float = None):
+        self.timeout = timeout or config.LOGIN_TIMEOUT
+        self._executor = ThreadPoolExecutor(max_workers=workers or config.LOGIN_WORKERS,
+                                            thread_name_prefix='login-verify')
+        self._slots = threading.BoundedSemaphore(queue_size or config.LOGIN_QUEUE_SIZE)
+        self.user_throttle = LoginThrottle(*config.LOGIN_ATTEMPTS_PER_USER)
+        self.ip_throttle = LoginThrottle(*config.LOGIN_ATTEMPTS_PER_IP)
+
+    def _verify(self, username: str, password: str) -> Optional[Dict]:
+        try:
+            return check_credentials(username, password)
+        finally:
+            self._slots.release()
+
+    def verify(self, username: str, password: str, client_ip: str = None) -> LoginResult:
+        if client_ip and not self.ip_throttle.allow(client_ip):
+            return LoginResult('throttled')
+        if not self.user_throttle.allow(username):
+            return LoginResult('throttled')
+        if not self._slots.acquire(blocking=False):
+            return LoginResult('busy')
+
+        future = self._executor.submit(self._verify, username, password)
+        try:
+            user = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            return LoginResult('busy')
+        return LoginResult('ok', user) if user else LoginResult('invalid')
+
+_login_verifier = None
+_login_verifier_lock = threading.Lock()
+
+def get_login_verifier() -> LoginVerifier:
+    """Create the process-wide login verifier on first use"""
+    global _login_verifier
+    if _login_verifier is None:
+        with _login_verifier_lock:
+            if _login_verifier is None:
+                _login_verifier = LoginVerifier()
+    return _login_verifier
+
+def get_client_ip() -> Optional[str]:
+    """Client IP of the current Streamlit session, when the runtime exposes it"""
+    context = getattr(st, 'context', None)
+    return getattr(context, 'ip_address', None) if context is not None else None
 
 def login_form():
     """Professional login form with animations"""
@@ -85,8 +264,15 @@ def login_form():
         submitted = st.form_submit_button("Login to System", type="primary", use_container_width=True)
         
         if submitted:
-            user_data = check_credentials(username, password)
-            if user_data:
+            result = get_login_verifier().verify(username, password, get_client_ip())
+            user_data = result.user
+            if result.status == 'throttled':
+                st.error("⏳ Too many login attempts. Please wait a minute and try again.")
+            elif result.status == 'busy':
+                st.warning("🚦 The login service is busy. Please try again in a moment.")
+            elif user_data:
+                ttl = config.REMEMBER_ME_TTL if remember_me else config.SESSION_TOKEN_TTL
+                st.session_state.auth_token = issue_session_token(user_data, ttl)
                 st.session_state.authenticated = True
                 st.session_state.user_role = user_data['role']
                 st.session_state.user_name = user_data['name']
@@ -109,7 +295,10 @@ def login_form():
 
 def require_auth():
     """Decorator to require authentication"""
-    if not st.session_state.get('authenticated', False):
-        login_form()
-        st.stop()
-    return True
\ No newline at end of file
+    # A live token means this session already verified its password
+    token = st.session_state.get('auth_token')
+    if st.session_state.get('authenticated', False) and (token is None or validate_session_token(token)):
+        return True
+    st.session_state.authenticated = False
+    login_form()
+    st.stop()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""Throughput benchmark and profiler for the matter analyzer and AI report generators
+
+Usage:
+    python benchmarks/bench_analysis.py
+    python benchmarks/bench_analysis.py --repeat 200 --profile
+    python benchmarks/bench_analysis.py --pyinstrument   # needs `pip install pyinstrument`
+
+The simulated analysis delay is switched off so only real compute is
+measured. Descriptions range from a 50-word intake note to a 20 KB
+statement of facts. Results go to benchmarks/results/ as JSON.
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+from contextlib import contextmanager
+from typing import Dict
+
+from harness import RESULTS_DIR, compare, measure, print_table, write_results
+
+import ai_analysis  # noqa: E402
+from ai_processor import LegalAIAnalyzer  # noqa: E402
+
+SENTENCES = [
+    "The client entered into a commercial lease agreement with the landlord for office property downtown.",
+    "The employer terminated the employee after a harassment complaint and withheld final wage payments.",
+    "Our client alleges breach of contract and seeks to enforce the payment obligation under the terms.",
+    "The startup plans to incorporate as an LLC and needs advice on business formation and compliance.",
+    "A competitor is using a confusingly similar trademark and may infringe the client's copyright.",
+    "The respondent filed a notice of appeal and the court ordered funds held in a joint account.",
+    "Regulators opened an audit and the government requested documents about the compliance program.",
+    "The tenant disputes the mortgage assignment and zoning approval required for the renovation.",
+    "Opposing counsel proposed a settlement, but the claim involves multiple parties and complex discovery.",
+    "The lawsuit seeks damages for discrimination and an injunction preventing further retaliation.",
+]
+# Target sizes: short intake note, typical summary, detailed brief, full statement of facts
+CORPUS_SIZES = {"50_words": 50, "250_words": 250, "1000_words": 1000, "20kb": None}
+CORPUS_BYTES = 20 * 1024
+
+STAGES = [
+    ("classify_matter", lambda a, d, dl, u: a._classify_matter(dl, "Other")),
+    ("determine_priority", lambda a, d, dl, u: a._determine_priority(u, dl)),
+    ("assess_complexity", lambda a, d, dl, u: a._assess_complexity(d)),
+    ("recommend_practice_area", lambda a, d, dl, u: a._recommend_practice_area(dl)),
+    ("recommend_attorney", lambda a, d, dl, u: a._recommend_attorney(dl)),
+    ("extract_legal_issues", lambda a, d, dl, u: a._extract_legal_issues(dl)),
+    ("estimate_duration", lambda a, d, dl, u: a._estimate_duration(dl, u)),
+    ("find_similar_cases_count", lambda a, d, dl, u: a._find_similar_cases_count(dl)),
+    ("generate_next_steps", lambda a, d, dl, u: a._generate_next_steps(dl, u)),
+    ("identify_risk_factors", lambda a, d, dl, u: a._identify_risk_factors(dl)),
+    ("calculate_confidence", lambda a, d, dl, u: a._calculate_confidence(d)),
+]
+
+REPORTS = {
+    "constitutional_analysis": ai_analysis.constitutional_analysis,
+    "risk_assessment_analysis": ai_analysis.risk_assessment_analysis,
+    "generate_legal_strategy": ai_analysis.generate_legal_strategy,
+    "analyze_case_complexity": ai_analysis.analyze_case_complexity,
+    "simulate_ai_analysis": ai_analysis.simulate_ai_analysis,
+}
+
+
+def build_corpus(seed: int = 42) -> Dict[str, str]:
+    """Descriptions assembled from realistic intake sentences, one per target size"""
+    rng = random.Random(seed)
+    corpus = {}
+    for name, words in CORPUS_SIZES.items():
+        parts, word_count, byte_count = [], 0, 0
+        while (word_count < words) if words else (byte_count < CORPUS_BYTES):
+            sentence = rng.choice(SENTENCES)
+            parts.append(sentence)
+            word_count += len(sentence.split())
+            byte_count += len(sentence) + 1
+        text = " ".join(parts)
+        corpus[name] = " ".join(text.split()[:words]) if words else text[:CORPUS_BYTES]
+    return corpus
+
+
+@contextmanager
+def without_simulated_delay():
+    """Switch the simulated analysis delay off for the duration of a run"""
+    delay, ai_analysis.SIMULATED_DELAY = ai_analysis.SIMULATED_DELAY, 0
+    try:
+        yield
+    finally:
+        ai_analysis.SIMULATED_DELAY = delay
+
+
+def client_data_for(description: str) -> Dict:
+    return {
+        "client_name": "Benchmark Client",
+        "case_type": "Litigation",
+        "practice_area": "Litigation",
+        "jurisdiction": "USA",
+        "urgency": "High",
+        "complexity": 7,
+        "matter_value": 250_000,
+        "description": description,
+    }
+
+
+def with_throughput(stats: Dict) -> Dict:
+    stats["analyses_per_sec"] = round(1000 / stats["mean_ms"], 1) if stats["mean_ms"] else None
+    return stats
+
+
+def bench_corpus(description: str, repeat: int) -> Dict:
+    """Full analyze_matter, each of its stages, and each report generator on one description"""
+    analyzer = LegalAIAnalyzer()
+    description_lower = description.lower()
+    urgency = "High"
+    results = {"analyze_matter": with_throughput(
+        measure(lambda: analyzer.analyze_matter(description, "Other", urgency), repeat))}
+    for name, stage in STAGES:
+        results[f"stage.{name}"] = with_throughput(
+            measure(lambda: stage(analyzer, description, description_lower, urgency), repeat))
+    client_data = client_data_for(description)
+    for name, report in REPORTS.items():
+        results[f"report.{name}"] = with_throughput(measure(lambda: report(client_data), repeat))
+    return results
+
+
+def workload(corpus: Dict[str, str], rounds: int = 20):
+    """Every analysis over the whole corpus, for the profilers"""
+    analyzer = LegalAIAnalyzer()
+    for _ in range(rounds):
+        for description in corpus.values():
+            analyzer.analyze_matter(description, "Other", "High")
+            client_data = client_data_for(description)
+            for report in REPORTS.values():
+                report(client_data)
+
+
+def run_cprofile(corpus: Dict[str, str], output_dir: str, top: int = 25) -> str:
+    profiler = cProfile.Profile()
+    profiler.runcall(workload, corpus)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "bench_analysis.prof")
+    profiler.dump_stats(path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    print(stream.getvalue())
+    return path
+
+
+def run_pyinstrument(corpus: Dict[str, str]) -> None:
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        print("⚠️ pyinstrument is not installed; skipping (pip install pyinstrument)")
+        return
+    profiler = Profiler()
+    profiler.start()
+    workload(corpus)
+    profiler.stop()
+    print(profiler.output_text(unicode=True, color=False))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--profile", action="store_true", help="Also run cProfile and save a .prof file")
+    parser.add_argument("--pyinstrument", action="store_true", help="Also print a pyinstrument call tree")
+    parser.add_argument("--baseline", help="Earlier results JSON to check for regressions")
+    args = parser.parse_args(argv)
+
+    # Report text includes random choices; seed them so runs are comparable
+    random.seed(args.seed)
+    corpus = build_corpus(args.seed)
+    with without_simulated_delay():
+        results = {name: bench_corpus(description, args.repeat) for name, description in corpus.items()}
+        print_table(results)
+        for name, stats in results.items():
+            print(f"{name}: analyze_matter {stats['analyze_matter']['analyses_per_sec']} analyses/sec")
+
+        path = write_results("bench_analysis", results, args.output_dir)
+        print(f"\nResults written to {path}")
+        if args.profile:
+            print(f"cProfile stats written to {run_cprofile(corpus, args.output_dir)}")
+        if args.pyinstrument:
+            run_pyinstrument(corpus)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Benchmark database.py operations against synthetic firms of increasing size
+
+Usage:
+    python benchmarks/bench_database.py
+    python benchmarks/bench_database.py --sizes 1000 10000 --repeat 10
+    python benchmarks/bench_database.py --baseline benchmarks/results/bench_database_<commit>_<ts>.json
+
+Each firm is written to a temporary directory, which becomes the working
+directory before database.py is imported, so the real data files are never
+touched. Results go to benchmarks/results/ as JSON for comparison across commits.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from harness import RESULTS_DIR, compare, measure, print_table, write_results
+
+STATUSES = ["Intake", "Active", "In Progress", "Pending", "Closed", "Settled", "Won"]
+CASE_TYPES = ["Corporate", "Real Estate", "Family Law", "Criminal Defense", "Personal Injury", "Employment"]
+PRACTICE_AREAS = ["Tax Law", "Litigation", "Mergers & Acquisitions", "Intellectual Property", "Immigration"]
+URGENCIES = ["Low", "Medium", "High", "Critical"]
+JURISDICTIONS = ["New York", "California", "Texas", "Nairobi", "London"]
+WORDS = ("contract dispute settlement appeal deposit ruling landlord tenant breach damages injunction "
+         "merger acquisition filing hearing court motion discovery evidence witness liability").split()
+
+TIME_ENTRIES_PER_CASE = 3
+NOTES_PER_CASE = 2
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def generate_firm(num_cases: int, seed: int = 42) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Synthetic cases with proportional time entries and notes, shaped like the real stores"""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    cases, entries, notes = [], [], []
+    for i in range(num_cases):
+        # Microsecond precision, like datetime.now().isoformat() in the real stores
+        intake = start + timedelta(seconds=rng.randrange(0, 86400 * 900),
+                                   microseconds=rng.randrange(1, 10**6))
+        case_id = f"LAW-{i:08d}-{rng.getrandbits(24):06X}"
+        cases.append({
+            "case_id": case_id,
+            "client_name": f"Client {i}",
+            "email": f"client{i}@example.com",
+            "phone": "",
+            "company": f"Company {rng.randrange(num_cases)}",
+            "case_type": rng.choice(CASE_TYPES),
+            "practice_area": rng.choice(PRACTICE_AREAS),
+            "jurisdiction": rng.choice(JURISDICTIONS),
+            "urgency": rng.choice(URGENCIES),
+            "description": _text(rng, 80),
+            "status": rng.choice(STATUSES),
+            "estimated_value": rng.randrange(1_000, 5_000_000),
+            "matter_value": rng.randrange(1_000, 5_000_000),
+            "complexity_score": rng.randrange(10, 100),
+            "ai_analysis": _text(rng, 60),
+            "intake_date": intake.isoformat(),
+            "last_updated": (intake + timedelta(days=rng.randrange(0, 60))).isoformat(),
+            "status_history": [],
+            "time_spent": 0,
+            "billed_amount": 0,
+        })
+        for _ in range(TIME_ENTRIES_PER_CASE):
+            hours = round(rng.uniform(0.25, 8), 2)
+            entries.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "case_id": case_id,
+                "date": (intake + timedelta(days=rng.randrange(0, 60))).isoformat(),
+                "task_description": _text(rng, 8),
+                "hours": hours,
+                "rate": 250,
+                "amount": hours * 250,
+                "user": "Associate",
+                "billed": False,
+                "created_at": intake.isoformat(),
+            })
+            cases[-1]["time_spent"] += hours
+            cases[-1]["billed_amount"] += hours * 250
+        for _ in range(NOTES_PER_CASE):
+            notes.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "case_id": case_id,
+                "timestamp": (intake + timedelta(days=rng.randrange(0, 60))).isoformat(),
+                "author": "System",
+                "content": _text(rng, 20),
+                "type": "general",
+            })
+    return cases, entries, notes
+
+
+def write_firm(directory: str, cases: List[Dict], entries: List[Dict], notes: List[Dict]) -> None:
+    for filename, data in (("cases.json", cases), ("time_entries.json", entries), ("case_notes.json", notes)):
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def bench_firm(num_cases: int, repeat: int, seed: int) -> Dict:
+    """Time every operation against one firm, in its own temporary working directory"""
+    cases, entries, notes = generate_firm(num_cases, seed)
+    rng = random.Random(seed)
+    case_ids = [case["case_id"] for case in cases]
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_db_") as directory:
+        write_firm(directory, cases, entries, notes)
+        del entries, notes
+        os.chdir(directory)
+        try:
+            import database
+
+            operations = {
+                "load_cases": lambda: database.load_cases(),
+                "save_cases": lambda: database.save_cases(cases),
+                "update_case_status": lambda: database.update_case_status(
+                    rng.choice(case_ids), rng.choice(STATUSES), "benchmark"),
+                "add_time_entry": lambda: database.add_time_entry(
+                    rng.choice(case_ids), "Benchmark task", 1.5, user="Benchmark"),
+                "add_case_note": lambda: database.add_case_note(rng.choice(case_ids), "Benchmark note"),
+                "get_case_by_id": lambda: database.get_case_by_id(rng.choice(case_ids)),
+                "search_cases_by_keyword": lambda: database.search_cases_by_keyword(rng.choice(WORDS)),
+                "get_case_statistics": lambda: database.get_case_statistics(),
+                "export_cases_to_csv": lambda: database.export_cases_to_csv(),
+            }
+            results = {}
+            for name, operation in operations.items():
+                print(f"  {num_cases} cases: {name}...", file=sys.stderr)
+                results[name] = measure(operation, repeat)
+            return results
+        finally:
+            os.chdir(previous_dir)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Number of cases per synthetic firm")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="Earlier results JSON to check for regressions")
+    args = parser.parse_args(argv)
+
+    results = {f"{size}_cases": bench_firm(size, args.repeat, args.seed) for size in args.sizes}
+    print_table(results)
+    path = write_results("bench_database", results, args.output_dir)
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Headless render-time benchmark for the app.py pages, driven through Streamlit's AppTest
+
+Usage:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --sizes 100 5000 --repeat 10
+
+Each synthetic firm is written to a temporary working directory (see
+bench_database.generate_firm). For every page the first run after
+navigating is reported separately ("cold") from the repeated reruns, and
+the number of elements emitted is counted, so render cost regressions
+show up both as time and as page weight. Results go to benchmarks/results/.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict
+
+from harness import RESULTS_DIR, ROOT, compare, summarize, write_results
+from bench_database import generate_firm, write_firm
+
+import streamlit.logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+NAVIGATION_KEY = "professional_navigation"
+
+
+def count_elements(node, counts: Counter) -> Counter:
+    """Leaf elements by type, across main area and sidebar"""
+    children = getattr(node, "children", None)
+    if children is None:
+        counts[node.type] += 1
+    else:
+        for child in children.values():
+            count_elements(child, counts)
+    return counts
+
+
+def open_page(page: str) -> Callable[[AppTest], None]:
+    def navigate(at: AppTest):
+        at.session_state.show_case_detail = False
+        at.radio(key=NAVIGATION_KEY).set_value(page)
+    return navigate
+
+
+def open_case_detail(at: AppTest):
+    at.radio(key=NAVIGATION_KEY).set_value("📋 Case Management")
+    at.session_state.current_case_id = at.session_state.cases[0].case_id
+    at.session_state.show_case_detail = True
+
+
+PAGES = {
+    "dashboard": open_page("🌍 Dashboard"),
+    "client_intake": open_page("👥 Client Intake"),
+    "case_management": open_page("📋 Case Management"),
+    "case_detail": open_case_detail,
+}
+
+
+def time_run(at: AppTest, timeout: float) -> float:
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app raised during benchmark: {at.exception[0].message}")
+    return elapsed
+
+
+def bench_firm(num_cases: int, repeat: int, timeout: float, seed: int) -> Dict:
+    """Cold and warm rerun timings plus element counts for every page of one firm"""
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_render_") as directory:
+        write_firm(directory, *generate_firm(num_cases, seed))
+        os.chdir(directory)
+        try:
+            at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            results = {"first_load": summarize([time_run(at, timeout)])}
+            for page, navigate in PAGES.items():
+                print(f"  {num_cases} cases: {page}...", file=sys.stderr)
+                navigate(at)
+                cold = time_run(at, timeout)
+                warm = [time_run(at, timeout) for _ in range(repeat)]
+                counts = count_elements(at._tree, Counter())
+                stats = summarize(warm)
+                stats["cold_ms"] = round(cold * 1000, 3)
+                stats["elements"] = sum(counts.values())
+                stats["elements_by_type"] = dict(counts.most_common())
+                results[page] = stats
+            return results
+        finally:
+            os.chdir(previous_dir)
+
+
+def print_render_table(results: Dict) -> None:
+    for group, pages in results.items():
+        print(f"\n== {group} ==")
+        print(f"{'page':<20}{'cold ms':>12}{'p50 ms':>12}{'p90 ms':>12}{'elements':>10}")
+        for page, stats in pages.items():
+            print(f"{page:<20}{stats.get('cold_ms', stats['p50_ms']):>12}{stats['p50_ms']:>12}"
+                  f"{stats['p90_ms']:>12}{stats.get('elements', ''):>10}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000],
+                        help="Number of cases per synthetic firm")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm reruns per page")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per rerun")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="Earlier results JSON to check for regressions")
+    args = parser.parse_args(argv)
+
+    # Deprecation warnings from the app would otherwise be logged on every rerun
+    streamlit.logger.set_log_level("error")
+    results = {f"{size}_cases": bench_firm(size, args.repeat, args.timeout, args.seed) for size in args.sizes}
+    print_render_table(results)
+    path = write_results("bench_render", results, args.output_dir)
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Encode/decode speed and file size of each data-store format on synthetic cases
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --sizes 1000 100000 --repeat 10
+
+Every format serialization.py can write on this install is measured, with
+and without zstd where available, next to the plain stdlib
+json.dumps(indent=2) / json.loads pair the stores used before. Results go
+to benchmarks/results/ as JSON.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+from harness import RESULTS_DIR, compare, measure, print_table, write_results
+from bench_database import generate_firm
+
+import serialization  # noqa: E402
+
+STDLIB = "stdlib_json"
+
+
+def variants() -> List[tuple]:
+    """(name, format, compression) for every combination available here"""
+    available = serialization.available_formats()
+    formats = [name for name in ("json", "fastjson", "msgpack") if available[name]]
+    compressions = ["none", "zstd"] if available["zstd"] else ["none"]
+    return [(name if compression == "none" else f"{name}+zstd", name, compression)
+            for name in formats for compression in compressions]
+
+
+def bench_records(records: List[Dict], repeat: int) -> Dict:
+    results = {}
+    data = json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+    results[f"{STDLIB}.encode"] = measure(
+        lambda: json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8"), repeat)
+    results[f"{STDLIB}.encode"]["bytes"] = len(data)
+    results[f"{STDLIB}.decode"] = measure(lambda: json.loads(data), repeat)
+
+    for name, format, compression in variants():
+        encoded = serialization.encode(records, format, compression)
+        results[f"{name}.encode"] = measure(lambda: serialization.encode(records, format, compression), repeat)
+        results[f"{name}.encode"]["bytes"] = len(encoded)
+        results[f"{name}.decode"] = measure(lambda: serialization.decode(encoded), repeat)
+    return results
+
+
+def print_size_table(results: Dict) -> None:
+    for group, operations in results.items():
+        baseline = operations[f"{STDLIB}.encode"]
+        print(f"\n== {group}: size and decode speed vs {STDLIB} ==")
+        for operation, stats in operations.items():
+            if operation.endswith(".encode"):
+                name = operation[:-len(".encode")]
+                speedup = operations[f"{STDLIB}.decode"]["p50_ms"] / max(operations[f"{name}.decode"]["p50_ms"], 1e-6)
+                print(f"{name:<20}{stats['bytes']:>14,} bytes{stats['bytes'] / baseline['bytes']:>8.0%}"
+                      f"{speedup:>8.1f}x decode")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Number of cases per synthetic firm")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="Earlier results JSON to check for regressions")
+    args = parser.parse_args(argv)
+
+    results = {f"{size}_cases": bench_records(generate_firm(size, args.seed)[0], args.repeat)
+               for size in args.sizes}
+    print_table(results)
+    print_size_table(results)
+    path = write_results("bench_serialization", results, args.output_dir)
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Shared timing, memory and reporting helpers for the benchmark scripts"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Latency percentiles in milliseconds"""
+    ms = np.asarray(samples) * 1000
+    return {
+        "runs": len(samples),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def measure(func: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict:
+    """Time `func` over `repeat` runs, then trace one extra run for peak memory
+
+    Tracing slows allocation-heavy code, so the memory run is kept out of
+    the latency samples. `setup` runs before every call, untimed.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(samples)
+    result["peak_memory_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def write_results(name: str, results: Dict, output_dir: str = RESULTS_DIR) -> str:
+    """Write results with run metadata to <output_dir>/<name>_<commit>_<timestamp>.json"""
+    os.makedirs(output_dir, exist_ok=True)
+    commit = git_commit()
+    payload = {
+        "benchmark": name,
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    path = os.path.join(output_dir, f"{name}_{commit}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare(results: Dict, baseline_path: str, metric: str = "p50_ms", threshold: float = 1.2) -> List[str]:
+    """Lines describing operations that got more than `threshold` times slower than the baseline"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for group, operations in results.items():
+        for operation, stats in operations.items():
+            before = baseline.get(group, {}).get(operation, {}).get(metric)
+            if before and stats.get(metric, 0) > before * threshold:
+                regressions.append(f"{group}/{operation}: {metric} {before} -> {stats[metric]} "
+                                   f"({stats[metric] / before:.2f}x)")
+    return regressions
+
+
+def print_table(results: Dict) -> None:
+    for group, operations in results.items():
+        print(f"\n== {group} ==")
+        print(f"{'operation':<36}{'p50 ms':>12}{'p90 ms':>12}{'p99 ms':>12}{'peak KB':>12}")
+        for operation, stats in operations.items():
+            print(f"{operation:<36}{stats['p50_ms']:>12}{stats['p90_ms']:>12}"
+                  f"{stats['p99_ms']:>12}{stats['peak_memory_kb']:>12}")
@@ -0,0 +1,148 @@
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from database import (
+    load_cases, load_time_entries, mark_time_entries_billed, get_billing_rollups
+)
+from concurrency import file_lock
+from instrumentation import timed, record_file_io
+from models import TimeEntry
+from storage import persist, read_records
+
+INVOICES_FILE = "invoices.json"
+
+
+def load_invoices() -> List[Dict]:
+    """Load invoices from JSON file"""
+    try:
+        invoices = read_records(INVOICES_FILE)
+        record_file_io("billing.load_invoices", INVOICES_FILE)
+        return invoices
+    except Exception as e:
+        print(f"❌ Error loading invoices: {e}")
+        return []
+
+
+def save_invoices(invoices: List[Dict]) -> bool:
+    """Save invoices atomically, keeping the last 5 versions as backups"""
+    try:
+        persist(INVOICES_FILE, invoices)
+        record_file_io("billing.save_invoices", INVOICES_FILE, written=True)
+        return True
+    except Exception as e:
+        print(f"❌ Error saving invoices: {e}")
+        return False
+
+
+def _invoice_id(issued_at: datetime, sequence: int) -> str:
+    return f"INV-{issued_at:%Y%m%d}-{sequence:05d}"
+
+
+def _record_missing_invoices(existing: List[Dict], entries: List[TimeEntry]) -> List[Dict]:
+    """Save an invoice for every invoice id on billed entries that has none yet; returns the new ones
+
+    Entries are flagged before their invoices are written, so after a crash
+    between the two steps the invoices are rebuilt from the entries alone.
+    """
+    known = {invoice['invoice_id'] for invoice in existing}
+    billed: Dict[str, List[TimeEntry]] = {}
+    for entry in entries:
+        invoice_id = entry.invoice_id
+        if entry.billed and invoice_id and invoice_id not in known:
+            billed.setdefault(invoice_id, []).append(entry)
+    if not billed:
+        return []
+
+    clients = {case.case_id: case.client_name for case in load_cases()}
+    invoices = []
+    for invoice_id, invoice_entries in sorted(billed.items()):
+        first = invoice_entries[0]
+        dates = sorted(str(entry.date)[:10] for entry in invoice_entries)
+        invoices.append({
+            'invoice_id': invoice_id,
+            'case_id': first.case_id,
+            'client_name': clients.get(first.case_id, 'Unknown Client'),
+            'entry_ids': [entry.id for entry in invoice_entries],
+            'hours': round(sum(entry.hours for entry in invoice_entries), 2),
+            'amount': round(sum(entry.amount for entry in invoice_entries), 2),
+            'period_start': dates[0],
+            'period_end': dates[-1],
+            'issued_at': first.billed_at or datetime.now().isoformat(),
+            'issued_by': first.billed_by or 'System',
+            'status': 'Issued',
+        })
+    if not save_invoices(existing + invoices):
+        raise IOError("invoices could not be saved")
+    return invoices
+
+
+@timed("billing.generate_invoices")
+def generate_invoices(case_ids: Optional[Iterable[str]] = None, through_date: Optional[str] = None,
+                      issued_by: str = "System") -> List[Dict]:
+    """Invoice every case's unbilled time in one pass and mark those entries billed in one save
+
+    `through_date` (YYYY-MM-DD) limits invoicing to work done up to that day.
+    The invoice ids are written onto the entries first, and the invoices are
+    then derived from the billed entries, so a run that stops part-way is
+    completed by the next one and no entry is ever billed twice. Runs are
+    serialized on the invoices file so invoice numbers stay unique.
+    """
+    try:
+        with file_lock(INVOICES_FILE):
+            entries = load_time_entries()
+            existing = load_invoices()
+            existing += _record_missing_invoices(existing, entries)
+
+            wanted = set(case_ids) if case_ids is not None else None
+            # Rollups say which cases have unbilled time without scanning the entries
+            candidates = {case_id for case_id in get_billing_rollups().unbilled_case_ids()
+                          if wanted is None or case_id in wanted}
+            if not candidates:
+                return []
+
+            unbilled: Dict[str, List[TimeEntry]] = {}
+            for entry in entries:
+                if (entry.case_id in candidates and not entry.billed
+                        and (through_date is None or str(entry.date)[:10] <= through_date)):
+                    unbilled.setdefault(entry.case_id, []).append(entry)
+            if not unbilled:
+                return []
+
+            issued_at = datetime.now()
+            invoice_by_entry = {}
+            for sequence, (case_id, case_entries) in enumerate(sorted(unbilled.items()), start=len(existing) + 1):
+                invoice_id = _invoice_id(issued_at, sequence)
+                invoice_by_entry.update((entry.id, invoice_id) for entry in case_entries)
+
+            stamp = {'billed_at': issued_at.isoformat(), 'billed_by': issued_by}
+            if not mark_time_entries_billed(invoice_by_entry, stamp):
+                return []
+            return _record_missing_invoices(existing, load_time_entries())
+    except Exception as e:
+        print(f"❌ Error generating invoices: {e}")
+        return []
+
+
+_recovered_directories = set()
+
+
+def ensure_invoices_recovered() -> int:
+    """Write any invoices an interrupted run left behind, once per data directory in this process"""
+    directory = os.getcwd()
+    if directory in _recovered_directories:
+        return 0
+    _recovered_directories.add(directory)
+    try:
+        with file_lock(INVOICES_FILE):
+            return len(_record_missing_invoices(load_invoices(), load_time_entries()))
+    except Exception as e:
+        print(f"❌ Error recovering invoices: {e}")
+        return 0
+
+
+def rollup_table(rollups_by_key: Dict[str, Dict], key_name: str) -> List[Dict]:
+    """Rows for display, largest amount first"""
+    rows = [{key_name: key, **{k: round(v, 2) if isinstance(v, float) else v for k, v in totals.items()}}
+            for key, totals in rollups_by_key.items()]
+    return sorted(rows, key=lambda row: row['amount'], reverse=True)
@@ -0,0 +1,94 @@
+"""Content-addressed store for large case bodies (descriptions, and later documents)
+
+Blobs live under blobs/<first two hex digits>/<sha256>. Each is written once
+with storage.atomic_write and never modified, so a blob id doubles as a
+cache key and concurrent writers of the same content cannot conflict.
+"""
+import hashlib
+import os
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Union
+
+from storage import atomic_write
+
+BLOB_DIR = "blobs"
+BLOB_CACHE_SIZE = 256
+# Blobs are written before the record that references them is saved
+GC_GRACE_SECONDS = 3600
+
+
+def blob_path(blob_id: str, blob_dir: str = BLOB_DIR) -> str:
+    return os.path.join(blob_dir, blob_id[:2], blob_id)
+
+
+def put_blob(data: Union[str, bytes], blob_dir: str = BLOB_DIR) -> str:
+    """Store `data` and return its id; storing the same content again only refreshes its mtime"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    blob_id = hashlib.sha256(data).hexdigest()
+    path = blob_path(blob_id, blob_dir)
+    try:
+        # The grace period in delete_unreferenced must cover this new reference too
+        os.utime(path)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, data)
+    return blob_id
+
+
+@lru_cache(maxsize=BLOB_CACHE_SIZE)
+def _read_blob(path: str) -> bytes:
+    # Missing blobs raise, and exceptions are never cached
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def get_blob(blob_id: str, blob_dir: str = BLOB_DIR) -> Optional[bytes]:
+    """A blob's bytes, or None if it is missing"""
+    try:
+        return _read_blob(os.path.abspath(blob_path(blob_id, blob_dir)))
+    except OSError as e:
+        print(f"❌ Error reading blob {blob_id[:12]}: {e}")
+        return None
+
+
+def get_text(blob_id: str, blob_dir: str = BLOB_DIR) -> Optional[str]:
+    data = get_blob(blob_id, blob_dir)
+    return data.decode("utf-8") if data is not None else None
+
+
+def _walk(blob_dir: str):
+    try:
+        with os.scandir(blob_dir) as shards:
+            for shard in shards:
+                if shard.is_dir():
+                    with os.scandir(shard.path) as entries:
+                        yield from (entry for entry in entries if entry.is_file() and not entry.name.startswith("."))
+    except FileNotFoundError:
+        return
+
+
+def blob_usage(blob_dir: str = BLOB_DIR) -> Dict[str, int]:
+    """Number of blobs and the bytes they occupy"""
+    count = size = 0
+    for entry in _walk(blob_dir):
+        count += 1
+        size += entry.stat().st_size
+    return {'blobs': count, 'bytes': size}
+
+
+def delete_unreferenced(referenced: Iterable[str], blob_dir: str = BLOB_DIR,
+                        grace_seconds: float = GC_GRACE_SECONDS) -> int:
+    """Remove blobs no record points at, sparing ones young enough to belong to a save in flight"""
+    keep = set(referenced)
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for entry in _walk(blob_dir):
+        if entry.name not in keep and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                print(f"Warning: Could not remove blob {entry.name[:12]}: {e}")
+    return removed
@@ -0,0 +1,81 @@
+import secrets
+import threading
+import time
+from typing import List
+
+# Crockford base32: sortable as plain strings, no ambiguous I/L/O/U
+ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+TIME_CHARS = 10       # 48-bit millisecond timestamp
+SEQUENCE_CHARS = 16   # 80-bit per-process sequence
+SEQUENCE_BITS = 80
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+def _encode(value: int, length: int) -> str:
+    """Fixed-width base32 encoding so lexical order equals numeric order"""
+    chars = []
+    for _ in range(length):
+        chars.append(ENCODING[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+class CaseIdGenerator:
+    """ULID-style case IDs: millisecond timestamp followed by a monotonic sequence
+
+    The sequence starts at a random 80-bit value for each new millisecond and
+    is incremented for every further ID in that millisecond, so IDs from one
+    process never collide and always sort in generation order. The random
+    start keeps separate processes apart.
+    """
+
+    def __init__(self, prefix: str = "LAW"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _advance(self, count: int) -> tuple:
+        """Claim `count` consecutive sequence values; caller holds the lock"""
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > self._last_ms:
+            self._last_ms = now_ms
+            # Leave headroom so a block reserved in this millisecond cannot overflow
+            self._sequence = secrets.randbits(SEQUENCE_BITS - 1)
+        else:
+            # Same millisecond or clock moved backwards: stay on the last timestamp
+            self._sequence += 1
+
+        if self._sequence + count - 1 > MAX_SEQUENCE:
+            self._last_ms += 1
+            self._sequence = secrets.randbits(SEQUENCE_BITS - 1)
+
+        start = self._sequence
+        self._sequence += count - 1
+        return self._last_ms, start
+
+    def _format(self, timestamp_ms: int, sequence: int) -> str:
+        return f"{self.prefix}-{_encode(timestamp_ms, TIME_CHARS)}{_encode(sequence, SEQUENCE_CHARS)}"
+
+    def generate(self) -> str:
+        """Generate one case ID"""
+        with self._lock:
+            timestamp_ms, sequence = self._advance(1)
+        return self._format(timestamp_ms, sequence)
+
+    def reserve(self, count: int) -> List[str]:
+        """Reserve a block of consecutive IDs in one step, for bulk imports"""
+        if count < 1:
+            return []
+        with self._lock:
+            timestamp_ms, start = self._advance(count)
+        return [self._format(timestamp_ms, start + offset) for offset in range(count)]
+
+# Global instance
+case_id_generator = CaseIdGenerator()
+
+def generate_case_id() -> str:
+    """Generate a unique, time-sortable case ID"""
+    return case_id_generator.generate()
+
+def reserve_case_ids(count: int) -> List[str]:
+    """Reserve `count` unique case IDs for a bulk import"""
+    return case_id_generator.reserve(count)
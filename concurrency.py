@@ -0,0 +1,151 @@
+"""Concurrency control for the JSON data stores
+
+Streamlit serves every session from a thread of one process, and more than
+one process may share the data directory. Writers therefore plan a change
+from an unlocked snapshot, then hold the store's lock only long enough to
+re-read the file, check that every record they touch still carries the
+version they planned against, and save. If a record moved on in between,
+`VersionConflict` is raised and the writer plans again from fresh data, so
+concurrent sessions never silently overwrite each other's work.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+CAS_RETRIES = 8
+RETRY_BACKOFF = 0.005  # seconds; doubled on every retry, with jitter
+
+T = TypeVar("T")
+
+
+class VersionConflict(Exception):
+    """A record changed between the snapshot a write was planned on and its commit"""
+
+
+class _StoreLock:
+    """Re-entrant per-file lock: an RLock across threads plus flock across processes"""
+
+    def __init__(self, path: str):
+        self.lock_path = path + ".lock"
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def acquire(self):
+        self._lock.acquire()
+        self._depth += 1
+        # flock conflicts between descriptors even in one process, so only the
+        # outermost acquire in a thread takes it
+        if self._depth == 1 and fcntl is not None:
+            try:
+                self._handle = open(self.lock_path, "a")
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self._handle is not None:
+                    self._handle.close()
+                    self._handle = None
+                self._depth -= 1
+                self._lock.release()
+                raise
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._handle is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
+        self._lock.release()
+
+
+_store_locks: Dict[str, _StoreLock] = {}
+_store_locks_guard = threading.Lock()
+_stats = {'conflicts': 0, 'exhausted': 0}
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold the exclusive lock for one data file"""
+    key = os.path.abspath(path)
+    with _store_locks_guard:
+        store_lock = _store_locks.get(key)
+        if store_lock is None:
+            store_lock = _store_locks[key] = _StoreLock(key)
+    store_lock.acquire()
+    try:
+        yield
+    finally:
+        store_lock.release()
+
+
+def _key_of(record, key: str):
+    """A record's key field, for plain dicts and typed records alike"""
+    return record.get(key) if isinstance(record, dict) else getattr(record, key)
+
+
+def _with_version(record, version: int):
+    if isinstance(record, dict):
+        return {**record, 'version': version}
+    return replace(record, version=version)
+
+
+def version_of(record) -> Optional[int]:
+    """A record's version; records written before versioning count as 0, missing ones as None"""
+    if record is None:
+        return None
+    return (record.get('version') if isinstance(record, dict) else record.version) or 0
+
+
+def compare_and_swap(records: List, key: str, expected: Dict[str, Optional[int]],
+                     changes: Dict[str, Optional[object]]) -> List:
+    """Apply `changes` to a new list if every touched record is still at its expected version
+
+    `changes` maps a record key to its new value, or to None to delete it;
+    keys not present yet are appended. An expected version of None means the
+    record must not exist. Every written record's version is bumped. Records
+    may be plain dicts or frozen dataclasses with a `version` field.
+    """
+    current = {_key_of(record, key): record for record in records}
+    for record_key, version in expected.items():
+        if version_of(current.get(record_key)) != version:
+            raise VersionConflict(record_key)
+
+    result = []
+    for record in records:
+        record_key = _key_of(record, key)
+        if record_key not in changes:
+            result.append(record)
+        elif changes[record_key] is not None:
+            result.append(_with_version(changes[record_key], version_of(record) + 1))
+    for record_key, new_record in changes.items():
+        if record_key not in current and new_record is not None:
+            result.append(_with_version(new_record, 1))
+    return result
+
+
+def retry_on_conflict(attempt: Callable[[], T], retries: int = CAS_RETRIES) -> T:
+    """Run `attempt`, re-running it with jittered backoff while it raises VersionConflict"""
+    for retry in range(retries):
+        try:
+            return attempt()
+        except VersionConflict:
+            _stats['conflicts'] += 1
+            time.sleep(RETRY_BACKOFF * (2 ** retry) * random.random())
+    try:
+        return attempt()
+    except VersionConflict:
+        _stats['exhausted'] += 1
+        raise
+
+
+def conflict_stats() -> Dict[str, int]:
+    """Conflicts retried and writes that ran out of retries in this process"""
+    return dict(_stats)
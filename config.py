@@ -83,10 +83,32 @@ class Config:
     # AI Configuration
     AI_MODEL = os.getenv('AI_MODEL', 'gpt-4-legal')
     MAX_ANALYSIS_TIME = 30  # seconds
+    SIMULATED_ANALYSIS_DELAY = float(os.getenv('SIMULATED_ANALYSIS_DELAY', '2'))  # seconds; 0 disables
+    
+    # Authentication
+    CREDENTIALS_PATH = os.getenv('CREDENTIALS_PATH', 'users.json')
+    PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', '600000'))
+    SESSION_TOKEN_TTL = 8 * 60 * 60  # 8 hours
+    REMEMBER_ME_TTL = 30 * 24 * 60 * 60  # 30 days
+    LOGIN_WORKERS = int(os.getenv('LOGIN_WORKERS', '4'))
+    LOGIN_QUEUE_SIZE = 32  # verifications queued or running before new ones are rejected
+    LOGIN_TIMEOUT = 10  # seconds
+    LOGIN_ATTEMPTS_PER_USER = (10, 60)  # attempts, per seconds; shared by every client IP
+    LOGIN_ATTEMPTS_PER_IP = (20, 60)
     
     # Performance
     CACHE_TIMEOUT = 300  # 5 minutes
+    METRICS_ENABLED = os.getenv('LEGALAI_METRICS', 'False').lower() == 'true'
+    TRACING_ENABLED = os.getenv('LEGALAI_TRACING', 'False').lower() == 'true'
+    TRACE_EXPORTER = os.getenv('LEGALAI_TRACE_EXPORTER', 'file')  # 'file', 'console' or 'none'
+    TRACE_FILE = os.getenv('LEGALAI_TRACE_FILE', 'traces.jsonl')
+    # Roles that may open the diagnostics page; the demo login is a Partner
+    DIAGNOSTICS_ROLES = tuple(os.getenv('LEGALAI_DIAGNOSTICS_ROLES', 'Administrator,Partner').split(','))
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    DATA_FORMAT = os.getenv('LEGALAI_DATA_FORMAT', 'json')  # 'json', 'fastjson' or 'msgpack'
+    DATA_COMPRESSION = os.getenv('LEGALAI_DATA_COMPRESSION', 'none')  # 'none' or 'zstd'
+    ZSTD_LEVEL = int(os.getenv('LEGALAI_ZSTD_LEVEL', '3'))
+    ROLLUP_RECONCILE_INTERVAL = float(os.getenv('ROLLUP_RECONCILE_INTERVAL', '300'))  # seconds; 0 disables
 
 # Instantiate config
 config = Config()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from database import parse_timestamp
+from models import Case
+from instrumentation import timed
+
+ACTIVE_STATUSES = ('Active', 'Accepted')
+URGENT_LEVELS = ('High', 'Critical')
+HIGH_RISK_THRESHOLD = 75
+NEW_CASE_WINDOW_DAYS = 7
+
+@dataclass
+class DashboardContext:
+    """Everything the dashboard widgets and sidebar display, computed once per rerun"""
+    total_cases: int = 0
+    new_this_week: int = 0
+    active_cases: int = 0
+    total_value: float = 0
+    high_risk_cases: int = 0
+    closed_cases: int = 0
+    favorable_cases: int = 0
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    urgent_cases: List[Case] = field(default_factory=list)
+    recent_cases: List[Case] = field(default_factory=list)
+    generated_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def success_rate(self) -> float:
+        """Percentage of closed cases with a favorable outcome"""
+        if not self.closed_cases:
+            return 0
+        return (self.favorable_cases / self.closed_cases) * 100
+
+def _days_between(date_string: str, now: datetime) -> Optional[int]:
+    """Whole days from an ISO timestamp to now, or None if it cannot be parsed"""
+    parsed = parse_timestamp(date_string) if date_string else None
+    return (now - parsed).days if parsed else None
+
+@timed("panel.build_dashboard_context")
+def build_dashboard_context(cases: List[Case], now: datetime = None,
+                            recent_limit: int = 5, urgent_limit: int = 3,
+                            index=None) -> DashboardContext:
+    """Compute every dashboard KPI, the urgent list and the recent list in one pass over cases
+
+    When a database.CaseIndex is given the urgent and recent lists are read
+    from it, so only the rendered items are touched.
+    """
+    now = now or datetime.now()
+    now_iso = now.isoformat()
+    context = DashboardContext(total_cases=len(cases), generated_at=now)
+    recent_heap = []
+    if index is not None:
+        context.urgent_cases = index.urgent(urgent_limit)
+        context.recent_cases = index.recent(recent_limit)
+        urgent_limit = recent_limit = 0
+
+    for position, case in enumerate(cases):
+        status = case.status
+        context.status_counts[status] = context.status_counts.get(status, 0) + 1
+        context.total_value += case.matter_value
+
+        days_since_intake = _days_between(case.intake_date, now)
+        if days_since_intake is not None and days_since_intake < NEW_CASE_WINDOW_DAYS:
+            context.new_this_week += 1
+
+        if status in ACTIVE_STATUSES:
+            context.active_cases += 1
+
+        if case.complexity_score > HIGH_RISK_THRESHOLD:
+            context.high_risk_cases += 1
+
+        if status == 'Closed':
+            context.closed_cases += 1
+            if case.outcome == 'Favorable':
+                context.favorable_cases += 1
+        elif case.urgency in URGENT_LEVELS and len(context.urgent_cases) < urgent_limit:
+            context.urgent_cases.append(case)
+
+        # Bounded min-heap keeps the newest cases; -position keeps list order on ties
+        if recent_limit > 0:
+            entry = (case.last_updated or case.intake_date or now_iso, -position, case)
+            if len(recent_heap) < recent_limit:
+                heapq.heappush(recent_heap, entry)
+            elif entry[:2] > recent_heap[0][:2]:
+                heapq.heapreplace(recent_heap, entry)
+
+    if recent_heap:
+        context.recent_cases = [entry[2] for entry in sorted(recent_heap, key=lambda e: e[:2], reverse=True)]
+    return context
@@ -1,173 +1,274 @@
 import json
 import os
+import threading
 import uuid
 import pandas as pd
+from dataclasses import replace
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Optional
 
-def load_cases() -> List[Dict]:
+from blob_store import delete_unreferenced, get_text, put_blob
+from concurrency import compare_and_swap, file_lock, retry_on_conflict, version_of
+from instrumentation import record_error, record_file_io, timed
+from models import Case, Note, TimeEntry, to_dicts
+from storage import backups_for, persist, prune_backups, read_records
+
+@timed("database.load_cases")
+def load_cases() -> List[Case]:
     """Load cases with enhanced error handling and data validation"""
     try:
-        if os.path.exists("cases.json"):
-            with open("cases.json", "r", encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    cases = json.loads(content)
-                    # Validate case structure
-                    return [validate_case(case) for case in cases]
-        return []
+        cases = read_records("cases.json")
+        record_file_io("database.load_cases", "cases.json")
+        # Validate case structure
+        return [Case.from_dict(case) for case in cases]
     except Exception as e:
+        record_error("database.load_cases")
         print(f"❌ Error loading cases: {e}")
         return []
 
-def validate_case(case: Dict) -> Dict:
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse a stored ISO timestamp once; repeat lookups across reruns hit the cache"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        print(f"⚠️ Invalid timestamp in stored data: {value!r}")
+        return None
+    # Stored timestamps are naive local time; normalise any offset-aware ones
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def validate_case(case: Dict) -> Case:
     """Ensure case has all required fields with defaults"""
-    required_fields = {
-        'case_id': lambda: generate_case_id(),
-        'client_name': lambda: 'Unknown Client',
-        'email': lambda: '',
-        'status': lambda: 'Intake',
-        'intake_date': lambda: datetime.now().isoformat(),
-        'last_updated': lambda: datetime.now().isoformat()
-    }
-    
-    for field, default_func in required_fields.items():
-        if field not in case or not case[field]:
-            case[field] = default_func()
-    
-    return case
+    return Case.from_dict(case)
 
-def save_cases(cases: List[Dict]) -> bool:
-    """Save cases with backup and compression"""
+@timed("database.save_cases")
+def save_cases(cases: List[Case]) -> bool:
+    """Save cases atomically, keeping the last 5 versions as backups"""
     try:
-        # Create backup
-        if os.path.exists("cases.json"):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"backups/cases_backup_{timestamp}.json"
-            os.makedirs("backups", exist_ok=True)
-            os.rename("cases.json", backup_name)
-        
-        # Save with pretty printing
-        with open("cases.json", "w", encoding='utf-8') as f:
-            json.dump(cases, f, indent=2, ensure_ascii=False, default=str)
-        
-        # Clean up old backups (keep last 5)
-        cleanup_old_backups()
+        persist("cases.json", to_dicts(cases))
+        _count_write("cases.json")
+        record_file_io("database.save_cases", "cases.json", written=True)
         return True
     except Exception as e:
+        record_error("database.save_cases")
         print(f"❌ Error saving cases: {e}")
         return False
 
 def cleanup_old_backups(max_backups: int = 5):
-    """Keep only the most recent backups"""
+    """Keep only the most recent backups of each store"""
+    for path in ("cases.json", "time_entries.json", "case_notes.json"):
+        prune_backups(path, keep=max_backups)
+
+def _versioned_write(path: str, load, save, key: str, plan, on_saved=None) -> bool:
+    """Optimistic load-modify-save of one store
+
+    `plan(snapshot)` returns {record_key: new_record or None to delete}, or
+    None to abort, and must not mutate the snapshot. The store lock is held
+    only to re-read the file, check that no planned record moved on, and
+    save; on a conflict the change is planned again from fresh data.
+    """
+    def attempt() -> bool:
+        snapshot = load()
+        changes = plan(snapshot)
+        if changes is None:
+            return False
+        if not changes:
+            return True
+        records = {getattr(record, key): record for record in snapshot}
+        expected = {record_key: version_of(records.get(record_key)) for record_key in changes}
+        with file_lock(path):
+            previous_signature = _file_signature(path)
+            # Always re-read: a signature cannot prove the file is unchanged since the snapshot
+            if not save(compare_and_swap(load(), key, expected, changes)):
+                return False
+            if on_saved is not None:
+                on_saved(previous_signature, changes)
+        return True
+    return retry_on_conflict(attempt)
+
+SNIPPET_LENGTH = 100
+
+def _externalize_description(case: Case) -> Case:
+    """Move an inline description into the blob store, keeping a reference and a list-view snippet"""
+    description = case.description
+    if not isinstance(description, str):
+        return case
+    return replace(case, description=None, description_ref=put_blob(description),
+                   description_snippet=description[:SNIPPET_LENGTH], description_length=len(description))
+
+def get_case_description(case: Case) -> str:
+    """The full description, read from the blob store on demand"""
+    if case.description is not None:
+        return case.description
+    if not case.description_ref:
+        return ''
+    text = get_text(case.description_ref)
+    return text if text is not None else case.description_snippet or ''
+
+def get_case_snippet(case: Case) -> str:
+    """Start of the description for list views, without touching the blob store"""
+    if case.description_snippet is not None:
+        return case.description_snippet
+    return (case.description or '')[:SNIPPET_LENGTH]
+
+@timed("database.migrate_inline_descriptions")
+def migrate_inline_descriptions() -> int:
+    """Move descriptions still stored inside cases.json into the blob store; returns how many moved"""
+    moved = 0
+    
+    def plan(cases: List[Case]) -> Dict:
+        nonlocal moved
+        changes = {case.case_id: _externalize_description(case) for case in cases if case.description is not None}
+        moved = len(changes)
+        return changes
+    
     try:
-        if os.path.exists("backups"):
-            backups = [f for f in os.listdir("backups") if f.startswith("cases_backup_")]
-            backups.sort(reverse=True)
-            
-            for old_backup in backups[max_backups:]:
-                os.remove(os.path.join("backups", old_backup))
+        return moved if _versioned_write("cases.json", load_cases, save_cases, 'case_id', plan) else 0
+    except Exception as e:
+        record_error("database.migrate_inline_descriptions")
+        print(f"❌ Error migrating case descriptions: {e}")
+        return 0
+
+_migrated_directories = set()
+
+def ensure_descriptions_migrated() -> int:
+    """Run migrate_inline_descriptions once per data directory in this process"""
+    directory = os.getcwd()
+    if directory in _migrated_directories:
+        return 0
+    _migrated_directories.add(directory)
+    return migrate_inline_descriptions()
+
+def collect_unreferenced_blobs() -> int:
+    """Delete description blobs that no case, and no backup of cases.json, points at any more"""
+    referenced = {case.description_ref for case in load_cases()}
+    # Restoring a backup must bring its cases' descriptions back with it
+    for backup_path in backups_for("cases.json"):
+        try:
+            referenced.update(case.get('description_ref') for case in read_records(backup_path))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read blob references from {backup_path}: {e}")
+    return delete_unreferenced(blob_id for blob_id in referenced if blob_id)
+
+@timed("database.add_case")
+def add_case(case: Dict) -> bool:
+    """Add a new case without overwriting cases saved concurrently"""
+    try:
+        case = _externalize_description(validate_case(case))
+        return _versioned_write("cases.json", load_cases, save_cases, 'case_id',
+                                lambda cases: {case.case_id: case})
     except Exception as e:
-        print(f"Warning: Could not clean up backups: {e}")
+        record_error("database.add_case")
+        print(f"❌ Error adding case: {e}")
+        return False
 
+@timed("database.update_case_status")
 def update_case_status(case_id: str, new_status: str, notes: str = None) -> bool:
     """Update case status with comprehensive tracking"""
     try:
-        cases = load_cases()
-        case_updated = False
+        old_status = None
         
-        for case in cases:
-            if case['case_id'] == case_id:
-                old_status = case.get('status', 'Unknown')
-                case['status'] = new_status
-                case['last_updated'] = datetime.now().isoformat()
-                case['status_history'] = case.get('status_history', [])
-                case['status_history'].append({
-                    'from_status': old_status,
-                    'to_status': new_status,
-                    'timestamp': datetime.now().isoformat(),
-                    'notes': notes
-                })
-                case_updated = True
-                break
+        def plan(cases: List[Case]) -> Optional[Dict]:
+            nonlocal old_status
+            for case in cases:
+                if case.case_id == case_id:
+                    old_status = case.status
+                    return {case_id: replace(
+                        case,
+                        status=new_status,
+                        last_updated=datetime.now().isoformat(),
+                        status_history=(case.status_history or []) + [{
+                            'from_status': old_status,
+                            'to_status': new_status,
+                            'timestamp': datetime.now().isoformat(),
+                            'notes': notes
+                        }]
+                    )}
+            return None
         
-        if case_updated:
-            if save_cases(cases):
-                # Add a note about the status change
-                if notes:
-                    add_case_note(case_id, f"Status changed from {old_status} to {new_status}: {notes}", "System")
-                else:
-                    add_case_note(case_id, f"Status changed from {old_status} to {new_status}", "System")
-                return True
+        if _versioned_write("cases.json", load_cases, save_cases, 'case_id', plan):
+            # Add a note about the status change
+            if notes:
+                add_case_note(case_id, f"Status changed from {old_status} to {new_status}: {notes}", "System")
+            else:
+                add_case_note(case_id, f"Status changed from {old_status} to {new_status}", "System")
+            return True
         return False
     except Exception as e:
+        record_error("database.update_case_status")
         print(f"❌ Error updating case status: {e}")
         return False
 
+@timed("database.get_case_by_id")
 def get_case_by_id(case_id: str) -> Optional[Dict]:
-    """Get a specific case by ID with enhanced data"""
+    """Get a specific case by ID with enhanced data, as a plain dict for detail views"""
     try:
         cases = load_cases()
         for case in cases:
-            if case['case_id'] == case_id:
+            if case.case_id == case_id:
                 # Enrich case data
-                case['time_entries'] = get_time_entries_for_case(case_id)
-                case['total_time'] = sum(entry['hours'] for entry in case['time_entries'])
-                case['total_billed'] = sum(entry['amount'] for entry in case['time_entries'])
-                case['notes'] = get_case_notes(case_id)
-                return case
+                totals = get_billing_rollups().case_totals(case_id)
+                return {
+                    **case.to_dict(),
+                    'description': get_case_description(case),
+                    'time_entries': get_time_entries_for_case(case_id),
+                    'total_time': totals['hours'],
+                    'total_billed': totals['amount'],
+                    'notes': get_case_notes(case_id),
+                }
         return None
     except Exception as e:
+        record_error("database.get_case_by_id")
         print(f"❌ Error getting case by ID: {e}")
         return None
 
+@timed("database.add_time_entry")
 def add_time_entry(case_id: str, task_description: str, hours: float, date: str = None, rate: float = 250, user: str = "System") -> bool:
     """Add a time entry for a case with comprehensive tracking"""
     try:
-        entries = load_time_entries()
-        
-        new_entry = {
-            'id': str(uuid.uuid4()),
-            'case_id': case_id,
-            'date': date or datetime.now().isoformat(),
-            'task_description': task_description,
-            'hours': hours,
-            'rate': rate,
-            'amount': hours * rate,
-            'user': user,
-            'billed': False,
-            'created_at': datetime.now().isoformat()
-        }
-        
-        entries.append(new_entry)
+        new_entry = TimeEntry(
+            id=str(uuid.uuid4()),
+            case_id=case_id,
+            date=date or datetime.now().isoformat(),
+            task_description=task_description,
+            hours=hours,
+            rate=rate,
+            amount=hours * rate,
+            user=user,
+            billed=False,
+            created_at=datetime.now().isoformat()
+        )
         
-        if save_time_entries(entries):
-            # Update case total time and amount
-            cases = load_cases()
-            for case in cases:
-                if case['case_id'] == case_id:
-                    case['time_spent'] = case.get('time_spent', 0) + hours
-                    case['billed_amount'] = case.get('billed_amount', 0) + (hours * rate)
-                    case['last_updated'] = datetime.now().isoformat()
-                    break
-            
-            save_cases(cases)
-            return True
-        return False
+        # The intent is journaled first, so a crash between the entry save and
+        # the case save is rolled forward on the next start or reconcile
+        _journal_intent({'op': 'time_entry', 'entry': new_entry.to_dict()})
+        if not _apply_time_entry(new_entry):
+            _resolve_intents({new_entry.id})
+            return False
+        if _sync_case_counters({case_id}, touch=True):
+            _resolve_intents({new_entry.id})
+        return True
     except Exception as e:
+        record_error("database.add_time_entry")
         print(f"❌ Error adding time entry: {e}")
         return False
 
-def get_time_entries_for_case(case_id: str) -> List[Dict]:
+@timed("database.get_time_entries_for_case")
+def get_time_entries_for_case(case_id: str) -> List[TimeEntry]:
     """Get all time entries for a specific case"""
     try:
         entries = load_time_entries()
-        return [entry for entry in entries if entry['case_id'] == case_id]
+        return [entry for entry in entries if entry.case_id == case_id]
     except Exception as e:
+        record_error("database.get_time_entries_for_case")
         print(f"❌ Error getting time entries for case: {e}")
         return []
 
-def get_time_entries(date_from: str = None, date_to: str = None) -> List[Dict]:
+@timed("database.get_time_entries")
+def get_time_entries(date_from: str = None, date_to: str = None) -> List[TimeEntry]:
     """Get time entries with optional date filtering"""
     try:
         entries = load_time_entries()
@@ -175,7 +276,7 @@ def get_time_entries(date_from: str = None, date_to: str = None) -> List[Dict]:
         if date_from and date_to:
             filtered_entries = []
             for entry in entries:
-                entry_date = datetime.fromisoformat(entry['date']).date()
+                entry_date = datetime.fromisoformat(entry.date).date()
                 from_date = datetime.fromisoformat(date_from).date()
                 to_date = datetime.fromisoformat(date_to).date()
                 if from_date <= entry_date <= to_date:
@@ -184,78 +285,80 @@ def get_time_entries(date_from: str = None, date_to: str = None) -> List[Dict]:
         
         return entries
     except Exception as e:
+        record_error("database.get_time_entries")
         print(f"❌ Error getting time entries: {e}")
         return []
 
+@timed("database.add_case_note")
 def add_case_note(case_id: str, note_content: str, author: str = "System", note_type: str = "general") -> bool:
     """Add a note to a case with comprehensive metadata"""
     try:
-        notes = load_notes()
-        
-        new_note = {
-            'id': str(uuid.uuid4()),
-            'case_id': case_id,
-            'timestamp': datetime.now().isoformat(),
-            'author': author,
-            'content': note_content,
-            'type': note_type,
-            'case_status_at_time': get_case_by_id(case_id).get('status', 'Unknown') if get_case_by_id(case_id) else 'Unknown'
-        }
+        case = get_case_by_id(case_id)
+        new_note = Note(
+            id=str(uuid.uuid4()),
+            case_id=case_id,
+            timestamp=datetime.now().isoformat(),
+            author=author,
+            content=note_content,
+            type=note_type,
+            case_status_at_time=case.get('status', 'Unknown') if case else 'Unknown'
+        )
         
-        notes.append(new_note)
-        return save_notes(notes)
+        return _versioned_write("case_notes.json", load_notes, save_notes, 'id',
+                                lambda notes: {new_note.id: new_note})
     except Exception as e:
+        record_error("database.add_case_note")
         print(f"❌ Error adding case note: {e}")
         return False
 
-def get_case_notes(case_id: str) -> List[Dict]:
+@timed("database.get_case_notes")
+def get_case_notes(case_id: str) -> List[Note]:
     """Get all notes for a specific case"""
     try:
         notes = load_notes()
-        case_notes = [note for note in notes if note['case_id'] == case_id]
-        return sorted(case_notes, key=lambda x: x['timestamp'], reverse=True)
+        case_notes = [note for note in notes if note.case_id == case_id]
+        return sorted(case_notes, key=lambda x: x.timestamp, reverse=True)
     except Exception as e:
+        record_error("database.get_case_notes")
         print(f"❌ Error getting case notes: {e}")
         return []
 
+@timed("database.delete_case")
 def delete_case(case_id: str) -> bool:
     """Delete a case and all associated data"""
     try:
-        cases = load_cases()
-        initial_count = len(cases)
-        
-        # Filter out the case to delete
-        updated_cases = [case for case in cases if case['case_id'] != case_id]
+        def plan(cases: List[Case]) -> Optional[Dict]:
+            if any(case.case_id == case_id for case in cases):
+                return {case_id: None}
+            return None
         
-        if len(updated_cases) < initial_count:
-            # Case was found and removed
-            if save_cases(updated_cases):
-                # Also remove related time entries and notes
-                cleanup_case_data(case_id)
-                return True
+        if _versioned_write("cases.json", load_cases, save_cases, 'case_id', plan):
+            # Also remove related time entries, notes and orphaned description blobs
+            cleanup_case_data(case_id)
+            collect_unreferenced_blobs()
+            return True
         return False
     except Exception as e:
+        record_error("database.delete_case")
         print(f"❌ Error deleting case: {e}")
         return False
 
+@timed("database.cleanup_case_data")
 def cleanup_case_data(case_id: str) -> bool:
     """Clean up related data when a case is deleted"""
     try:
-        # Clean up time entries
-        entries = load_time_entries()
-        updated_entries = [entry for entry in entries if entry['case_id'] != case_id]
-        save_time_entries(updated_entries)
-        
-        # Clean up notes
-        notes = load_notes()
-        updated_notes = [note for note in notes if note['case_id'] != case_id]
-        save_notes(updated_notes)
+        def plan(records: List) -> Dict:
+            return {record.id: None for record in records if record.case_id == case_id}
         
-        return True
+        # Clean up time entries, then notes
+        return (_versioned_write("time_entries.json", load_time_entries, save_time_entries, 'id', plan)
+                and _versioned_write("case_notes.json", load_notes, save_notes, 'id', plan))
     except Exception as e:
+        record_error("database.cleanup_case_data")
         print(f"❌ Error cleaning up case data: {e}")
         return False
 
+@timed("database.export_cases_to_csv")
 def export_cases_to_csv() -> str:
     """Export all cases to CSV format"""
     try:
@@ -264,7 +367,7 @@ def export_cases_to_csv() -> str:
             return None
             
         # Convert to DataFrame
-        df = pd.DataFrame(cases)
+        df = pd.DataFrame(to_dicts(cases))
         
         # Select and order columns for better readability
         display_columns = [
@@ -289,9 +392,11 @@ def export_cases_to_csv() -> str:
         
         return df.to_csv(index=False)
     except Exception as e:
+        record_error("database.export_cases_to_csv")
         print(f"❌ Error exporting cases: {e}")
         return None
 
+@timed("database.get_case_statistics")
 def get_case_statistics() -> Dict:
     """Get comprehensive case statistics"""
     try:
@@ -313,33 +418,33 @@ def get_case_statistics() -> Dict:
         
         for case in cases:
             # Count by status
-            status = case.get('status', 'Unknown')
+            status = case.status
             stats['cases_by_status'][status] = stats['cases_by_status'].get(status, 0) + 1
             
             # Count by practice area
-            practice_area = case.get('practice_area', 'Unknown')
+            practice_area = case.practice_area or 'Unknown'
             stats['cases_by_practice_area'][practice_area] = stats['cases_by_practice_area'].get(practice_area, 0) + 1
             
             # Count by jurisdiction
-            jurisdiction = case.get('jurisdiction', 'Unknown')
+            jurisdiction = case.jurisdiction or 'Unknown'
             stats['cases_by_jurisdiction'][jurisdiction] = stats['cases_by_jurisdiction'].get(jurisdiction, 0) + 1
             
             # Total value
-            stats['total_value'] += case.get('matter_value', 0)
+            stats['total_value'] += case.matter_value
             
             # Active cases
-            if case.get('status') in ['Active', 'Accepted', 'Review']:
+            if case.status in ['Active', 'Accepted', 'Review']:
                 stats['active_cases'] += 1
             
             # High risk cases
-            if case.get('complexity_score', 0) > 75:
+            if case.complexity_score > 75:
                 stats['high_risk_cases'] += 1
             
             # Complexity scores for average
-            complexity_scores.append(case.get('complexity_score', 50))
+            complexity_scores.append(case.complexity_score)
             
             # Total time spent
-            stats['total_time_spent'] += case.get('time_spent', 0)
+            stats['total_time_spent'] += case.time_spent
         
         # Calculate averages
         if complexity_scores:
@@ -347,100 +452,493 @@ def get_case_statistics() -> Dict:
         
         return stats
     except Exception as e:
+        record_error("database.get_case_statistics")
         print(f"❌ Error getting case statistics: {e}")
         return {}
 
-def load_time_entries() -> List[Dict]:
+URGENCY_RANK = {'Critical': 2, 'High': 1}
+
+class CaseIndex:
+    """Presorted views over the cases so top-k queries never re-sort the whole list"""
+
+    def __init__(self, cases: List[Case]):
+        # The snapshot the views were built from, so callers can derive everything else from it too.
+        # The index is shared by every session; the records are frozen, so it is safe to hand them out.
+        cases = tuple(cases)
+        self.cases = cases
+        self.size = len(cases)
+        self.by_last_updated = sorted(
+            cases, key=lambda c: c.last_updated or c.intake_date, reverse=True
+        )
+        self.by_intake_date = sorted(cases, key=lambda c: c.intake_date, reverse=True)
+        open_urgent = [c for c in cases if c.urgency in URGENCY_RANK and c.status != 'Closed']
+        self.by_urgency = sorted(
+            open_urgent,
+            key=lambda c: (URGENCY_RANK[c.urgency], c.complexity_score),
+            reverse=True
+        )
+
+    def recent(self, k: int) -> List[Case]:
+        """Most recently updated cases"""
+        return self.by_last_updated[:k]
+
+    def urgent(self, k: int) -> List[Case]:
+        """Open High/Critical cases, most urgent then most complex first"""
+        return self.by_urgency[:k]
+
+    def newest_intakes(self, k: int) -> List[Case]:
+        """Most recently opened cases"""
+        return self.by_intake_date[:k]
+
+_case_index = None
+_case_index_signature = None
+_case_index_stats = {'hits': 0, 'misses': 0}
+
+@timed("database.get_case_index")
+def get_case_index() -> CaseIndex:
+    """Return the case index, rebuilding it only when cases.json has changed"""
+    global _case_index, _case_index_signature
+    signature = _file_signature("cases.json")
+    if _case_index is None or signature != _case_index_signature:
+        _case_index_stats['misses'] += 1
+        _case_index = CaseIndex(load_cases())
+        _case_index_signature = signature
+    else:
+        _case_index_stats['hits'] += 1
+    return _case_index
+
+def get_case_index_info() -> Dict:
+    """Hit/miss counts and the cases.json signature the index was built from"""
+    return {
+        **_case_index_stats,
+        'signature': _case_index_signature,
+        'size': _case_index.size if _case_index is not None else 0,
+    }
+
+def get_recent_cases(limit: int = 5) -> List[Case]:
+    """Get the most recently updated cases"""
+    return get_case_index().recent(limit)
+
+def get_urgent_cases(limit: int = 3) -> List[Case]:
+    """Get open High/Critical cases ranked by urgency then complexity"""
+    return get_case_index().urgent(limit)
+
+def get_cases_by_intake_date(limit: int = 5) -> List[Case]:
+    """Get the most recently opened cases"""
+    return get_case_index().newest_intakes(limit)
+
+_write_counts: Dict[str, int] = {}
+
+def _count_write(path: str):
+    """Bump the in-process write counter that is part of a store's signature"""
+    _write_counts[path] = _write_counts.get(path, 0) + 1
+
+def _file_signature(path: str):
+    """(writes, inode, mtime_ns, size) of a data file, or None if it does not exist
+
+    mtime and size alone miss a same-size rewrite within one clock tick.
+    Saves here bump the write counter, and saves from other processes
+    replace the file, which gives it a new inode.
+    """
+    try:
+        stat = os.stat(path)
+        return (_write_counts.get(path, 0), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+def _empty_rollup() -> Dict:
+    return {'hours': 0.0, 'amount': 0.0, 'unbilled_hours': 0.0, 'unbilled_amount': 0.0, 'entries': 0}
+
+class BillingRollups:
+    """Running time and billing totals per case, per user and per month
+
+    Built once from the time entries, then kept current entry by entry, so
+    totals never need a scan over years of entries. Request threads and the
+    reconciler share one instance, so every read and update holds its lock.
+    """
+
+    def __init__(self, entries: List[TimeEntry]):
+        self._lock = threading.RLock()
+        self.by_case: Dict[str, Dict] = {}
+        self.by_user: Dict[str, Dict] = {}
+        self.by_period: Dict[str, Dict] = {}
+        self.totals = _empty_rollup()
+        for entry in entries:
+            self.add(entry)
+
+    def _rollups_for(self, entry: TimeEntry) -> List[Dict]:
+        period = str(entry.date)[:7] or 'Unknown'
+        return [
+            self.totals,
+            self.by_case.setdefault(entry.case_id, _empty_rollup()),
+            self.by_user.setdefault(entry.user, _empty_rollup()),
+            self.by_period.setdefault(period, _empty_rollup()),
+        ]
+
+    def add(self, entry: TimeEntry):
+        hours, amount, billed = entry.hours, entry.amount, entry.billed
+        with self._lock:
+            for rollup in self._rollups_for(entry):
+                rollup['hours'] += hours
+                rollup['amount'] += amount
+                rollup['entries'] += 1
+                if not billed:
+                    rollup['unbilled_hours'] += hours
+                    rollup['unbilled_amount'] += amount
+
+    def mark_billed(self, entry: TimeEntry):
+        """Move an unbilled entry's hours and amount out of the unbilled totals"""
+        with self._lock:
+            for rollup in self._rollups_for(entry):
+                rollup['unbilled_hours'] -= entry.hours
+                rollup['unbilled_amount'] -= entry.amount
+
+    def case_totals(self, case_id: str) -> Dict:
+        with self._lock:
+            return dict(self.by_case.get(case_id) or _empty_rollup())
+
+    def unbilled_case_ids(self) -> set:
+        """Cases with unbilled time, without scanning the entries"""
+        with self._lock:
+            return {case_id for case_id, totals in self.by_case.items() if totals['unbilled_hours'] > 1e-9}
+
+    def snapshot(self) -> Dict:
+        """Copies of the totals and each breakdown, safe to render while entries keep arriving"""
+        with self._lock:
+            return {
+                'totals': dict(self.totals),
+                'by_case': {key: dict(totals) for key, totals in self.by_case.items()},
+                'by_user': {key: dict(totals) for key, totals in self.by_user.items()},
+                'by_period': {key: dict(totals) for key, totals in self.by_period.items()},
+            }
+
+_billing_rollups = None
+_billing_signature = None
+# Guards the cached rollups and their signature: request threads and the reconciler both refresh them
+_billing_lock = threading.RLock()
+
+JOURNAL_FILE = "write_journal.jsonl"
+LEGACY_JOURNAL_FILE = "write_journal.json"
+ROLLUP_TOLERANCE = 0.005
+_reconciler_lock = threading.Lock()
+_reconciler_stop = threading.Event()
+_reconciler_state = {'thread': None, 'last_result': None}
+
+@timed("database.get_billing_rollups")
+def get_billing_rollups() -> BillingRollups:
+    """Return the billing rollups, rebuilding them only when time_entries.json changed elsewhere"""
+    global _billing_rollups, _billing_signature
+    with _billing_lock:
+        signature = _file_signature("time_entries.json")
+        if _billing_rollups is None or signature != _billing_signature:
+            _billing_rollups = BillingRollups(load_time_entries())
+            _billing_signature = signature
+        return _billing_rollups
+
+def _update_billing_rollups(previous_signature, update):
+    """Apply a just-saved change to the rollups if they were current before the save"""
+    global _billing_signature
+    with _billing_lock:
+        if _billing_rollups is not None and _billing_signature == previous_signature:
+            update(_billing_rollups)
+            _billing_signature = _file_signature("time_entries.json")
+
+def _append_journal(record: Dict):
+    """Durably append one line to the journal; each intent or resolution costs one short write"""
+    with open(JOURNAL_FILE, "a", encoding='utf-8') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _read_journal() -> List[Dict]:
+    """Intents that have not been resolved yet, oldest first"""
+    records = []
+    try:
+        with open(LEGACY_JOURNAL_FILE, "r", encoding='utf-8') as f:
+            content = f.read().strip()
+        records.extend(json.loads(content) if content else [])
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"❌ Error reading write journal: {e}")
+    try:
+        with open(JOURNAL_FILE, "r", encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        lines = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # A crash mid-append leaves at most one torn line, and its write never started
+            continue
+    resolved = {entry_id for record in records if record.get('op') == 'resolved' for entry_id in record['ids']}
+    return [record for record in records
+            if record.get('op') != 'resolved' and record['entry']['id'] not in resolved]
+
+def _clear_journal():
+    for path in (JOURNAL_FILE, LEGACY_JOURNAL_FILE):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def _journal_intent(intent: Dict):
+    """Add one write to the journal alongside any others in flight"""
+    with file_lock(JOURNAL_FILE):
+        _append_journal(intent)
+
+def _resolve_intents(entry_ids):
+    """Mark finished writes in the journal, removing it once nothing is left in flight"""
+    with file_lock(JOURNAL_FILE):
+        remaining = [intent for intent in _read_journal() if intent['entry']['id'] not in entry_ids]
+        if remaining:
+            _append_journal({'op': 'resolved', 'ids': sorted(entry_ids)})
+        else:
+            _clear_journal()
+
+def _apply_time_entry(entry: TimeEntry) -> bool:
+    """Append an entry unless it is already saved, keeping the rollups current"""
+    def plan(entries: List[TimeEntry]) -> Dict:
+        if any(existing.id == entry.id for existing in entries):
+            return {}
+        return {entry.id: entry}
+    
+    def on_saved(previous_signature, changes: Dict):
+        _update_billing_rollups(previous_signature, lambda rollups: rollups.add(entry))
+    
+    return _versioned_write("time_entries.json", load_time_entries, save_time_entries, 'id', plan, on_saved)
+
+def _counters_drifted(case: Case, totals: Dict) -> bool:
+    return (abs(case.time_spent - totals['hours']) > ROLLUP_TOLERANCE
+            or abs(case.billed_amount - totals['amount']) > ROLLUP_TOLERANCE)
+
+def _sync_case_counters(case_ids, touch: bool = False) -> bool:
+    """Set time_spent and billed_amount on the given cases from the billing rollups
+
+    The counters are assigned rather than incremented, so replaying a write
+    can never count an entry twice.
+    """
+    def plan(cases: List[Case]) -> Dict:
+        rollups = get_billing_rollups()
+        changes = {}
+        for case in cases:
+            if case.case_id not in case_ids:
+                continue
+            totals = rollups.case_totals(case.case_id)
+            if _counters_drifted(case, totals) or touch:
+                changes[case.case_id] = replace(
+                    case,
+                    time_spent=round(totals['hours'], 2),
+                    billed_amount=round(totals['amount'], 2),
+                    last_updated=datetime.now().isoformat() if touch else case.last_updated,
+                )
+        return changes
+    
+    return _versioned_write("cases.json", load_cases, save_cases, 'case_id', plan)
+
+def _replay_journal() -> int:
+    """Finish writes interrupted part-way; returns how many were replayed"""
+    intents = _read_journal()
+    if not intents:
+        return 0
+    entries = [TimeEntry.from_dict(intent['entry']) for intent in intents if intent.get('op') == 'time_entry']
+    applied = [entry for entry in entries if _apply_time_entry(entry)]
+    if applied and _sync_case_counters({entry.case_id for entry in applied}):
+        _resolve_intents({entry.id for entry in applied})
+    return len(applied)
+
+@timed("database.reconcile_case_rollups")
+def reconcile_case_rollups(repair: bool = True) -> Dict:
+    """Check every case's time_spent/billed_amount against the billing rollups, fixing drift in one save
+
+    Both sides come from signature-checked caches (the case index and the
+    rollups), so a pass with nothing changed reads no files at all.
+    """
+    try:
+        replayed = _replay_journal()
+        rollups = get_billing_rollups()
+        index = get_case_index()
+        drifted = [case.case_id for case in index.by_intake_date
+                   if _counters_drifted(case, rollups.case_totals(case.case_id))]
+        repaired = bool(repair and drifted) and _sync_case_counters(set(drifted))
+        result = {'checked': index.size, 'drifted': drifted, 'repaired': repaired,
+                  'replayed': replayed, 'at': datetime.now().isoformat()}
+        _reconciler_state['last_result'] = result
+        return result
+    except Exception as e:
+        record_error("database.reconcile_case_rollups")
+        print(f"❌ Error reconciling case rollups: {e}")
+        return {'checked': 0, 'drifted': [], 'repaired': False, 'replayed': 0, 'at': None}
+
+def start_rollup_reconciler(interval: float) -> Optional[threading.Thread]:
+    """Run reconcile_case_rollups every `interval` seconds on a daemon thread, once per process"""
+    with _reconciler_lock:
+        thread = _reconciler_state.get('thread')
+        if interval <= 0 or (thread is not None and thread.is_alive()):
+            return thread
+
+        def run():
+            while not _reconciler_stop.wait(interval):
+                reconcile_case_rollups()
+
+        _reconciler_stop.clear()
+        thread = threading.Thread(target=run, name="rollup-reconciler", daemon=True)
+        thread.start()
+        _reconciler_state['thread'] = thread
+        return thread
+
+def stop_rollup_reconciler():
+    with _reconciler_lock:
+        thread = _reconciler_state.pop('thread', None)
+        _reconciler_stop.set()
+    if thread is not None:
+        thread.join()
+
+def get_reconciler_status() -> Dict:
+    """Whether the background reconciler is running and what its last pass found"""
+    thread = _reconciler_state.get('thread')
+    return {'running': thread is not None and thread.is_alive(),
+            'last_result': _reconciler_state.get('last_result')}
+
+@timed("database.mark_time_entries_billed")
+def mark_time_entries_billed(invoice_by_entry: Dict[str, str], stamp: Optional[Dict] = None) -> int:
+    """Flag entries as billed against their invoice ids in a single save; returns how many changed
+
+    `stamp` holds further fields to set on every billed entry.
+    """
+    try:
+        billed = {}
+        
+        def plan(entries: List[TimeEntry]) -> Optional[Dict]:
+            billed.clear()
+            for entry in entries:
+                invoice_id = invoice_by_entry.get(entry.id)
+                if invoice_id and not entry.billed:
+                    billed[entry.id] = replace(entry, **{**(stamp or {}), 'billed': True, 'invoice_id': invoice_id})
+            return billed or None
+        
+        def on_saved(previous_signature, changes: Dict):
+            def apply(rollups: BillingRollups):
+                for entry in changes.values():
+                    rollups.mark_billed(entry)
+            _update_billing_rollups(previous_signature, apply)
+        
+        if _versioned_write("time_entries.json", load_time_entries, save_time_entries, 'id', plan, on_saved):
+            return len(billed)
+        return 0
+    except Exception as e:
+        record_error("database.mark_time_entries_billed")
+        print(f"❌ Error marking time entries billed: {e}")
+        return 0
+
+@timed("database.load_time_entries")
+def load_time_entries() -> List[TimeEntry]:
     """Load time entries from JSON file"""
     try:
-        if os.path.exists("time_entries.json"):
-            with open("time_entries.json", "r", encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    return json.loads(content)
-        return []
+        entries = read_records("time_entries.json")
+        record_file_io("database.load_time_entries", "time_entries.json")
+        return [TimeEntry.from_dict(entry) for entry in entries]
     except Exception as e:
+        record_error("database.load_time_entries")
         print(f"❌ Error loading time entries: {e}")
         return []
 
-def save_time_entries(entries: List[Dict]) -> bool:
-    """Save time entries to JSON file"""
+@timed("database.save_time_entries")
+def save_time_entries(entries: List[TimeEntry]) -> bool:
+    """Save time entries atomically, keeping the last 5 versions as backups"""
     try:
-        with open("time_entries.json", "w", encoding='utf-8') as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
+        persist("time_entries.json", to_dicts(entries))
+        _count_write("time_entries.json")
+        record_file_io("database.save_time_entries", "time_entries.json", written=True)
         return True
     except Exception as e:
+        record_error("database.save_time_entries")
         print(f"❌ Error saving time entries: {e}")
         return False
 
-def load_notes() -> List[Dict]:
+@timed("database.load_notes")
+def load_notes() -> List[Note]:
     """Load case notes from JSON file"""
     try:
-        if os.path.exists("case_notes.json"):
-            with open("case_notes.json", "r", encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    return json.loads(content)
-        return []
+        notes = read_records("case_notes.json")
+        record_file_io("database.load_notes", "case_notes.json")
+        return [Note.from_dict(note) for note in notes]
     except Exception as e:
+        record_error("database.load_notes")
         print(f"❌ Error loading notes: {e}")
         return []
 
-def save_notes(notes: List[Dict]) -> bool:
-    """Save case notes to JSON file"""
+@timed("database.save_notes")
+def save_notes(notes: List[Note]) -> bool:
+    """Save case notes atomically, keeping the last 5 versions as backups"""
     try:
-        with open("case_notes.json", "w", encoding='utf-8') as f:
-            json.dump(notes, f, indent=2, ensure_ascii=False)
+        persist("case_notes.json", to_dicts(notes))
+        _count_write("case_notes.json")
+        record_file_io("database.save_notes", "case_notes.json", written=True)
         return True
     except Exception as e:
+        record_error("database.save_notes")
         print(f"❌ Error saving notes: {e}")
         return False
 
-def search_cases_by_keyword(keyword: str, field: str = "all") -> List[Dict]:
+SEARCH_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _lowercase_blob_text(blob_id: str) -> str:
+    # Blobs are content-addressed, so an id always names the same text; missing blobs raise and are not cached
+    text = get_text(blob_id)
+    if text is None:
+        raise LookupError(blob_id)
+    return text.lower()
+
+def _searchable_description(case: Case) -> str:
+    """Lowercased full description, read from the blob store once per blob rather than once per search"""
+    blob_id = case.description_ref
+    if case.description is not None or not blob_id:
+        return get_case_description(case).lower()
+    try:
+        return _lowercase_blob_text(blob_id)
+    except LookupError:
+        return (case.description_snippet or '').lower()
+
+@timed("database.search_cases_by_keyword")
+def search_cases_by_keyword(keyword: str, field: str = "all") -> List[Case]:
     """Search cases by keyword in specified fields"""
     try:
-        cases = load_cases()
+        cases = get_case_index().cases
         matching_cases = []
         
         keyword_lower = keyword.lower()
         
         for case in cases:
             if field == "all" or field == "client_name":
-                if keyword_lower in case.get('client_name', '').lower():
+                if keyword_lower in (case.client_name or '').lower():
                     matching_cases.append(case)
                     continue
             if field == "all" or field == "case_type":
-                if keyword_lower in case.get('case_type', '').lower():
+                if keyword_lower in (case.case_type or '').lower():
                     matching_cases.append(case)
                     continue
             if field == "all" or field == "description":
-                if keyword_lower in case.get('description', '').lower():
+                if keyword_lower in _searchable_description(case):
                     matching_cases.append(case)
                     continue
             if field == "all" or field == "practice_area":
-                if keyword_lower in case.get('practice_area', '').lower():
+                if keyword_lower in (case.practice_area or '').lower():
                     matching_cases.append(case)
                     continue
             if field == "all" or field == "company_name":
-                if keyword_lower in case.get('company_name', '').lower():
+                if keyword_lower in (case.company_name or '').lower():
                     matching_cases.append(case)
                     continue
         
         return matching_cases
     except Exception as e:
+        record_error("database.search_cases_by_keyword")
         print(f"❌ Error searching cases: {e}")
         return []
 
-def generate_case_id() -> str:
-    """Generate a unique case ID"""
-    import time
-    import random
-    import string
-    
-    timestamp = int(time.time())
-    random_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"LAW-{timestamp}-{random_suffix}"
-
 # Initialize data files if they don't exist
 def initialize_data_files():
     """Initialize required data files if they don't exist"""
@@ -452,6 +950,8 @@ def initialize_data_files():
         if not os.path.exists("case_notes.json"):
             save_notes([])
         os.makedirs("backups", exist_ok=True)
+        if _replay_journal():
+            print("✅ Replayed interrupted time entry writes")
         print("✅ Data files initialized successfully")
     except Exception as e:
         print(f"❌ Error initializing data files: {e}")
@@ -0,0 +1,208 @@
+import heapq
+import itertools
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+import blob_store
+import database
+import instrumentation
+import serialization
+from models import Record
+
+DATA_FILES = ("cases.json", "time_entries.json", "case_notes.json", "invoices.json")
+BACKUP_DIR = "backups"
+SLOW_RERUN_LIMIT = 20
+
+_lock = threading.Lock()
+_slow_reruns = []  # min-heap of (seconds, seq, entry): the root is the fastest kept
+_sequence = itertools.count()
+_rerun_totals = {'count': 0, 'seconds': 0.0}
+_sessions: Dict[str, Dict] = {}  # session id -> latest rerun of that session
+SHARED_STATE_KEYS = ('cases',)  # the case snapshot belongs to the process-wide index, not the session
+
+
+def _current_session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def state_size(state) -> int:
+    """Approximate bytes held by one session's state, each object counted once
+
+    The shared case snapshot is left out, so sessions are not all charged
+    for the same records.
+    """
+    stack = [value for key, value in state.items() if key not in SHARED_STATE_KEYS]
+    seen = set()
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, Record):
+            stack.extend(getattr(obj, name) for name in obj.__slots__)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+def record_rerun(page: str, seconds: float, user: str = None, state_bytes: int = None):
+    """Remember a finished rerun if it is among the slowest seen by this process"""
+    entry = {'page': page, 'user': user, 'ms': round(seconds * 1000, 1),
+             'at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    session_id = _current_session_id()
+    with _lock:
+        if session_id is not None:
+            session = _sessions.setdefault(session_id, {'session': session_id[:8], 'reruns': 0})
+            session.update(user=user, page=page, reruns=session['reruns'] + 1, last_rerun=entry['at'],
+                           state_bytes=state_bytes)
+        _rerun_totals['count'] += 1
+        _rerun_totals['seconds'] += seconds
+        item = (seconds, next(_sequence), entry)
+        if len(_slow_reruns) < SLOW_RERUN_LIMIT:
+            heapq.heappush(_slow_reruns, item)
+        elif seconds > _slow_reruns[0][0]:
+            heapq.heapreplace(_slow_reruns, item)
+
+
+def slowest_reruns() -> List[Dict]:
+    with _lock:
+        return [entry for _, _, entry in sorted(_slow_reruns, reverse=True)]
+
+
+def rerun_summary() -> Dict:
+    with _lock:
+        count, seconds = _rerun_totals['count'], _rerun_totals['seconds']
+    return {'count': count, 'mean_ms': round(seconds / count * 1000, 1) if count else 0.0}
+
+
+def _disk_usage():
+    try:
+        disk = shutil.disk_usage(".")
+        return disk.total, disk.used
+    except OSError:
+        return 0, 0
+
+
+def storage_summary() -> Dict:
+    """Data file sizes and disk usage: a few stat calls, cheap enough to run on every rerun
+
+    storage_usage() also walks the blobs and backups; only the diagnostics page needs that.
+    """
+    data_bytes = 0
+    for name in DATA_FILES:
+        try:
+            data_bytes += os.path.getsize(name)
+        except OSError:
+            pass
+    disk_total, disk_used = _disk_usage()
+    return {'data_bytes': data_bytes, 'disk_fraction': disk_used / disk_total if disk_total else 0.0}
+
+
+def storage_usage() -> Dict:
+    """Sizes of the data stores, blobs and backups, plus usage of the disk holding them"""
+    files, formats = {}, {}
+    for name in DATA_FILES:
+        try:
+            files[name] = os.path.getsize(name)
+            with open(name, "rb") as f:
+                formats[name] = serialization.detect_format(f.read(64)) if files[name] else None
+        except OSError:
+            files[name] = 0
+            formats[name] = None
+    backups = 0
+    try:
+        with os.scandir(BACKUP_DIR) as entries:
+            backups = sum(entry.stat().st_size for entry in entries if entry.is_file())
+    except OSError:
+        pass
+    blobs = blob_store.blob_usage()
+    disk_total, disk_used = _disk_usage()
+    return {
+        'files': files,
+        'formats': formats,
+        'backups_bytes': backups,
+        'blobs': blobs['blobs'],
+        'blobs_bytes': blobs['bytes'],
+        'data_bytes': sum(files.values()) + backups + blobs['bytes'],
+        'disk_total': disk_total,
+        'disk_used': disk_used,
+        'disk_fraction': disk_used / disk_total if disk_total else 0.0,
+    }
+
+
+def cache_stats() -> List[Dict]:
+    """Hit rates for the in-process caches"""
+    rows = []
+    info = database.parse_timestamp.cache_info()
+    rows.append({'cache': 'parse_timestamp', 'hits': info.hits, 'misses': info.misses,
+                 'entries': info.currsize, 'capacity': info.maxsize})
+    info = database._lowercase_blob_text.cache_info()
+    rows.append({'cache': 'search_descriptions', 'hits': info.hits, 'misses': info.misses,
+                 'entries': info.currsize, 'capacity': info.maxsize})
+    index = database.get_case_index_info()
+    rows.append({'cache': 'case_index', 'hits': index['hits'], 'misses': index['misses'],
+                 'entries': index['size'], 'capacity': None})
+    for row in rows:
+        lookups = row['hits'] + row['misses']
+        row['hit_rate'] = f"{row['hits'] / lookups:.1%}" if lookups else "n/a"
+    return rows
+
+
+def data_version() -> Dict:
+    """The cases.json signature the case index was last built from"""
+    index = database.get_case_index_info()
+    signature = index['signature']
+    if not signature:
+        return {'version': None, 'modified': None, 'cases': index['size']}
+    writes, inode, mtime_ns, size = signature
+    return {
+        'version': f"{inode:x}-{mtime_ns:x}-{size:x}-{writes}",
+        'modified': datetime.fromtimestamp(mtime_ns / 1e9).strftime('%Y-%m-%d %H:%M:%S'),
+        'cases': index['size'],
+    }
+
+
+def operation_stats(prefix: str = "") -> List[Dict]:
+    """Per-operation calls and mean latency from the instrumentation registry"""
+    rows = []
+    for operation, stats in instrumentation.registry.snapshot().items():
+        if not operation.startswith(prefix):
+            continue
+        calls = stats['calls']
+        rows.append({
+            'operation': operation,
+            'calls': calls,
+            'mean_ms': round(stats['total_seconds'] / calls * 1000, 2) if calls else 0.0,
+            'total_ms': round(stats['total_seconds'] * 1000, 1),
+            'errors': stats['errors'],
+            'bytes_read': stats['bytes_read'],
+            'bytes_written': stats['bytes_written'],
+        })
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def active_sessions() -> List[Dict]:
+    """Sessions still connected to this server, with their user, page, rerun count and state size"""
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return []
+        runtime = Runtime.instance()
+        with _lock:
+            for session_id in [session_id for session_id in _sessions if not runtime.is_active_session(session_id)]:
+                del _sessions[session_id]
+            return [dict(session) for session in _sessions.values()]
+    except Exception as e:
+        print(f"⚠️ Could not list active sessions: {e}")
+        return []
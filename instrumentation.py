@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Dict, Optional
+
+import tracing
+from config import config
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "legalai"
+_DISABLED = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> Dict[str, int]:
+        running, result = 0, {}
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            running += count
+            result[bound] = running
+        return result
+
+
+class MetricsRegistry:
+    """Per-operation call counts, errors, latency histograms and bytes read/written"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls: Dict[str, int] = {}
+            self.errors: Dict[str, int] = {}
+            self.latency: Dict[str, Histogram] = {}
+            self.bytes_read: Dict[str, int] = {}
+            self.bytes_written: Dict[str, int] = {}
+
+    def observe(self, operation: str, seconds: float, error: bool = False):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            if error:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+            histogram = self.latency.get(operation)
+            if histogram is None:
+                histogram = self.latency[operation] = Histogram()
+            histogram.observe(seconds)
+
+    def add_error(self, operation: str):
+        with self._lock:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def add_bytes(self, operation: str, read: int = 0, written: int = 0):
+        with self._lock:
+            if read:
+                self.bytes_read[operation] = self.bytes_read.get(operation, 0) + read
+            if written:
+                self.bytes_written[operation] = self.bytes_written.get(operation, 0) + written
+
+    def snapshot(self) -> Dict:
+        """Plain-dict copy of every metric, safe to serialize or render"""
+        with self._lock:
+            operations = sorted(set(self.calls) | set(self.bytes_read) | set(self.bytes_written))
+            return {
+                operation: {
+                    "calls": self.calls.get(operation, 0),
+                    "errors": self.errors.get(operation, 0),
+                    "total_seconds": round(self.latency[operation].sum, 6) if operation in self.latency else 0.0,
+                    "buckets": self.latency[operation].cumulative() if operation in self.latency else {},
+                    "bytes_read": self.bytes_read.get(operation, 0),
+                    "bytes_written": self.bytes_written.get(operation, 0),
+                }
+                for operation in operations
+            }
+
+    def to_json(self) -> str:
+        return json.dumps({"enabled": is_enabled(), "operations": self.snapshot()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Text exposition format (version 0.0.4)"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, field: str):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for operation, stats in snapshot.items():
+                lines.append(f'{METRIC_PREFIX}_{name}{{operation="{operation}"}} {stats[field]}')
+
+        family("operation_calls_total", "counter", "Calls per instrumented operation", "calls")
+        family("operation_errors_total", "counter", "Calls that raised an exception", "errors")
+        family("operation_bytes_read_total", "counter", "Bytes read from storage", "bytes_read")
+        family("operation_bytes_written_total", "counter", "Bytes written to storage", "bytes_written")
+
+        name = f"{METRIC_PREFIX}_operation_duration_seconds"
+        lines.append(f"# HELP {name} Latency per instrumented operation")
+        lines.append(f"# TYPE {name} histogram")
+        for operation, stats in snapshot.items():
+            if not stats["buckets"]:
+                continue
+            for bound, count in stats["buckets"].items():
+                lines.append(f'{name}_bucket{{operation="{operation}",le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{operation="{operation}"}} {stats["total_seconds"]}')
+            lines.append(f'{name}_count{{operation="{operation}"}} {stats["calls"]}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+_enabled = config.METRICS_ENABLED
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(enabled: bool = True):
+    """Switch recording on or off at runtime; decorated functions check on every call"""
+    global _enabled
+    _enabled = enabled
+
+
+def timed(operation: str):
+    """Decorator recording calls, errors and latency under `operation`
+
+    When tracing is on, each call also opens a span of the same name. With
+    both metrics and tracing disabled the wrapper costs two flag checks per call.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                if not tracing.enabled:
+                    return func(*args, **kwargs)
+                with tracing.span(operation):
+                    return func(*args, **kwargs)
+            with tracing.span(operation) if tracing.enabled else _DISABLED:
+                start = time.perf_counter()
+                error = False
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    # Not BaseException: st.rerun()/st.stop() end a script that way, and are not failures
+                    error = True
+                    raise
+                finally:
+                    registry.observe(operation, time.perf_counter() - start, error)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def _track(operation: str):
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        registry.observe(operation, time.perf_counter() - start, error)
+
+
+def track(operation: str):
+    """Context manager form of `timed`, for blocks that are not whole functions"""
+    if tracing.enabled:
+        return _traced(operation)
+    return _track(operation) if _enabled else _DISABLED
+
+
+@contextmanager
+def _traced(operation: str):
+    with tracing.span(operation), (_track(operation) if _enabled else _DISABLED):
+        yield
+
+
+def record_error(operation: str):
+    """Count a failure that `operation` handled itself, so `timed` never saw it raise"""
+    if _enabled:
+        registry.add_error(operation)
+
+
+def record_file_io(operation: str, path: str, written: bool = False, size: Optional[int] = None):
+    """Count a file's size as bytes read or written; only stats the file when enabled"""
+    if not _enabled:
+        return
+    try:
+        size = os.path.getsize(path) if size is None else size
+    except OSError:
+        return
+    if written:
+        registry.add_bytes(operation, written=size)
+    else:
+        registry.add_bytes(operation, read=size)
+
+
+def export_prometheus() -> str:
+    return registry.to_prometheus()
+
+
+def export_json() -> str:
+    return registry.to_json()
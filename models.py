@@ -0,0 +1,191 @@
+"""Typed records for cases, time entries and notes
+
+Each store's records decode into slotted, frozen dataclasses. Known fields
+are typed attributes with their defaults; numeric strings from older forms
+become numbers and required fields are filled, once, when the store is
+loaded. Fields a schema does not declare are kept in `extra` and written
+back on save. Records are immutable, so the process-wide case index can be
+shared by every session; a change is a new record from `dataclasses.replace`.
+
+Records become plain dicts only at the edges: `to_dict()` when a store is
+saved or rows are handed to pandas, `from_dict()` when a store is loaded or
+a form submits a new record. A field that is None is left out of
+`to_dict()`, so optional fields a record never had are not written.
+"""
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import ClassVar, Dict, Iterable, List, Optional
+
+from case_ids import generate_case_id
+
+
+def _number(value):
+    """Numeric strings from older forms become numbers; anything else is left as stored"""
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return int(number) if number.is_integer() and "." not in value else number
+    return value
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _new_id() -> str:
+    return str(uuid.uuid4())
+
+
+class Record:
+    """Conversion to and from the stored dict form, shared by every record type"""
+
+    __slots__ = ()
+    FIELDS: ClassVar[tuple] = ()
+    FIELD_SET: ClassVar[frozenset] = frozenset()
+    NUMERIC: ClassVar[tuple] = ()
+    # Filled when missing or empty, like the old validate_case
+    REQUIRED: ClassVar[Dict] = {}
+    _SETTERS: ClassVar[tuple] = ()
+    _NUMERIC_SETTERS: ClassVar[tuple] = ()
+    _REQUIRED_SETTERS: ClassVar[Dict] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Record":
+        """Decode one stored record, coercing numbers and filling required fields"""
+        # Decoding is on every store load, so slots are set through their
+        # descriptors instead of paying for the frozen __init__'s object.__setattr__
+        record = _new_record(cls)
+        get = data.get
+        for set_field, name, default in cls._SETTERS:
+            set_field(record, get(name, default))
+        for name, set_field in cls._NUMERIC_SETTERS:
+            value = get(name)
+            if isinstance(value, str):
+                set_field(record, _number(value))
+        for name, (set_field, default) in cls._REQUIRED_SETTERS.items():
+            if not get(name):
+                set_field(record, default() if callable(default) else default)
+        extra = None
+        if not cls.FIELD_SET.issuperset(data):
+            extra = {key: value for key, value in data.items() if key not in cls.FIELD_SET}
+        cls.extra.__set__(record, extra)
+        return record
+
+    def to_dict(self) -> Dict:
+        """The stored form: set fields in declaration order, then the undeclared ones"""
+        data = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+_new_record = object.__new__
+
+
+def _record(cls):
+    """Make `cls` a slotted, frozen dataclass and note its fields and their slot setters for decoding"""
+    cls = dataclass(slots=True, frozen=True)(cls)
+    declared = [f for f in fields(cls) if f.name != "extra"]
+    cls.FIELDS = tuple(f.name for f in declared)
+    cls.FIELD_SET = frozenset(cls.FIELDS)
+    cls._SETTERS = tuple((getattr(cls, f.name).__set__, f.name, f.default) for f in declared)
+    cls._NUMERIC_SETTERS = tuple((name, getattr(cls, name).__set__) for name in cls.NUMERIC)
+    cls._REQUIRED_SETTERS = {name: (getattr(cls, name).__set__, default) for name, default in cls.REQUIRED.items()}
+    return cls
+
+
+def to_dicts(records: Iterable) -> List[Dict]:
+    """Stored form of a list of records; plain dicts, e.g. seed data, pass through"""
+    return [record.to_dict() if isinstance(record, Record) else record for record in records]
+
+
+@_record
+class Case(Record):
+    case_id: str = ""
+    client_name: str = "Unknown Client"
+    email: str = ""
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    company_name: Optional[str] = None
+    address: Optional[str] = None
+    case_type: Optional[str] = None
+    practice_area: Optional[str] = None
+    matter_value: float = 0
+    estimated_value: Optional[float] = None
+    urgency: Optional[str] = None
+    complexity_score: float = 0
+    description: Optional[str] = None
+    description_ref: Optional[str] = None
+    description_snippet: Optional[str] = None
+    description_length: Optional[int] = None
+    jurisdiction: Optional[str] = None
+    legal_system: Optional[str] = None
+    status: str = "Intake"
+    outcome: Optional[str] = None
+    intake_date: str = ""
+    last_updated: str = ""
+    lead_partner: Optional[str] = None
+    associate: Optional[str] = None
+    billing_method: Optional[str] = None
+    budget_cap: Optional[float] = None
+    referral_source: Optional[str] = None
+    status_history: Optional[List[Dict]] = None
+    ai_analysis: Optional[Dict] = None
+    time_spent: float = 0
+    billed_amount: float = 0
+    version: Optional[int] = None
+    extra: Optional[Dict] = None
+
+    NUMERIC: ClassVar[tuple] = ("matter_value", "estimated_value", "complexity_score", "budget_cap",
+                                "time_spent", "billed_amount")
+    REQUIRED: ClassVar[Dict] = {
+        "case_id": generate_case_id,
+        "client_name": "Unknown Client",
+        "status": "Intake",
+        "intake_date": _now,
+        "last_updated": _now,
+    }
+
+
+@_record
+class TimeEntry(Record):
+    id: str = ""
+    case_id: Optional[str] = None
+    date: str = ""
+    task_description: str = ""
+    hours: float = 0
+    rate: float = 0
+    amount: float = 0
+    user: str = "System"
+    billed: bool = False
+    invoice_id: Optional[str] = None
+    billed_at: Optional[str] = None
+    billed_by: Optional[str] = None
+    created_at: Optional[str] = None
+    version: Optional[int] = None
+    extra: Optional[Dict] = None
+
+    NUMERIC: ClassVar[tuple] = ("hours", "rate", "amount")
+    REQUIRED: ClassVar[Dict] = {"id": _new_id}
+
+
+@_record
+class Note(Record):
+    id: str = ""
+    case_id: Optional[str] = None
+    timestamp: str = ""
+    author: str = "System"
+    content: str = ""
+    type: str = "general"
+    case_status_at_time: Optional[str] = None
+    version: Optional[int] = None
+    extra: Optional[Dict] = None
+
+    REQUIRED: ClassVar[Dict] = {"id": _new_id}
@@ -0,0 +1,200 @@
+"""Pluggable encodings for the data stores
+
+Formats:
+    json      indented JSON, human-readable and diff-friendly (the default)
+    fastjson  compact JSON
+    msgpack   MessagePack, needs `msgspec` or `msgpack`
+
+JSON is produced and parsed by `orjson` or `msgspec` when either is
+installed, falling back to the standard library. Any format can also be
+zstd-compressed (needs `zstandard`, or Python 3.14's `compression.zstd`).
+
+Reads detect the format from the bytes themselves, so changing
+LEGALAI_DATA_FORMAT / LEGALAI_DATA_COMPRESSION needs no migration: each
+store is rewritten in the new format on its next save. File names stay
+as they are (cases.json etc.) whatever the encoding.
+
+The JSON backends agree on values, not bytes: orjson and msgspec may spell
+a float differently (1e-05 as 0.00001) and write NaN/Infinity as null,
+where the standard library writes NaN. Stores holding NaN from older
+stdlib-written files still load.
+"""
+import json
+from typing import Callable, Dict, Optional
+
+from config import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from compression import zstd as stdlib_zstd
+except ImportError:
+    stdlib_zstd = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class DecodeError(ValueError):
+    """Stored bytes could not be decoded in any known format"""
+
+
+def _default(obj):
+    """numpy values encode as the Python ones; anything else unknown as its str(), like json.dump(default=str)"""
+    if hasattr(obj, "dtype") and hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+class Codec:
+    """A named pair of encode/decode functions"""
+
+    def __init__(self, name: str, encode: Callable, decode: Callable):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+
+def _json_encoder(indent: bool) -> Callable:
+    if orjson is not None:
+        # Datetimes go through _default like the stdlib path, so output matches either way
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return lambda obj: orjson.dumps(obj, default=_default, option=options)
+    if msgspec is not None and not indent:
+        encoder = msgspec.json.Encoder(enc_hook=_default)
+        return encoder.encode
+    return lambda obj: json.dumps(obj, indent=2 if indent else None, separators=None if indent else (",", ":"),
+                                  ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def _stdlib_json_loads(data: bytes):
+    return json.loads(data.decode("utf-8"))
+
+
+def _json_decoder() -> Callable:
+    if orjson is not None:
+        fast = orjson.loads
+    elif msgspec is not None:
+        fast = msgspec.json.Decoder().decode
+    else:
+        return _stdlib_json_loads
+
+    def decode(data: bytes):
+        try:
+            return fast(data)
+        except Exception:
+            # NaN and Infinity are not JSON, but older stdlib-written stores contain them
+            return _stdlib_json_loads(data)
+    return decode
+
+
+def _msgpack_codec() -> Optional[Codec]:
+    if msgspec is not None:
+        return Codec("msgpack", msgspec.msgpack.Encoder(enc_hook=_default).encode, msgspec.msgpack.Decoder().decode)
+    if msgpack is not None:
+        return Codec("msgpack", lambda obj: msgpack.packb(obj, default=_default, use_bin_type=True),
+                     lambda data: msgpack.unpackb(data, raw=False))
+    return None
+
+
+def _zstd_functions():
+    if zstandard is not None:
+        return (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+                lambda data: zstandard.ZstdDecompressor().decompress(data))
+    if stdlib_zstd is not None:
+        return (lambda data, level: stdlib_zstd.compress(data, level=level), stdlib_zstd.decompress)
+    return None
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec("json", _json_encoder(indent=True), _json_decoder()),
+    "fastjson": Codec("fastjson", _json_encoder(indent=False), _json_decoder()),
+}
+_msgpack = _msgpack_codec()
+if _msgpack is not None:
+    CODECS["msgpack"] = _msgpack
+_zstd = _zstd_functions()
+
+
+def register_codec(codec: Codec):
+    """Add or replace a codec; new formats must also be recognisable by detect_format"""
+    CODECS[codec.name] = codec
+
+
+def available_formats() -> Dict[str, bool]:
+    """Which formats and compression this install can write"""
+    return {"json": True, "fastjson": True, "msgpack": "msgpack" in CODECS, "zstd": _zstd is not None}
+
+
+def _resolve(format: Optional[str], compression: Optional[str]):
+    format = format or config.DATA_FORMAT
+    compression = compression or config.DATA_COMPRESSION
+    if format not in CODECS:
+        print(f"⚠️ Data format '{format}' is not available here; writing json")
+        format = "json"
+    if compression == "zstd" and _zstd is None:
+        print("⚠️ zstd compression is not available here; writing uncompressed")
+        compression = "none"
+    return CODECS[format], compression
+
+
+def encode(records, format: Optional[str] = None, compression: Optional[str] = None) -> bytes:
+    """Serialize `records` in the given (or configured) format and compression"""
+    codec, compression = _resolve(format, compression)
+    data = codec.encode(records)
+    if compression == "zstd":
+        data = _zstd[0](data, config.ZSTD_LEVEL)
+    return data
+
+
+def detect_format(data: bytes) -> str:
+    """'zstd', 'json' or 'msgpack', judged from the leading bytes"""
+    if data.startswith(ZSTD_MAGIC):
+        return "zstd"
+    # Stores hold arrays or objects; MessagePack never starts those with '[', '{' or '"'
+    if data.lstrip()[:1] in (b"[", b"{", b'"') or data.startswith(b"\xef\xbb\xbf"):
+        return "json"
+    return "msgpack"
+
+
+def decode(data: bytes):
+    """Deserialize bytes written by any codec; empty input decodes to []"""
+    try:
+        kind = detect_format(data)
+        if kind == "zstd":
+            if _zstd is None:
+                raise DecodeError("data is zstd-compressed but no zstd library is installed")
+            return decode(_zstd[1](data))
+        if kind == "json":
+            data = data.strip()
+            if data.startswith(b"\xef\xbb\xbf"):
+                data = data[3:]
+            return CODECS["json"].decode(data) if data else []
+        if not data.strip():
+            return []
+        if "msgpack" not in CODECS:
+            raise DecodeError("data looks like MessagePack but neither msgspec nor msgpack is installed")
+        return CODECS["msgpack"].decode(data)
+    except DecodeError:
+        raise
+    except Exception as e:
+        raise DecodeError(str(e)) from e
@@ -0,0 +1,145 @@
+"""Crash-safe persistence for the data stores
+
+Every save writes a temp file in the store's directory, fsyncs it, swaps it
+in with os.replace and fsyncs the directory, so readers see either the old
+file or the new one and a crash or full disk never leaves a half-written
+store. Because a live file is only ever replaced, never rewritten in place,
+a backup can be a hardlink to the outgoing file instead of a copy.
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import List, Optional
+
+import serialization
+
+BACKUP_DIR = "backups"
+MAX_BACKUPS = 5
+
+# Stores whose current file failed to decode on the last read, by absolute path
+_undecodable = set()
+
+
+def fsync_directory(directory: str):
+    """Make a rename inside `directory` durable; directories cannot be opened on Windows"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, data: bytes):
+    """Replace `path` with `data` so that it is either fully written or untouched"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
+
+
+def _backup_prefix(path: str) -> str:
+    return f"{os.path.splitext(os.path.basename(path))[0]}_backup_"
+
+
+def backups_for(path: str, backup_dir: str = BACKUP_DIR) -> List[str]:
+    """Backups of one store, newest first"""
+    prefix = _backup_prefix(path)
+    try:
+        names = [name for name in os.listdir(backup_dir) if name.startswith(prefix)]
+    except OSError:
+        return []
+    return [os.path.join(backup_dir, name) for name in sorted(names, reverse=True)]
+
+
+def _snapshot(path: str, backup_dir: str, label: str) -> Optional[str]:
+    """Hardlink the current file into `backup_dir`, copying where links are unsupported"""
+    if not os.path.exists(path):
+        return None
+    os.makedirs(backup_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    stem, ext = os.path.splitext(os.path.basename(path))
+    snapshot_path = os.path.join(backup_dir, f"{stem}_{label}_{timestamp}{ext}")
+    try:
+        os.link(path, snapshot_path)
+    except OSError:
+        shutil.copy2(path, snapshot_path)
+    return snapshot_path
+
+
+def backup_file(path: str, backup_dir: str = BACKUP_DIR, keep: int = MAX_BACKUPS) -> Optional[str]:
+    """Snapshot the current file as the newest backup and prune the oldest"""
+    backup_path = _snapshot(path, backup_dir, "backup")
+    if backup_path is not None:
+        prune_backups(path, backup_dir, keep)
+    return backup_path
+
+
+def quarantine_file(path: str, backup_dir: str = BACKUP_DIR) -> Optional[str]:
+    """Keep an undecodable store for inspection, outside the backup rotation so no good backup is pruned"""
+    return _snapshot(path, backup_dir, "corrupt")
+
+
+def prune_backups(path: str, backup_dir: str = BACKUP_DIR, keep: int = MAX_BACKUPS):
+    """Keep only the most recent backups of one store"""
+    try:
+        for old_backup in backups_for(path, backup_dir)[keep:]:
+            os.remove(old_backup)
+    except OSError as e:
+        print(f"Warning: Could not clean up backups: {e}")
+
+
+def persist(path: str, records, backup: bool = True, format: Optional[str] = None,
+            compression: Optional[str] = None):
+    """Back up the current store, then atomically write `records` in the configured format"""
+    data = serialization.encode(records, format, compression)
+    if backup:
+        if os.path.abspath(path) in _undecodable:
+            quarantine_file(path)
+        else:
+            backup_file(path)
+    atomic_write(path, data)
+    _undecodable.discard(os.path.abspath(path))
+
+
+def _parse(path: str):
+    with open(path, "rb") as f:
+        return serialization.decode(f.read())
+
+
+def read_records(path: str):
+    """Decoded contents of a store ([] if missing or empty), or of its newest readable backup if corrupt
+
+    A corrupt store is remembered so the next save sets it aside instead of
+    rotating it into the backups.
+    """
+    try:
+        records = _parse(path)
+    except FileNotFoundError:
+        return []
+    except ValueError as e:
+        _undecodable.add(os.path.abspath(path))
+        print(f"❌ {path} is unreadable ({e}); trying backups")
+        for backup_path in backups_for(path):
+            try:
+                records = _parse(backup_path)
+            except (OSError, ValueError):
+                continue
+            print(f"⚠️ Recovered {path} from {backup_path}")
+            return records
+        raise
+    _undecodable.discard(os.path.abspath(path))
+    return records
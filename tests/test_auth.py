@@ -0,0 +1,78 @@
+import auth
+
+
+def test_password_hash_round_trip():
+    encoded = auth.hash_password('s3cret', iterations=1000)
+    assert encoded.startswith('pbkdf2_sha256$1000$')
+    assert auth.verify_password('s3cret', encoded)
+    assert not auth.verify_password('wrong', encoded)
+    assert not auth.verify_password('s3cret', 'not-a-hash')
+
+
+def test_shipped_credential_store_verifies_demo_account():
+    store = auth.CredentialStore('users.json')
+    user = store.verify('demo', 'demo123')
+    assert user['role'] == 'Demo User'
+    assert 'password_hash' not in user
+    assert store.verify('demo', 'wrong') is None
+    assert store.verify('nobody', 'demo123') is None
+
+
+def test_session_tokens_expire_and_revoke():
+    token = auth.issue_session_token({'name': 'Demo'})
+    assert auth.validate_session_token(token) == {'name': 'Demo'}
+    auth.revoke_session_token(token)
+    assert auth.validate_session_token(token) is None
+
+    expired = auth.issue_session_token({'name': 'Demo'}, ttl=-1)
+    assert auth.validate_session_token(expired) is None
+
+
+def test_issuing_a_token_sweeps_expired_ones():
+    abandoned = auth.issue_session_token({'name': 'Gone'}, ttl=-1)
+    live = auth.issue_session_token({'name': 'Demo'})
+    assert abandoned not in auth._session_tokens
+    assert auth.validate_session_token(live) == {'name': 'Demo'}
+
+
+def test_login_verifier_throttles_and_rejects_when_saturated(monkeypatch):
+    import threading
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_check(username, password):
+        started.set()
+        release.wait(5)
+        return {'name': username} if password == 'ok' else None
+
+    monkeypatch.setattr(auth, 'check_credentials', slow_check)
+    verifier = auth.LoginVerifier(workers=1, queue_size=1, timeout=5)
+
+    waiter = threading.Thread(target=lambda: verifier.verify('alice', 'ok', '10.0.0.1'))
+    waiter.start()
+    # The waiter holds the only slot from before its check starts until it returns
+    assert started.wait(5)
+    assert verifier.verify('bob', 'ok', '10.0.0.2').status == 'busy'
+    release.set()
+    waiter.join()
+
+    assert verifier.verify('bob', 'ok', '10.0.0.2') == auth.LoginResult('ok', {'name': 'bob'})
+    assert verifier.verify('bob', 'bad', '10.0.0.2').status == 'invalid'
+
+    statuses = [verifier.verify('carol', 'bad', '10.0.0.3').status for _ in range(11)]
+    assert statuses[-1] == 'throttled'
+
+
+def test_login_verifier_throttles_one_user_attacked_from_many_ips(monkeypatch):
+    monkeypatch.setattr(auth, 'check_credentials', lambda username, password: None)
+    verifier = auth.LoginVerifier(workers=1, queue_size=1, timeout=5)
+    attempts, _ = auth.config.LOGIN_ATTEMPTS_PER_USER
+
+    # One guess per address stays far below every per-IP allowance
+    statuses = [verifier.verify('dave', 'guess', f'10.1.0.{n}').status for n in range(attempts + 1)]
+    assert statuses[:attempts] == ['invalid'] * attempts
+    assert statuses[-1] == 'throttled'
+    # The user bucket is shared, so a fresh address does not reset it either
+    assert verifier.verify('dave', 'guess', '10.2.0.1').status == 'throttled'
+    assert verifier.verify('erin', 'guess', '10.2.0.1').status == 'invalid'
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import bench_database  # noqa: E402
+
+
+def test_database_benchmark_runs_on_a_small_firm_and_writes_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cases, entries, notes = bench_database.generate_firm(20)
+    assert len(entries) == 20 * bench_database.TIME_ENTRIES_PER_CASE
+    assert len(notes) == 20 * bench_database.NOTES_PER_CASE
+
+    assert bench_database.main(['--sizes', '20', '--repeat', '2', '--output-dir', str(tmp_path / 'results')]) == 0
+    [output] = os.listdir(tmp_path / 'results')
+    results = json.loads((tmp_path / 'results' / output).read_text())['results']['20_cases']
+    assert set(results) >= {'load_cases', 'add_time_entry', 'export_cases_to_csv'}
+    assert results['get_case_by_id']['runs'] == 2 and results['get_case_by_id']['peak_memory_kb'] > 0
+    assert sorted(os.listdir(tmp_path)) == ['results']
+
+
+def test_analysis_benchmark_covers_corpus_sizes_without_simulated_delay(tmp_path, monkeypatch):
+    import time
+
+    import ai_analysis
+    import bench_analysis
+
+    monkeypatch.setattr(ai_analysis, 'SIMULATED_DELAY', 0)
+
+    corpus = bench_analysis.build_corpus()
+    assert len(corpus['50_words'].split()) == 50
+    assert len(corpus['20kb']) == bench_analysis.CORPUS_BYTES
+
+    start = time.perf_counter()
+    results = bench_analysis.bench_corpus(corpus['50_words'], repeat=2)
+    assert time.perf_counter() - start < 2
+    assert results['analyze_matter']['analyses_per_sec'] > 0
+    assert {'stage.assess_complexity', 'report.simulate_ai_analysis'} <= set(results)
+
+
+def test_render_benchmark_reruns_every_page_and_counts_elements():
+    import bench_render
+
+    results = bench_render.bench_firm(10, repeat=1, timeout=60, seed=1)
+    assert set(results) == {'first_load', *bench_render.PAGES}
+    assert all(results[page]['elements'] > 0 for page in bench_render.PAGES)
+    assert results['case_management']['elements'] > results['client_intake']['elements']
+
+
+def test_serialization_benchmark_measures_each_available_format():
+    import bench_serialization
+
+    cases = bench_database.generate_firm(20)[0]
+    results = bench_serialization.bench_records(cases, repeat=1)
+    assert {'stdlib_json.encode', 'json.decode', 'fastjson.encode'} <= set(results)
+    assert results['fastjson.encode']['bytes'] < results['json.encode']['bytes']
@@ -0,0 +1,130 @@
+import json
+
+from dataclasses import replace
+
+import billing
+import database
+from models import TimeEntry
+
+
+def _seed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([
+        {'case_id': 'A', 'client_name': 'Acme', 'email': 'a@example.com'},
+        {'case_id': 'B', 'client_name': 'Beta', 'email': 'b@example.com'},
+    ])
+    database.save_time_entries([])
+    database.add_time_entry('A', 'Research', 2, date='2025-01-10', rate=300, user='Ann')
+    database.add_time_entry('A', 'Drafting', 1.5, date='2025-02-03', rate=300, user='Bob')
+    database.add_time_entry('B', 'Call', 1, date='2025-02-04', rate=750, user='Ann')
+
+
+def test_rollups_stay_current_incrementally(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    rollups = database.get_billing_rollups()
+
+    assert rollups.case_totals('A')['hours'] == 3.5 and rollups.case_totals('A')['amount'] == 1050
+    assert rollups.by_user['Ann']['amount'] == 1350
+    assert rollups.by_period['2025-02']['entries'] == 2
+    assert rollups.totals['unbilled_amount'] == 1800
+    assert database.get_case_by_id('B')['total_billed'] == 750
+
+    rebuilt = database.BillingRollups(database.load_time_entries())
+    assert rebuilt.by_case == rollups.by_case and rebuilt.by_user == rollups.by_user
+
+
+def test_generate_invoices_bills_entries_in_one_save(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+
+    invoices = billing.generate_invoices(through_date='2025-01-31')
+    assert [(invoice['case_id'], invoice['amount']) for invoice in invoices] == [('A', 600)]
+
+    invoices = billing.generate_invoices(issued_by='Partner')
+    assert sorted((invoice['case_id'], invoice['hours']) for invoice in invoices) == [('A', 1.5), ('B', 1)]
+    assert billing.generate_invoices() == []
+
+    entries = json.loads((tmp_path / 'time_entries.json').read_text())
+    assert all(entry['billed'] and entry['invoice_id'].startswith('INV-') for entry in entries)
+    assert len(billing.load_invoices()) == 3
+    rollups = database.get_billing_rollups()
+    assert rollups.totals['unbilled_amount'] == 0 and rollups.totals['amount'] == 1800
+
+
+def test_invoicing_interrupted_after_billing_is_completed_from_the_entries(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    save_invoices = billing.save_invoices
+    monkeypatch.setattr(billing, 'save_invoices', lambda invoices: False)
+    # The process dies after the entries are flagged but before the invoices are written
+    assert billing.generate_invoices(issued_by='Partner') == []
+    monkeypatch.setattr(billing, 'save_invoices', save_invoices)
+
+    entries = database.load_time_entries()
+    assert all(entry.billed for entry in entries) and billing.load_invoices() == []
+    assert billing.ensure_invoices_recovered() == 2
+    assert billing.ensure_invoices_recovered() == 0
+
+    invoices = billing.load_invoices()
+    assert sorted((invoice['case_id'], invoice['amount'], invoice['issued_by']) for invoice in invoices) == [
+        ('A', 1050, 'Partner'), ('B', 750, 'Partner')]
+    assert {entry.invoice_id for entry in entries} == {invoice['invoice_id'] for invoice in invoices}
+    assert billing.generate_invoices() == [] and len(billing.load_invoices()) == 2
+
+
+def test_case_counters_follow_rollups_and_reconcile(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    case = next(c for c in database.load_cases() if c.case_id == 'A')
+    assert (case.time_spent, case.billed_amount) == (3.5, 1050)
+    assert database.reconcile_case_rollups()['drifted'] == []
+
+    cases = database.load_cases()
+    cases[1] = replace(cases[1], billed_amount=99)
+    database.save_cases(cases)
+    result = database.reconcile_case_rollups()
+    assert result['drifted'] == ['B'] and result['repaired']
+    assert next(c for c in database.load_cases() if c.case_id == 'B').billed_amount == 750
+
+
+def test_interrupted_time_entry_is_replayed_once(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    entry = TimeEntry(id='e-crash', case_id='B', date='2025-03-01', task_description='Call',
+                      hours=2, rate=750, amount=1500, user='Ann')
+    # Crash after the entry was saved but before the case counters were
+    database._journal_intent({'op': 'time_entry', 'entry': entry.to_dict()})
+    database._apply_time_entry(entry)
+
+    assert database.reconcile_case_rollups()['replayed'] == 1
+    assert database.reconcile_case_rollups()['replayed'] == 0
+    assert not (tmp_path / database.JOURNAL_FILE).exists()
+    assert len(database.load_time_entries()) == 4
+    assert next(c for c in database.load_cases() if c.case_id == 'B').time_spent == 3
+
+
+def test_journal_appends_lines_and_skips_a_torn_tail(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = {'op': 'time_entry', 'entry': {'id': 'e1', 'case_id': 'A'}}
+    second = {'op': 'time_entry', 'entry': {'id': 'e2', 'case_id': 'A'}}
+    database._journal_intent(first)
+    database._journal_intent(second)
+    database._resolve_intents({'e1'})
+    with open(database.JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"op": "time_en')
+
+    assert len((tmp_path / database.JOURNAL_FILE).read_text().splitlines()) == 4
+    assert database._read_journal() == [second]
+    database._resolve_intents({'e2'})
+    assert not (tmp_path / database.JOURNAL_FILE).exists()
+
+
+def test_rollups_can_be_read_while_entries_arrive():
+    import threading
+
+    rollups = database.BillingRollups([])
+    entries = [TimeEntry(case_id=f'C{n}', user=f'U{n % 7}', date=f'2025-{n % 12 + 1:02d}-01',
+                         hours=1, amount=100) for n in range(2000)]
+    writer = threading.Thread(target=lambda: [rollups.add(entry) for entry in entries])
+    writer.start()
+    while writer.is_alive():
+        snapshot = rollups.snapshot()
+        assert snapshot['totals']['entries'] == len(snapshot['by_case'])
+    writer.join()
+    assert rollups.snapshot()['totals']['amount'] == 200000
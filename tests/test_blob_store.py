@@ -0,0 +1,67 @@
+import os
+import shutil
+import time
+
+import blob_store
+import database
+
+
+def _seed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([
+        {'case_id': 'A', 'client_name': 'Acme', 'email': 'a@example.com', 'description': 'Lease dispute. ' * 500},
+        {'case_id': 'B', 'client_name': 'Beta', 'email': 'b@example.com', 'description': 'Merger review'},
+    ])
+
+
+def test_migration_moves_descriptions_out_of_the_case_table(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    size_before = os.path.getsize('cases.json')
+
+    assert database.migrate_inline_descriptions() == 2
+    assert database.migrate_inline_descriptions() == 0
+    assert os.path.getsize('cases.json') < size_before / 5
+
+    case = database.load_cases()[0]
+    assert case.description is None and case.description_length == 7500
+    assert database.get_case_snippet(case) == ('Lease dispute. ' * 500)[:database.SNIPPET_LENGTH]
+    assert database.get_case_description(case) == 'Lease dispute. ' * 500
+    assert database.get_case_by_id('B')['description'] == 'Merger review'
+    assert [c.case_id for c in database.search_cases_by_keyword('merger', 'description')] == ['B']
+
+    # Repeat searches match on the cached lowercase text instead of reading each blob again
+    def no_reads(blob_id):
+        raise AssertionError(f"blob {blob_id} read again")
+
+    monkeypatch.setattr(database, 'get_text', no_reads)
+    assert [c.case_id for c in database.search_cases_by_keyword('lease', 'description')] == ['A']
+
+
+def test_new_cases_store_descriptions_as_blobs_and_deletes_collect_them(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    database.migrate_inline_descriptions()
+    assert database.add_case({'case_id': 'C', 'client_name': 'Cee', 'email': 'c@example.com',
+                              'description': 'Merger review'})
+    # Same text, same content-addressed blob
+    assert blob_store.blob_usage()['blobs'] == 2
+
+    stale = time.time() - 2 * blob_store.GC_GRACE_SECONDS
+    for case_id in ('A', 'B'):
+        ref = next(c for c in database.load_cases() if c.case_id == case_id).description_ref
+        os.utime(blob_store.blob_path(ref), (stale, stale))
+    assert database.delete_case('A') and database.delete_case('B')
+    # A's description stays while a backup of cases.json still holds case A
+    assert blob_store.blob_usage()['blobs'] == 2
+    shutil.rmtree('backups')
+    assert database.collect_unreferenced_blobs() == 1
+    assert database.get_case_description(database.load_cases()[0]) == 'Merger review'
+
+
+def test_storing_an_existing_blob_again_restarts_its_grace_period(tmp_path):
+    blob_dir = str(tmp_path / 'blobs')
+    blob_id = blob_store.put_blob('Merger review', blob_dir)
+    stale = time.time() - 2 * blob_store.GC_GRACE_SECONDS
+    os.utime(blob_store.blob_path(blob_id, blob_dir), (stale, stale))
+
+    assert blob_store.put_blob('Merger review', blob_dir) == blob_id
+    assert blob_store.delete_unreferenced([], blob_dir) == 0
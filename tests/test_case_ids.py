@@ -0,0 +1,31 @@
+import threading
+
+from case_ids import CaseIdGenerator
+
+
+def test_ids_are_unique_and_sorted_within_a_millisecond():
+    generator = CaseIdGenerator()
+    ids = [generator.generate() for _ in range(20000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(case_id.startswith('LAW-') and len(case_id) == 30 for case_id in ids)
+
+
+def test_reserved_blocks_do_not_overlap_concurrent_generation():
+    generator = CaseIdGenerator()
+    results = []
+
+    def worker():
+        results.extend(generator.reserve(500))
+        results.extend(generator.generate() for _ in range(500))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 4000
+    block = generator.reserve(3)
+    assert block == sorted(block) and block[0] > max(results)
+    assert generator.reserve(0) == []
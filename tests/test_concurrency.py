@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+import database
+from concurrency import VersionConflict, compare_and_swap, retry_on_conflict
+from models import Note
+
+
+def test_compare_and_swap_rejects_moved_records():
+    records = [{'id': 'a', 'value': 1}, {'id': 'b', 'value': 2, 'version': 3}]
+
+    updated = compare_and_swap(records, 'id', {'b': 3, 'c': None},
+                               {'b': {'id': 'b', 'value': 20}, 'c': {'id': 'c', 'value': 30}})
+    assert updated == [{'id': 'a', 'value': 1}, {'id': 'b', 'value': 20, 'version': 4},
+                       {'id': 'c', 'value': 30, 'version': 1}]
+
+    with pytest.raises(VersionConflict):
+        compare_and_swap(updated, 'id', {'b': 3}, {'b': {'id': 'b', 'value': 21}})
+    with pytest.raises(VersionConflict):
+        compare_and_swap(updated, 'id', {'c': None}, {'c': {'id': 'c', 'value': 31}})
+
+    attempts = []
+
+    def attempt():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise VersionConflict('b')
+        return 'saved'
+    assert retry_on_conflict(attempt) == 'saved' and len(attempts) == 3
+
+
+def test_concurrent_writers_do_not_lose_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([{'case_id': 'A', 'client_name': 'Acme', 'email': 'a@example.com'}])
+    database.save_notes([])
+
+    def write(worker: int):
+        for n in range(10):
+            assert database.add_case_note('A', f"note {worker}-{n}")
+            assert database.update_case_status('A', f"Status {worker}-{n}")
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    case = database.load_cases()[0]
+    assert len(case.status_history) == 40 and case.version == 40
+    assert len(database.load_notes()) == 80
+
+
+def test_versioned_write_rereads_the_store_even_when_the_signature_matches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # A same-size rewrite within one mtime tick looks exactly like this
+    monkeypatch.setattr(database, '_file_signature', lambda path: 'unchanged')
+    database.save_notes([{'id': 'n1', 'content': 'first'}])
+
+    def plan(notes):
+        if len(notes) == 1:
+            # Another writer saves between this snapshot and the locked re-read
+            assert database._versioned_write('case_notes.json', database.load_notes, database.save_notes, 'id',
+                                             lambda _: {'n2': Note(id='n2', content='second')})
+        return {'n3': Note(id='n3', content='third')}
+
+    assert database._versioned_write('case_notes.json', database.load_notes, database.save_notes, 'id', plan)
+    assert [note.id for note in database.load_notes()] == ['n1', 'n2', 'n3']
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from dashboard_context import build_dashboard_context
+from models import Case
+
+
+def _case(case_id, status='Intake', urgency='Medium', days_old=30, updated_days_ago=30, **extra):
+    now = datetime(2025, 1, 31, 12, 0)
+    return Case(
+        case_id=case_id,
+        status=status,
+        urgency=urgency,
+        intake_date=(now - timedelta(days=days_old)).isoformat(),
+        last_updated=(now - timedelta(days=updated_days_ago)).isoformat(),
+        **extra,
+    )
+
+
+def test_context_matches_per_widget_passes():
+    now = datetime(2025, 1, 31, 12, 0)
+    cases = [
+        _case('A', status='Active', matter_value=1000, complexity_score=80, days_old=2, updated_days_ago=1),
+        _case('B', status='Closed', outcome='Favorable', urgency='Critical', updated_days_ago=5),
+        _case('C', status='Closed', outcome='Unfavorable', updated_days_ago=3),
+        _case('D', status='Accepted', urgency='High', matter_value=500, updated_days_ago=2),
+        _case('E', urgency='Critical', updated_days_ago=9),
+    ]
+
+    context = build_dashboard_context(cases, now=now, recent_limit=3, urgent_limit=3)
+
+    assert context.total_cases == 5
+    assert context.new_this_week == 1
+    assert context.active_cases == 2
+    assert context.total_value == 1500
+    assert context.high_risk_cases == 1
+    assert context.success_rate == 50
+    assert context.status_counts == {'Active': 1, 'Closed': 2, 'Accepted': 1, 'Intake': 1}
+    assert [c.case_id for c in context.urgent_cases] == ['D', 'E']
+    expected_recent = sorted(cases, key=lambda c: c.last_updated, reverse=True)[:3]
+    assert context.recent_cases == expected_recent
+
+
+def test_context_for_empty_portfolio():
+    context = build_dashboard_context([])
+    assert context.total_cases == 0
+    assert context.success_rate == 0
+    assert context.recent_cases == []
@@ -0,0 +1,60 @@
+import os
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
+import database
+
+
+def _case(case_id, last_updated, intake_date, urgency='Medium', status='Intake', complexity_score=50):
+    return {
+        'case_id': case_id, 'client_name': case_id, 'email': f'{case_id}@example.com',
+        'status': status, 'urgency': urgency, 'complexity_score': complexity_score,
+        'intake_date': intake_date, 'last_updated': last_updated,
+    }
+
+
+def test_top_k_queries_follow_data_version(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([
+        _case('A', '2025-01-05T00:00:00', '2025-01-01T00:00:00', urgency='High', complexity_score=90),
+        _case('B', '2025-01-09T00:00:00', '2025-01-03T00:00:00', urgency='Critical', complexity_score=40),
+        _case('C', '2025-01-07T00:00:00', '2025-01-02T00:00:00', urgency='Critical', status='Closed'),
+        _case('D', '2025-01-08T00:00:00', '2025-01-04T00:00:00', urgency='High', complexity_score=95),
+    ])
+
+    assert [c.case_id for c in database.get_recent_cases(2)] == ['B', 'D']
+    assert [c.case_id for c in database.get_urgent_cases(3)] == ['B', 'D', 'A']
+    assert [c.case_id for c in database.get_cases_by_intake_date(1)] == ['D']
+
+    index = database.get_case_index()
+    assert database.get_case_index() is index
+
+    cases = database.load_cases()
+    cases.append(_case('E', '2025-02-01T00:00:00', '2025-02-01T00:00:00'))
+    database.save_cases(cases)
+    assert database.get_case_index() is not index
+    assert database.get_recent_cases(1)[0].case_id == 'E'
+
+
+def test_case_index_sees_same_size_rewrite_in_one_tick(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([_case('A', '2025-01-05T00:00:00', '2025-01-01T00:00:00', status='Review')])
+    stat = os.stat('cases.json')
+    assert database.get_case_index().recent(1)[0].status == 'Review'
+
+    database.save_cases([_case('A', '2025-01-05T00:00:00', '2025-01-01T00:00:00', status='Active')])
+    os.utime('cases.json', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat('cases.json').st_size == stat.st_size
+    assert database.get_case_index().recent(1)[0].status == 'Active'
+
+
+def test_case_index_hands_out_read_only_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([_case('A', '2025-01-05T00:00:00', '2025-01-01T00:00:00', status='Review')])
+    index = database.get_case_index()
+
+    with pytest.raises(FrozenInstanceError):
+        index.recent(1)[0].status = 'Closed'
+    assert database.get_case_index().cases[0].status == 'Review'
+    assert replace(index.cases[0], status='Active').status == 'Active'
@@ -0,0 +1,66 @@
+import database
+import diagnostics
+
+
+def test_slowest_reruns_keeps_only_the_slowest(monkeypatch):
+    monkeypatch.setattr(diagnostics, '_slow_reruns', [])
+    monkeypatch.setattr(diagnostics, '_rerun_totals', {'count': 0, 'seconds': 0.0})
+    monkeypatch.setattr(diagnostics, 'SLOW_RERUN_LIMIT', 3)
+    for ms in [5, 50, 1, 30, 20, 40]:
+        diagnostics.record_rerun('🌍 Dashboard', ms / 1000)
+
+    assert [entry['ms'] for entry in diagnostics.slowest_reruns()] == [50, 40, 30]
+    assert diagnostics.rerun_summary() == {'count': 6, 'mean_ms': 24.3}
+
+
+def test_storage_and_cache_stats_reflect_the_data_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([{'case_id': 'A', 'client_name': 'A', 'email': 'a@example.com'}])
+    database.get_case_index()
+    database.get_case_index()
+
+    usage = diagnostics.storage_usage()
+    assert usage['files']['cases.json'] == (tmp_path / 'cases.json').stat().st_size
+    summary = diagnostics.storage_summary()
+    assert summary['data_bytes'] == sum(usage['files'].values())
+    assert 0 < summary['disk_fraction'] <= 1
+    assert usage['files']['case_notes.json'] == 0
+    assert 0 < usage['disk_fraction'] <= 1
+
+    caches = {row['cache']: row for row in diagnostics.cache_stats()}
+    assert caches['case_index']['hits'] >= 1 and caches['case_index']['entries'] == 1
+    assert diagnostics.data_version()['cases'] == 1
+    assert diagnostics.active_sessions() == []
+
+
+def test_active_sessions_follow_reruns_and_drop_disconnected_sessions(monkeypatch):
+    from streamlit.runtime import Runtime
+
+    class FakeRuntime:
+        connected = {'aaaaaaaa-0001'}
+
+        def is_active_session(self, session_id):
+            return session_id in self.connected
+
+    monkeypatch.setattr(diagnostics, '_sessions', {})
+    monkeypatch.setattr(diagnostics, '_slow_reruns', [])
+    monkeypatch.setattr(diagnostics, '_rerun_totals', {'count': 0, 'seconds': 0.0})
+    monkeypatch.setattr(Runtime, 'exists', staticmethod(lambda: True))
+    monkeypatch.setattr(Runtime, 'instance', staticmethod(FakeRuntime))
+    reruns = [('aaaaaaaa-0001', '🌍 Dashboard'), ('aaaaaaaa-0001', '⏱️ Time Tracking'), ('bbbbbbbb-0002', '🌍 Dashboard')]
+    for session_id, page in reruns:
+        monkeypatch.setattr(diagnostics, '_current_session_id', lambda: session_id)
+        diagnostics.record_rerun(page, 0.01, 'Demo', state_bytes=2048)
+
+    [session] = diagnostics.active_sessions()
+    assert session['session'] == 'aaaaaaaa' and session['reruns'] == 2 and session['page'] == '⏱️ Time Tracking'
+    assert session['state_bytes'] == 2048
+    assert list(diagnostics._sessions) == ['aaaaaaaa-0001']
+
+
+def test_state_size_counts_session_objects_once_and_skips_the_shared_snapshot():
+    notes = ['draft ' * 100]
+    own = diagnostics.state_size({'notes': notes, 'again': notes})
+    assert own == diagnostics.state_size({'notes': notes}) > len(notes[0])
+    shared = tuple({'case_id': str(n), 'description': 'x' * 1000} for n in range(100))
+    assert diagnostics.state_size({'notes': notes, 'cases': shared}) == own
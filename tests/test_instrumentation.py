@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from streamlit.runtime.scriptrunner import StopException
+
+import database
+import instrumentation
+from ai_processor import LegalAIAnalyzer
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(instrumentation, '_enabled', True)
+    instrumentation.registry.reset()
+    yield instrumentation.registry
+    instrumentation.registry.reset()
+
+
+def test_storage_and_analyzer_calls_are_counted_with_bytes(tmp_path, monkeypatch, metrics):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([{'case_id': 'A', 'client_name': 'A', 'email': 'a@example.com'}])
+    database.load_cases()
+    database.load_cases()
+    LegalAIAnalyzer().analyze_matter('Breach of contract lawsuit', 'Other', 'High')
+
+    snapshot = metrics.snapshot()
+    size = (tmp_path / 'cases.json').stat().st_size
+    assert snapshot['database.load_cases']['calls'] == 2
+    assert snapshot['database.load_cases']['bytes_read'] == 2 * size
+    assert snapshot['database.save_cases']['bytes_written'] == size
+    stage = snapshot['analyzer.analyze_matter']
+    assert stage['buckets']['+Inf'] == stage['calls'] == 1
+    # Only the public entry point is instrumented, not each private stage
+    assert not [name for name in snapshot if name.startswith('analyzer.') and name != 'analyzer.analyze_matter']
+
+    prometheus = instrumentation.export_prometheus()
+    assert 'legalai_operation_calls_total{operation="database.load_cases"} 2' in prometheus
+    assert 'legalai_operation_duration_seconds_count{operation="database.load_cases"} 2' in prometheus
+    assert '# TYPE legalai_operation_duration_seconds histogram' in prometheus
+    assert json.loads(instrumentation.export_json())['operations']['database.save_cases']['calls'] == 1
+
+
+def test_handled_storage_failures_are_counted_as_errors(tmp_path, monkeypatch, metrics):
+    monkeypatch.chdir(tmp_path)
+
+    def failing_persist(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(database, 'persist', failing_persist)
+    assert database.save_cases([{'case_id': 'A'}]) is False
+    (tmp_path / 'time_entries.json').write_text('{not json')
+    assert database.load_time_entries() == []
+
+    snapshot = metrics.snapshot()
+    assert snapshot['database.save_cases']['calls'] == snapshot['database.save_cases']['errors'] == 1
+    assert snapshot['database.load_time_entries']['errors'] == 1
+
+
+def test_errors_are_counted_and_nothing_is_recorded_when_disabled(metrics):
+    @instrumentation.timed('test.failing')
+    def failing():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        failing()
+    with instrumentation.track('test.block'):
+        pass
+    # st.rerun() and st.stop() unwind with BaseException subclasses; those are not errors
+    with pytest.raises(StopException):
+        with instrumentation.track('test.stopped'):
+            raise StopException()
+    assert metrics.snapshot()['test.failing']['errors'] == 1
+    stopped = metrics.snapshot()['test.stopped']
+    assert stopped['calls'] == 1 and stopped['errors'] == 0
+    assert metrics.snapshot()['test.block']['calls'] == 1
+
+    instrumentation.enable(False)
+    metrics.reset()
+    with pytest.raises(ValueError):
+        failing()
+    with instrumentation.track('test.block'):
+        pass
+    instrumentation.record_file_io('test.io', __file__)
+    assert metrics.snapshot() == {}
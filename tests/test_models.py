@@ -0,0 +1,35 @@
+import json
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
+import database
+from models import Case, TimeEntry
+
+
+def test_decoding_coerces_numbers_and_fills_required_fields():
+    stored = {'case_id': 'A', 'client_name': 'Acme', 'matter_value': '250000',
+              'complexity_score': '7.5', 'status': '', 'referral': 'Web'}
+    case = Case.from_dict(stored)
+
+    assert not hasattr(case, '__dict__') and stored['matter_value'] == '250000'
+    assert case.matter_value == 250000 and case.complexity_score == 7.5
+    assert case.status == 'Intake' and case.email == '' and case.urgency is None
+    assert case.extra == {'referral': 'Web'} and case.to_dict()['referral'] == 'Web'
+    assert TimeEntry.from_dict({'id': 'e1', 'hours': '1.5'}).hours == 1.5
+
+    with pytest.raises(FrozenInstanceError):
+        case.status = 'Active'
+    assert replace(case, status='Active').to_dict()['status'] == 'Active'
+
+
+def test_round_trip_keeps_unknown_fields_and_writes_no_unset_ones(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stored = {'case_id': 'A', 'client_name': 'Acme', 'email': 'a@example.com', 'status': 'Active',
+              'intake_date': '2025-01-01', 'last_updated': '2025-01-02', 'custom_field': {'x': 1}}
+    database.save_cases([stored])
+
+    database.save_cases(database.load_cases())
+    [saved] = json.loads((tmp_path / 'cases.json').read_text())
+    assert saved['custom_field'] == {'x': 1} and 'phone' not in saved and 'version' not in saved
+    assert database.load_cases() == [Case.from_dict(stored)]
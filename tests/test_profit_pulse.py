@@ -0,0 +1,200 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Desktop', 'profit-pulse'))
+
+from airtable_uploader import AirtableUploader, trades_to_records  # noqa: E402
+from fake_airtable import start_fake_airtable  # noqa: E402
+
+
+def _trades(count):
+    return pd.DataFrame({
+        'Asset': ['EUR/USD', 'GBP/USD'] * (count // 2),
+        'Date': ['2023-10-01', '2023-10-02'] * (count // 2),
+        'Entry_Price': ['1.1580', '1.3150'] * (count // 2),
+        'Exit_Price': [1.1620, 1.3100] * (count // 2),
+        'Quantity': [10000, 15000] * (count // 2),
+        'Type': ['Long', None] * (count // 2),
+    })
+
+
+def test_trades_to_records_converts_types_and_drops_empty_cells():
+    records = trades_to_records(_trades(2))
+    assert records[0] == {'Asset': 'EUR/USD', 'Date': '2023-10-01', 'Entry Price': 1.158,
+                          'Exit Price': 1.162, 'Quantity': 10000.0, 'Type': 'Long'}
+    assert 'Type' not in records[1]
+
+
+def test_uploader_batches_records_against_fake_airtable():
+    server, store, endpoint_url = start_fake_airtable()
+    try:
+        uploader = AirtableUploader('key', 'appTEST', 'tblTrades', endpoint_url=endpoint_url,
+                                    requests_per_second=1000)
+        progress = []
+        created = uploader.upload(trades_to_records(_trades(1000)), progress.append)
+    finally:
+        server.shutdown()
+
+    assert len(created) == 1000
+    assert len(store.tables['appTEST/tblTrades']) == 1000
+    assert store.request_count == 100
+    assert progress[-1] == 1000
+
+
+def test_uploader_overlaps_batches_within_the_rate_limit():
+    server, store, endpoint_url = start_fake_airtable(requests_per_second=20, latency=0.2)
+    try:
+        uploader = AirtableUploader('key', 'appTEST', 'tblTrades', endpoint_url=endpoint_url,
+                                    max_workers=4, requests_per_second=15)
+        created = uploader.upload(trades_to_records(_trades(300)))
+    finally:
+        server.shutdown()
+
+    assert len(created) == 300
+    assert store.peak_in_flight > 1
+    assert store.rate_limited_count == 0
+
+
+def test_uploader_retries_after_rate_limit():
+    server, store, endpoint_url = start_fake_airtable(requests_per_second=2)
+    try:
+        uploader = AirtableUploader('key', 'appTEST', 'tblTrades', endpoint_url=endpoint_url,
+                                    requests_per_second=1000, retry_delay=0.5)
+        created = uploader.upload(trades_to_records(_trades(60)))
+    finally:
+        server.shutdown()
+
+    assert len(created) == 60
+    assert store.request_count > 6
+
+
+def test_calculate_metrics_vectorized_engine():
+    from metrics import calculate_metrics
+
+    pnls = [100, -50, '#ERROR!', 30, 20, -10, -40, 60]
+    assets = ['EUR/USD', 'EUR/USD', 'GBP/USD', 'GBP/USD', 'EUR/USD', 'GBP/USD', 'GBP/USD', 'EUR/USD']
+    records = [{'id': f'rec{i}', 'fields': {'Asset': asset, 'Date': f'2023-10-{i + 1:02d}', 'Pnl 2': pnl}}
+               for i, (asset, pnl) in enumerate(zip(assets, pnls))]
+
+    metrics = calculate_metrics(records)
+
+    assert metrics['total_trades'] == 8
+    assert (metrics['winning_trades'], metrics['losing_trades']) == (4, 3)
+    assert metrics['win_rate'] == 50.0
+    assert metrics['total_profit'] == 110
+    assert metrics['profit_factor'] == 2.1
+    assert metrics['expectancy'] == round(110 / 7, 2)
+    # Equity: 100, 50, 80, 100, 90, 50, 110 -> deepest fall from the 100 peak is 50
+    assert metrics['max_drawdown'] == 50
+    assert (metrics['longest_win_streak'], metrics['longest_loss_streak']) == (2, 2)
+    breakdown = metrics['asset_breakdown']
+    assert breakdown.loc['EUR/USD', 'trades'] == 4
+    assert breakdown.loc['GBP/USD', 'total_profit'] == -20
+    assert calculate_metrics([]) is None
+
+
+def test_trade_cache_syncs_deltas_and_serves_repeat_analyses_offline(tmp_path):
+    from pyairtable import Api
+    from metrics import calculate_metrics
+    from trade_cache import TradeCache
+
+    server, store, endpoint_url = start_fake_airtable()
+    try:
+        table = Api('key', endpoint_url=endpoint_url).table('appTEST', 'tblTrades')
+        seeded = table.batch_create([{'Asset': 'EUR/USD', 'Date': f'2023-10-{i + 1:02d}', 'Pnl 2': 10 * (i - 2)}
+                                     for i in range(5)])
+        cache = TradeCache(str(tmp_path / 'trades.sqlite3'))
+
+        assert cache.sync(table) == 5
+        version = cache.data_version
+        requests_after_sync = store.request_count
+        assert calculate_metrics(cache.frame())['total_profit'] == 0
+        assert store.request_count == requests_after_sync
+
+        table.update(seeded[0]['id'], {'Pnl 2': 80})
+        assert cache.sync(table) == 1
+        assert cache.data_version == version + 1
+        assert cache.sync(table) == 0
+        assert cache.data_version == version + 1
+
+        uploader = AirtableUploader('key', 'appTEST', 'tblTrades', endpoint_url=endpoint_url,
+                                    requests_per_second=1000)
+        cache.upsert(uploader.upload(trades_to_records(_trades(2))))
+        assert cache.count() == 7
+
+        table.delete(seeded[1]['id'])
+        assert cache.sync(table, full=True) == 1
+        assert cache.count() == 6
+    finally:
+        server.shutdown()
+
+
+def test_streaming_ingest_validates_each_chunk_and_feeds_uploader():
+    import io
+
+    import pytest
+    from ingest import CSVValidationError, iter_record_batches, iter_trade_chunks, validate_trades_csv
+
+    rows = ''.join(f'EUR/USD,2023-10-01,1.1,1.2,{i},Long,extra\n' for i in range(95))
+    csv = 'Asset,Date,Entry_Price,Exit_Price,Quantity,Type,Broker_Note\n' + rows
+
+    chunks = list(iter_trade_chunks(io.StringIO(csv), chunk_rows=40))
+    assert [len(chunk) for chunk in chunks] == [40, 40, 15]
+    assert 'Broker_Note' not in chunks[0].columns
+    assert chunks[0]['Quantity'].dtype == 'float64'
+
+    server, store, endpoint_url = start_fake_airtable()
+    try:
+        uploader = AirtableUploader('key', 'appTEST', 'tblTrades', endpoint_url=endpoint_url,
+                                    requests_per_second=1000)
+        batches = []
+        count = uploader.upload_batches(iter_record_batches(io.StringIO(csv), chunk_rows=40),
+                                        on_created=batches.append)
+    finally:
+        server.shutdown()
+    assert count == 95 and len(store.tables['appTEST/tblTrades']) == 95
+    assert max(len(batch) for batch in batches) == 10
+
+    with pytest.raises(CSVValidationError, match=r'line\(s\) \[4\]'):
+        list(iter_trade_chunks(io.StringIO(csv.replace('1.1,1.2,2,', '1.1,,2,')), chunk_rows=40))
+    with pytest.raises(CSVValidationError, match='Invalid value'):
+        list(iter_trade_chunks(io.StringIO(csv.replace(',3,Long', ',three,Long')), chunk_rows=40))
+    with pytest.raises(CSVValidationError, match='missing Quantity'):
+        list(iter_trade_chunks(io.StringIO('Asset,Date,Entry_Price,Exit_Price\nX,2023-10-01,1,2\n')))
+
+    source = io.StringIO(csv)
+    assert validate_trades_csv(source, chunk_rows=40) == 95 and source.tell() == 0
+    # A bad row in the last chunk fails validation before anything is uploaded
+    with pytest.raises(CSVValidationError, match=r'line\(s\) \[93\]'):
+        validate_trades_csv(io.StringIO(csv.replace('1.1,1.2,91,', '1.1,,91,')), chunk_rows=40)
+
+
+def test_rolling_analytics_extends_appended_trades_and_matches_pandas():
+    import numpy as np
+    from analytics import RollingAnalytics
+    from metrics import _max_drawdown, normalize_trades
+
+    pnl = [10.0, -5.0, '#ERROR!', 20.0, -30.0, 15.0, 5.0, -10.0]
+    full = normalize_trades(pd.DataFrame({
+        'id': [f'rec{i}' for i in range(len(pnl))],
+        'Date': [f'2023-10-{i + 1:02d}' for i in range(len(pnl))],
+        'Pnl 2': pnl,
+    }))
+
+    rolling = RollingAnalytics().update(full.iloc[:5], data_version=1)
+    rolling.frame(3)
+    rolling.update(full, data_version=2)
+    result = rolling.frame(3)
+
+    clean = full['pnl'].fillna(0)
+    assert np.allclose(result['equity'], clean.cumsum())
+    assert np.allclose(result['rolling_pnl'], clean.rolling(3).sum(), equal_nan=True)
+    expected_win_rate = (full['pnl'] > 0).rolling(3).sum() / full['pnl'].notna().rolling(3).sum() * 100
+    assert np.allclose(result['rolling_win_rate'], expected_win_rate, equal_nan=True)
+    assert -result['drawdown'].min() == _max_drawdown(clean.to_numpy())
+
+    edited = full.assign(pnl=full['pnl'].where(full.index != 0, 50.0))
+    rebuilt = rolling.update(edited, data_version=3).frame(3)
+    assert rebuilt['equity'].iloc[-1] == result['equity'].iloc[-1] + 40
@@ -0,0 +1,51 @@
+import pytest
+
+import database
+import serialization
+from config import config
+
+RECORDS = [{'case_id': 'A', 'description': 'Réclamation über 10 000 €', 'matter_value': 12.5, 'tags': [1, None]}]
+
+
+def test_every_available_format_round_trips_and_is_detected():
+    for name, available in serialization.available_formats().items():
+        if not available or name == 'zstd':
+            continue
+        data = serialization.encode(RECORDS, name, 'none')
+        assert serialization.decode(data) == RECORDS
+        assert serialization.detect_format(data) == ('msgpack' if name == 'msgpack' else 'json')
+
+    assert len(serialization.encode(RECORDS, 'fastjson')) < len(serialization.encode(RECORDS, 'json'))
+    assert serialization.decode(b'') == [] and serialization.decode(b'\xef\xbb\xbf[]') == []
+    with pytest.raises(ValueError):
+        serialization.decode(b'[{"case_id": ')
+
+
+def test_numpy_values_encode_as_numbers_and_legacy_nan_still_decodes():
+    import math
+
+    import numpy as np
+
+    for name in ('json', 'fastjson'):
+        data = serialization.encode([{'hours': np.float64(1.5), 'count': np.int64(3), 'series': np.array([1, 2])}], name)
+        assert serialization.decode(data) == [{'hours': 1.5, 'count': 3, 'series': [1, 2]}]
+
+    # Stores written by json.dump before the codecs can contain bare NaN
+    [entry] = serialization.decode(b'[{"amount": NaN}]')
+    assert math.isnan(entry['amount'])
+
+
+def test_stores_switch_format_without_migration(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_notes([{'id': 'n1', 'case_id': 'A'}])
+    assert (tmp_path / 'case_notes.json').read_bytes().startswith(b'[\n  {')
+
+    monkeypatch.setattr(config, 'DATA_FORMAT', 'fastjson')
+    database.add_case_note('A', 'second')
+    assert (tmp_path / 'case_notes.json').read_bytes().startswith(b'[{"id":"n1"')
+    assert [note.id for note in database.load_notes()][0] == 'n1'
+
+    # Formats this install cannot write fall back to indented JSON
+    monkeypatch.setattr(config, 'DATA_FORMAT', 'no-such-format')
+    database.save_notes(database.load_notes())
+    assert len(database.load_notes()) == 2
@@ -0,0 +1,41 @@
+import os
+
+import database
+import storage
+
+
+def test_saves_replace_atomically_and_back_up_by_hardlink(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_notes([{'id': 'n1'}])
+    outgoing_inode = os.stat('case_notes.json').st_ino
+    database.save_notes([{'id': 'n2'}])
+
+    # The backup is the outgoing file itself, not a copy
+    newest_backup = storage.backups_for('case_notes.json')[0]
+    assert os.stat(newest_backup).st_ino == outgoing_inode != os.stat('case_notes.json').st_ino
+    assert storage.read_records(newest_backup) == [{'id': 'n1'}]
+
+    for n in range(6):
+        database.save_notes([{'id': f"n{n + 3}"}])
+    assert len(storage.backups_for('case_notes.json')) == storage.MAX_BACKUPS
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_corrupt_store_falls_back_to_latest_backup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([{'case_id': 'A', 'client_name': 'Acme', 'email': 'a@example.com'}])
+    database.save_cases([{'case_id': 'B', 'client_name': 'Beta', 'email': 'b@example.com'}])
+    # A torn write from some other tool
+    (tmp_path / 'cases.json').write_text('[{"case_id": "C", "client')
+
+    assert [case.case_id for case in database.load_cases()] == ['A']
+
+    # Saving over the corrupt store sets it aside instead of rotating it into the backups
+    backups = storage.backups_for('cases.json')
+    database.save_cases([{'case_id': 'D', 'client_name': 'Delta', 'email': 'd@example.com'}])
+    assert storage.backups_for('cases.json') == backups
+    [corrupt] = [name for name in os.listdir('backups') if name.startswith('cases_corrupt_')]
+    assert (tmp_path / 'backups' / corrupt).read_text() == '[{"case_id": "C", "client'
+
+    database.save_cases([{'case_id': 'E', 'client_name': 'Echo', 'email': 'e@example.com'}])
+    assert [case['case_id'] for case in storage.read_records(storage.backups_for('cases.json')[0])] == ['D']
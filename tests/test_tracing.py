@@ -0,0 +1,62 @@
+import pytest
+from streamlit.runtime.scriptrunner import StopException
+
+import database
+import tracing
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    collected = ListExporter()
+    monkeypatch.setattr(tracing, 'enabled', True)
+    monkeypatch.setattr(tracing, '_exporter', collected)
+    return collected
+
+
+def test_storage_calls_nest_under_the_rerun_span(tmp_path, monkeypatch, exporter):
+    monkeypatch.chdir(tmp_path)
+    database.save_cases([{'case_id': 'A', 'client_name': 'A', 'email': 'a@example.com', 'status': 'Intake'}])
+    exporter.traces.clear()
+
+    with tracing.span('app.rerun') as root:
+        tracing.set_span_attributes(page='📋 Case Management')
+        database.update_case_status('A', 'Active')
+
+    [spans] = exporter.traces
+    by_id = {span['span_id']: span for span in spans}
+    assert spans[0]['name'] == 'app.rerun' and spans[0]['attributes']['page'] == '📋 Case Management'
+    assert {span['trace_id'] for span in spans} == {root.trace_id}
+    save = next(span for span in spans if span['name'] == 'database.save_cases')
+    assert by_id[save['parent_span_id']]['name'] == 'database.update_case_status'
+    assert all(span['end_time_unix_nano'] >= span['start_time_unix_nano'] for span in spans)
+
+    timeline = tracing.format_timeline(spans)
+    assert 'app.rerun' in timeline.splitlines()[1]
+    assert '⚠️ database.load_cases ran' in timeline
+
+
+def test_errors_mark_spans_and_file_exporter_round_trips(tmp_path, exporter):
+    with pytest.raises(ValueError):
+        with tracing.span('app.rerun'):
+            with tracing.span('panel.broken'):
+                raise ValueError('boom')
+    spans = exporter.traces[-1]
+    assert [span['status'] for span in spans] == ['ERROR', 'ERROR']
+    assert spans[1]['attributes']['exception.type'] == 'ValueError'
+
+    with pytest.raises(StopException):
+        with tracing.span('app.rerun'):
+            raise StopException()
+    assert exporter.traces[-1][0]['status'] == 'OK'
+
+    path = str(tmp_path / 'traces.jsonl')
+    tracing.FileExporter(path).export(spans)
+    assert list(tracing.load_traces(path).values()) == [spans]
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from models import Case
+from utils import ages_in_days, calculate_days_since
+
+
+def test_ages_in_days_matches_scalar_calculation():
+    now = datetime(2025, 3, 1, 12, 0)
+    cases = [
+        Case(intake_date='2025-02-27T13:00:00'),
+        Case(intake_date='2025-03-01T11:00:00'),
+        Case(intake_date='not-a-date'),
+        Case(last_updated='2025-01-01T00:00:00'),
+        Case(intake_date='2025-03-02T00:00:00'),
+    ]
+
+    ages = ages_in_days(cases, now=now, field='intake_date', fallback_field='last_updated')
+
+    assert ages.tolist() == [1, 0, 0, 59, -1]
+    assert ages[0] == (now - datetime(2025, 2, 27, 13)).days
+
+
+def test_calculate_days_since_handles_bad_data():
+    assert calculate_days_since('garbage') == 0
+    assert calculate_days_since(None) == 0
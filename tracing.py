@@ -0,0 +1,240 @@
+"""Request-scoped trace spans with console and JSON-lines exporters
+
+Spans follow the OpenTelemetry data model (trace/span ids, parent ids, unix
+nanosecond timestamps, attributes, status) and are also mirrored to a real
+OpenTelemetry tracer when the `opentelemetry` package is installed. Each
+finished root span (one app rerun) is handed to the configured exporter.
+
+Render a saved trace as a timeline with:
+    python tracing.py traces.jsonl [trace_id]
+"""
+import contextvars
+import json
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from config import config
+
+try:
+    from opentelemetry import trace as otel_trace
+    _otel_tracer = otel_trace.get_tracer("legalai")
+except ImportError:
+    _otel_tracer = None
+
+TIMELINE_WIDTH = 40
+RECENT_TRACE_LIMIT = 20
+
+enabled = config.TRACING_ENABLED
+_current_span: contextvars.ContextVar = contextvars.ContextVar("legalai_current_span", default=None)
+
+
+class Span:
+    """One timed operation; children are collected on the root for export"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "start_time_unix_nano",
+                 "end_time_unix_nano", "attributes", "status", "_started", "_trace_spans")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano = None
+        self._started = time.perf_counter_ns()
+        self._trace_spans = parent._trace_spans if parent else []
+        self._trace_spans.append(self)
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self, error: Optional[Exception] = None):
+        self.end_time_unix_nano = self.start_time_unix_nano + (time.perf_counter_ns() - self._started)
+        self.status = "ERROR" if error is not None else "OK"
+        if error is not None:
+            self.attributes["exception.type"] = type(error).__name__
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_unix_nano or self.start_time_unix_nano
+        return (end - self.start_time_unix_nano) / 1e6
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class ConsoleExporter:
+    """Prints each finished trace as a timeline"""
+
+    def export(self, spans: List[Dict]):
+        print(format_timeline(spans))
+
+
+class FileExporter:
+    """Appends every span of each finished trace to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict]):
+        lines = "".join(json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except Exception as e:
+            print(f"❌ Error writing trace file: {e}")
+
+
+def _default_exporter():
+    if config.TRACE_EXPORTER == "console":
+        return ConsoleExporter()
+    if config.TRACE_EXPORTER == "file":
+        return FileExporter(config.TRACE_FILE)
+    return None
+
+
+_exporter = _default_exporter()
+_recent_traces = deque(maxlen=RECENT_TRACE_LIMIT)
+
+
+def is_enabled() -> bool:
+    return enabled
+
+
+def enable(on: bool = True, exporter=None):
+    """Switch tracing on or off at runtime, optionally replacing the exporter"""
+    global enabled, _exporter
+    enabled = on
+    if exporter is not None:
+        _exporter = exporter
+
+
+def recent_traces() -> List[List[Dict]]:
+    """The last finished traces in this process, newest first"""
+    return list(reversed(_recent_traces))
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_span_attributes(**attributes):
+    """Annotate the current span, if a trace is being recorded"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Open a span as a child of the current one; a span with no parent starts a new trace"""
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    token = _current_span.set(current)
+    # Only an Exception fails a span: st.rerun()/st.stop() unwind with BaseException subclasses.
+    # OTel's own exception handling would flag those too, so it is switched off and done here.
+    otel = _otel_tracer.start_as_current_span(name, attributes=attributes, record_exception=False,
+                                              set_status_on_exception=False) if _otel_tracer else None
+    error = None
+    try:
+        if otel is not None:
+            with otel as otel_span:
+                try:
+                    yield current
+                except Exception as e:
+                    otel_span.record_exception(e)
+                    otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(e)))
+                    raise
+        else:
+            yield current
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        current.end(error)
+        _current_span.reset(token)
+        if parent is None:
+            _finish_trace(current)
+
+
+def _finish_trace(root: Span):
+    spans = [s.to_dict() for s in root._trace_spans]
+    _recent_traces.append(spans)
+    if _exporter is not None:
+        _exporter.export(spans)
+
+
+def format_timeline(spans: List[Dict], width: int = TIMELINE_WIDTH) -> str:
+    """Flame-style text timeline of one trace, with repeated storage calls called out"""
+    if not spans:
+        return "(empty trace)"
+    by_parent: Dict[Optional[str], List[Dict]] = {}
+    for s in spans:
+        by_parent.setdefault(s["parent_span_id"], []).append(s)
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if s["parent_span_id"] not in ids]
+    start = min(s["start_time_unix_nano"] for s in spans)
+    end = max(s["end_time_unix_nano"] or s["start_time_unix_nano"] for s in spans)
+    total = max(end - start, 1)
+
+    lines = [f"Trace {spans[0]['trace_id']} • {total / 1e6:.1f} ms • {len(spans)} spans"]
+
+    def walk(node: Dict, depth: int):
+        offset = node["start_time_unix_nano"] - start
+        duration = (node["end_time_unix_nano"] or node["start_time_unix_nano"]) - node["start_time_unix_nano"]
+        left = int(offset / total * width)
+        bar = max(1, round(duration / total * width))
+        attributes = " ".join(f"{k}={v}" for k, v in node["attributes"].items())
+        status = " ❌" if node["status"] == "ERROR" else ""
+        lines.append(f"{offset / 1e6:>9.1f} ms |{' ' * left}{'█' * bar}{' ' * max(width - left - bar, 0)}| "
+                     f"{duration / 1e6:>8.1f} ms {'  ' * depth}{node['name']}{status} {attributes}".rstrip())
+        for child in sorted(by_parent.get(node["span_id"], []), key=lambda s: s["start_time_unix_nano"]):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["start_time_unix_nano"]):
+        walk(root, 0)
+
+    repeated = Counter(s["name"] for s in spans if s["name"].startswith("database."))
+    for name, count in sorted(repeated.items(), key=lambda item: -item[1]):
+        if count > 1:
+            spent = sum(((s["end_time_unix_nano"] or 0) - s["start_time_unix_nano"])
+                        for s in spans if s["name"] == name) / 1e6
+            lines.append(f"⚠️ {name} ran {count} times ({spent:.1f} ms total)")
+    return "\n".join(lines)
+
+
+def load_traces(path: str) -> Dict[str, List[Dict]]:
+    """Spans from a JSON-lines trace file, grouped by trace id in file order"""
+    traces: Dict[str, List[Dict]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                traces.setdefault(record["trace_id"], []).append(record)
+    return traces
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python tracing.py TRACE_FILE [TRACE_ID]")
+    saved = load_traces(sys.argv[1])
+    selected = [sys.argv[2]] if len(sys.argv) > 2 else list(saved)[-1:]
+    for trace_id in selected:
+        print(format_timeline(saved.get(trace_id, [])))
@@ -1,12 +1,23 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+import numpy as np
 import time
-import random
-import string
 from datetime import datetime
+from typing import List
 import re
 
-def rerun():
+from database import parse_timestamp
+from models import Case
+
+def rerun(scope: str = "app"):
     """Universal rerun with professional handling"""
+    # Fragment-scoped reruns only exist on Streamlit versions with st.fragment
+    if scope == "fragment" and hasattr(st, 'fragment'):
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # Only valid during a fragment rerun; inside a full-app run, rerun the app
+            pass
     # Check which rerun method is available
     if hasattr(st, 'rerun'):
         st.rerun()
@@ -18,11 +29,13 @@ def rerun():
         time.sleep(1)
         st.experimental_rerun()
 
-def generate_case_id() -> str:
-    """Generate professional case ID"""
-    timestamp = int(time.time())
-    random_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"LAW-{timestamp}-{random_suffix}"
+def fragment(func):
+    """Run a panel as an independent fragment so its widgets only rerun that panel"""
+    if hasattr(st, 'fragment'):
+        return st.fragment(func)
+    if hasattr(st, 'experimental_fragment'):
+        return st.experimental_fragment(func)
+    return func
 
 def validate_email(email: str) -> bool:
     """Professional email validation"""
@@ -68,14 +81,33 @@ def format_currency(amount: float) -> str:
     else:
         return f"${amount:,.2f}"
 
+def format_bytes(size: float) -> str:
+    """Human-readable file size"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
 def calculate_days_since(date_string: str) -> int:
     """Calculate days since with error handling"""
-    try:
-        date_obj = datetime.fromisoformat(date_string)
-        now = datetime.now()
-        return (now - date_obj).days
-    except:
+    date_obj = parse_timestamp(date_string)
+    if date_obj is None:
         return 0
+    return (datetime.now() - date_obj).days
+
+def ages_in_days(cases: List[Case], now: datetime = None, field: str = 'intake_date',
+                 fallback_field: str = None) -> np.ndarray:
+    """Whole days since a timestamp field for every case, with a single clock read"""
+    now64 = np.datetime64(now or datetime.now(), 'us')
+    stamps = []
+    for case in cases:
+        value = getattr(case, field) or (getattr(case, fallback_field) if fallback_field else None)
+        parsed = parse_timestamp(value) if value else None
+        stamps.append(np.datetime64(parsed, 'us') if parsed else now64)
+    stamps = np.array(stamps, dtype='datetime64[us]')
+    # Floor division matches timedelta.days for past and future timestamps alike
+    return (now64 - stamps) // np.timedelta64(1, 'D')
 
 def create_success_message(title: str, message: str) -> str:
     """Create professional success message"""